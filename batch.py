@@ -0,0 +1,4 @@
+from genai_poster.workflow.batch import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Tenants-per-minute for the batch runner against stubbed services.
+
+    python -m benchmarks.bench_batch --tenants 50 --concurrency 16
+
+Calendar selection uses real per-tenant ICS files through the shared calendar cache;
+research, LLM, image and publish nodes are stubs that sleep for the given latencies,
+so the result reflects scheduling and per-stage limits rather than network speed.
+Tenants give only a ``linkedin_author_urn`` (as OAuth tenants do), so config
+resolution must not need a LinkedIn token before the publish step. Throughput counts
+succeeded tenants only, and the script exits non-zero if any tenant failed.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def stub_nodes(tmp: Path, research: float, llm: float, image: float, publish: float) -> dict:
+    from genai_poster.models import PostDraft, BannerSpec, LinkedInPostResult
+
+    def search_company_info(state):
+        time.sleep(research)
+        return {"search_results": ""}
+
+    def write_post(state):
+        time.sleep(llm)
+        return {"post": PostDraft(festival=state["festival"], title="t", body="b", hashtags=[])}
+
+    def make_banner(state):
+        time.sleep(image)
+        path = tmp / f"{state['config'].brand_name}.png"
+        path.write_bytes(b"\x89PNG")
+        return {"banner": BannerSpec(festival=state["festival"], prompt=""), "banner_path": str(path)}
+
+    def post_linkedin(state):
+        time.sleep(publish)
+        return {"linkedin_result": LinkedInPostResult(post_urn="urn:li:share:x", asset_urn=None, share_url=None)}
+
+    return {"search_company_info": search_company_info, "write_post": write_post,
+            "make_banner": make_banner, "post_linkedin": post_linkedin}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--research", type=float, default=0.05)
+    parser.add_argument("--llm", type=float, default=0.2)
+    parser.add_argument("--image", type=float, default=0.4)
+    parser.add_argument("--publish", type=float, default=0.05)
+    parser.add_argument("--llm-limit", type=int, default=8)
+    parser.add_argument("--image-limit", type=int, default=8)
+    args = parser.parse_args()
+
+    from genai_poster.workflow.batch import run_batch
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        calendar = tmp / "shared.ics"
+        today = dt.date.today()
+        calendar.write_text(
+            "BEGIN:VCALENDAR\n"
+            + "".join(f"BEGIN:VEVENT\nDTSTART;VALUE=DATE:{today + dt.timedelta(days=i):%Y%m%d}\n"
+                      f"SUMMARY:Festival {i}\nEND:VEVENT\n" for i in range(3))
+            + "END:VCALENDAR\n",
+            encoding="utf-8",
+        )
+        tenants = [{
+            "name": f"tenant{i}",
+            "brand_name": f"tenant{i}",
+            "linkedin_author_urn": f"urn:li:person:{i}",
+            "calendar_url": str(calendar),
+        } for i in range(args.tenants)]
+        nodes = stub_nodes(tmp, args.research, args.llm, args.image, args.publish)
+
+        serial_start = time.perf_counter()
+        serial = run_batch(tenants[:5], concurrency=1, nodes=nodes)
+        serial_per_min = serial["summary"]["succeeded"] / (time.perf_counter() - serial_start) * 60
+
+        report = run_batch(tenants, concurrency=args.concurrency, nodes=nodes,
+                           limits={"llm": args.llm_limit, "image": args.image_limit})
+
+    print(json.dumps({
+        "serial_tenants_per_min": round(serial_per_min, 1),
+        **report["summary"],
+        "serial_failed": serial["summary"]["failed"],
+    }))
+    failed = report["summary"]["failed"] + serial["summary"]["failed"]
+    if failed:
+        errors = {t["error"] for t in report["tenants"] + serial["tenants"] if t["status"] != "succeeded"}
+        print(f"{failed} tenant run(s) failed: {'; '.join(sorted(errors))}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
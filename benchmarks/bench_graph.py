@@ -0,0 +1,85 @@
+"""
+Wall-clock check for the parallel workflow using stub nodes.
+
+    python -m benchmarks.bench_graph --llm-delay 0.3 --image-delay 0.5
+
+The serial pipeline costs roughly llm + image; the fan-out graph should take
+roughly max(search + llm, image). Exits non-zero if it does not.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import sys
+import time
+from genai_poster.models import AppConfig, FestivalInfo, PostDraft, BannerSpec, LinkedInPostResult
+from genai_poster.workflow.langgraph_flow import build_graph, GraphState
+
+def stub_nodes(llm_delay: float, image_delay: float, search_delay: float = 0.0) -> dict:
+    fest = FestivalInfo(name="Diwali", date=dt.date(2026, 11, 8))
+
+    def select_festival(state):
+        return {"festival": fest}
+
+    def search_company_info(state):
+        time.sleep(search_delay)
+        return {"search_results": "- https://example.com\n"}
+
+    def write_post(state):
+        time.sleep(llm_delay)
+        return {"post": PostDraft(festival=state["festival"], title="t", body="b", hashtags=[])}
+
+    def make_banner(state):
+        time.sleep(image_delay)
+        return {"banner": BannerSpec(festival=state["festival"], prompt="p"), "banner_path": "/tmp/banner.png"}
+
+    def post_linkedin(state):
+        assert state["post"] is not None and state["banner_path"] is not None
+        return {"linkedin_result": LinkedInPostResult(post_urn="urn:li:share:1", asset_urn=None, share_url=None)}
+
+    return {
+        "select_festival": select_festival,
+        "search_company_info": search_company_info,
+        "write_post": write_post,
+        "make_banner": make_banner,
+        "post_linkedin": post_linkedin,
+    }
+
+def initial_state() -> GraphState:
+    return {
+        "config": AppConfig(linkedin_author_urn="urn:li:person:bench"),
+        "festival": None,
+        "search_results": None,
+        "post": None,
+        "banner": None,
+        "banner_path": None,
+        "linkedin_result": None,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    parser.add_argument("--image-delay", type=float, default=0.5)
+    parser.add_argument("--search-delay", type=float, default=0.05)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed overhead in seconds")
+    args = parser.parse_args()
+
+    app = build_graph(stub_nodes(args.llm_delay, args.image_delay, args.search_delay)).compile()
+    start = time.perf_counter()
+    final = app.invoke(initial_state())
+    elapsed = time.perf_counter() - start
+
+    serial = args.search_delay + args.llm_delay + args.image_delay
+    parallel = max(args.search_delay + args.llm_delay, args.image_delay)
+    report = {
+        "elapsed_s": round(elapsed, 4),
+        "serial_s": serial,
+        "expected_parallel_s": parallel,
+        "published": final["linkedin_result"].post_urn,
+    }
+    print(json.dumps(report))
+    if elapsed > parallel + args.tolerance:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Startup cost of the CLI and the modules other entry points import.
+
+    python -m benchmarks.bench_import --runs 5 --budget-ms 400
+
+Each target runs in a fresh interpreter under ``python -X importtime``; the reported
+import time is the sum of the top-level cumulative times (interpreter start-up
+modules such as ``site`` excluded), best of ``--runs``. The cheap CLI commands must
+also leave the heavy stacks (LangGraph, LangChain/OpenAI, Pillow, requests) unimported.
+Exits non-zero if a target is over budget or imports a forbidden module.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ("langgraph", "langchain_core", "langchain_openai", "openai", "PIL", "requests", "flask")
+STARTUP = {"site", "encodings", "_frozen_importlib_external", "zipimport", "codecs", "io", "abc"}
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:{date}
+SUMMARY:Bench Festival
+END:VEVENT
+END:VCALENDAR
+"""
+
+def targets(calendar: Path) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+    """``name -> (code to run, top-level packages it must not import)``."""
+    cli = "import sys, runpy; sys.argv = {argv!r}; runpy.run_path('main.py', run_name='__main__')"
+    return {
+        "import_main": ("import main", HEAVY),
+        "import_graph_state": ("from genai_poster.workflow.langgraph_flow import GraphState", HEAVY),
+        "cli_festivals": (cli.format(argv=["main.py", "festivals", "--days", "400", "--calendar", str(calendar)]), HEAVY),
+        "cli_dry_run": (cli.format(argv=["main.py", "dry-run"]), HEAVY),
+        "cli_validate": (cli.format(argv=["main.py", "validate"]), HEAVY),
+    }
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """Total top-level import time (ms) and the slowest top-level modules."""
+    top: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue  # nested import, already counted in its parent
+        name = name.strip()
+        if name in STARTUP:
+            continue
+        top[name] = top.get(name, 0.0) + int(cumulative) / 1000
+    return sum(top.values()), dict(sorted(top.items(), key=lambda kv: -kv[1])[:5])
+
+def measure(code: str, env: Dict[str, str]) -> Dict[str, object]:
+    with tempfile.NamedTemporaryFile("r", suffix=".json") as modules_file:
+        # Record sys.modules at exit, after the command ran.
+        wrapped = (f"import atexit, json, sys\n"
+                   f"atexit.register(lambda: json.dump(sorted(sys.modules), open({modules_file.name!r}, 'w')))\n"
+                   f"{code}\n")
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", wrapped], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - start
+        modules = json.load(modules_file) if os.path.getsize(modules_file.name) else []
+    total, slowest = parse_importtime(proc.stderr)
+    return {"returncode": proc.returncode, "wall_ms": wall * 1000, "import_ms": total,
+            "slowest": slowest, "modules": modules}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="per-target import time budget")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calendar = Path(tmp) / "calendar.ics"
+        calendar.write_text(ICS.format(date=(dt.date.today() + dt.timedelta(days=30)).strftime("%Y%m%d")))
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "CALENDAR_URL": str(calendar), "BRAND_NAME": "Acme",
+               "CACHE_DIR": str(Path(tmp) / "cache"), "DOWNLOAD_DIR": str(Path(tmp) / "downloads")}
+
+        report, failures = {}, []
+        for name, (code, forbidden) in targets(calendar).items():
+            runs = [measure(code, env) for _ in range(args.runs)]
+            best = min(runs, key=lambda r: r["import_ms"])
+            loaded = sorted({m.split(".")[0] for m in best["modules"]} & set(forbidden))
+            report[name] = {
+                "import_ms": round(best["import_ms"], 1),
+                "wall_ms": round(min(r["wall_ms"] for r in runs), 1),
+                "slowest": {k: round(v, 1) for k, v in best["slowest"].items()},
+                "heavy_modules": loaded,
+            }
+            # validate exits 1 when credentials are missing; that is a result, not a crash.
+            if best["returncode"] not in (0, 1):
+                failures.append(f"{name}: exited with {best['returncode']}")
+            if best["import_ms"] > args.budget_ms:
+                failures.append(f"{name}: {best['import_ms']:.0f} ms > {args.budget_ms:.0f} ms budget")
+            if loaded:
+                failures.append(f"{name}: imported {', '.join(loaded)}")
+
+    print(json.dumps({"runs": args.runs, "budget_ms": args.budget_ms, "targets": report}, indent=2))
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
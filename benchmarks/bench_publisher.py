@@ -0,0 +1,77 @@
+"""
+Bulk multi-author publishing against a local LinkedIn stand-in that returns 429s.
+
+    python -m benchmarks.bench_publisher --authors 12 --posts-per-author 4
+
+The stand-in allows ``--server-limit`` posts per author per ``--window`` seconds and
+answers 429 + Retry-After beyond that. The scheduler's per-author bucket is set a
+little above the server limit so some 429s occur and must be absorbed. Prints
+throughput, queue latency and 429 counts; exits non-zero if any post is lost.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.fakes import FakeLinkedIn
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=12)
+    parser.add_argument("--posts-per-author", type=int, default=4)
+    parser.add_argument("--server-limit", type=int, default=2)
+    parser.add_argument("--window", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from genai_poster.publisher.post_manager import LinkedInClient
+    from genai_poster.publisher.rate_limiter import PublishScheduler
+
+    with FakeLinkedIn(author_limit=args.server_limit, window=args.window) as fake, \
+            tempfile.TemporaryDirectory() as d:
+        banner = Path(d) / "banner.png"
+        banner.write_bytes(b"\x89PNG" + b"\0" * 50_000)
+        clients = {}
+
+        def client_factory(token: str) -> LinkedInClient:
+            if token not in clients:
+                clients[token] = LinkedInClient(token, api_base=fake.api_base)
+            return clients[token]
+
+        scheduler = PublishScheduler(
+            client_factory=client_factory,
+            app_rate=1000.0, app_burst=args.authors,
+            author_rate=args.server_limit * 1.25 / args.window, author_burst=args.server_limit,
+            max_attempts=10, backoff=args.window / 4, workers=args.workers,
+        )
+        start = time.perf_counter()
+        futures = []
+        for n in range(args.posts_per_author):
+            for a in range(args.authors):
+                futures.append(scheduler.submit(f"token{a}", f"urn:li:person:{a}", str(banner),
+                                                f"post {n} by {a}", priority=n))
+        errors = []
+        for f in futures:
+            try:
+                f.result()
+            except Exception as e:
+                errors.append(str(e))
+        elapsed = time.perf_counter() - start
+        stats = scheduler.stats()
+        scheduler.shutdown()
+
+        report = {
+            "posts": len(futures),
+            "elapsed_s": round(elapsed, 3),
+            "server_429s": fake.throttled,
+            "errors": len(errors),
+            **stats,
+        }
+        print(json.dumps(report))
+        if errors or len(fake.posts) != len(futures):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Per-run setup overhead: fresh graph/clients on every run vs the shared runtime.
+
+    python -m benchmarks.bench_runtime --runs 50
+
+"fresh" compiles the graph and builds a new ChatOpenAI, OpenAI image client and
+LinkedInClient per run (the old behaviour); "pooled" uses get_compiled_graph and
+the keyed client pools. No network calls are made, so this measures construction
+cost only; reused connections additionally save a TLS handshake per host per run.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import time
+
+def measure(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+    from genai_poster.content.festival_content import make_llm, get_llm
+    from genai_poster.media import image_generator
+    from genai_poster.publisher.post_manager import LinkedInClient, get_linkedin_client
+    from genai_poster.workflow.langgraph_flow import build_graph, get_compiled_graph
+
+    def fresh():
+        build_graph().compile()
+        make_llm("gpt-4o-mini", "sk-bench")
+        image_generator._make_client("sk-bench").close()
+        LinkedInClient("token").session.close()
+
+    def pooled():
+        get_compiled_graph()
+        get_llm("gpt-4o-mini", "sk-bench")
+        image_generator._CLIENT_POOL.get("sk-bench")
+        get_linkedin_client("token")
+
+    pooled()  # warm the pools once, as the first request of a process would
+    before = measure(fresh, args.runs)
+    after = measure(pooled, args.runs)
+    print(json.dumps({
+        "runs": args.runs,
+        "fresh": before,
+        "pooled": after,
+        "speedup": round(before["mean_ms"] / max(after["mean_ms"], 1e-6), 1),
+    }))
+
+if __name__ == "__main__":
+    main()
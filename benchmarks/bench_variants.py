@@ -0,0 +1,98 @@
+"""
+Bytes and encode time per banner variant, against the 1024x1024 PNG source.
+
+    python -m benchmarks.bench_variants --runs 5 [--source banner.png]
+
+Without ``--source`` two sources are measured: a locally rendered banner (flat
+gradients, compresses well) and a noisy photographic stand-in closer to what the image
+API returns. "inline" encodes every variant in this process one after another;
+"pool" submits them to the variant process pool (warmed first), which is what
+node_make_banner does.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+def make_sources(tmp: Path) -> dict:
+    from PIL import Image
+    from genai_poster.models import FestivalInfo
+    from genai_poster.media.banner_renderer import get_banner_renderer
+
+    fest = FestivalInfo(name="Diwali", date=dt.date(2025, 10, 20), colors=["#FF9933", "#800080", "gold"])
+    rendered = tmp / "rendered.png"
+    rendered.write_bytes(get_banner_renderer().render(fest, "Acme Corp", 1024, 1024))
+
+    base = Image.open(rendered).convert("RGB")
+    noise = Image.effect_noise((1024, 1024), 48).convert("RGB")
+    photo = tmp / "photo.png"
+    Image.blend(base, noise, 0.35).save(photo, format="PNG")
+    return {"rendered": rendered, "photo": photo}
+
+def measure_source(source: Path, runs: int, pool) -> dict:
+    from genai_poster.media.variants import VARIANTS, encode_variant
+
+    per_variant = {}
+    inline_totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for v in VARIANTS.values():
+            info = encode_variant(str(source), v)
+            per_variant.setdefault(v.name, []).append(info)
+        inline_totals.append(time.perf_counter() - start)
+
+    pool_totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for f in [pool.submit(encode_variant, str(source), v) for v in VARIANTS.values()]:
+            f.result()
+        pool_totals.append(time.perf_counter() - start)
+
+    source_bytes = source.stat().st_size
+    variants = {}
+    for name, infos in per_variant.items():
+        v = VARIANTS[name]
+        variants[name] = {
+            "size": f"{v.width}x{v.height}",
+            "format": v.format,
+            "bytes": infos[-1]["bytes"],
+            "vs_source": round(infos[-1]["bytes"] / source_bytes, 3),
+            "quality": infos[-1]["quality"],
+            "encode_ms": round(statistics.median(i["encode_s"] for i in infos) * 1000, 2),
+        }
+    return {
+        "source_bytes": source_bytes,
+        "variants": variants,
+        "inline_ms": round(statistics.median(inline_totals) * 1000, 2),
+        "pool_ms": round(statistics.median(pool_totals) * 1000, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--source", help="PNG to measure instead of the built-in sources")
+    args = parser.parse_args()
+
+    from genai_poster.media.variants import get_variant_pool
+    from genai_poster.config.settings import VARIANT_WORKERS
+
+    pool = get_variant_pool()
+    pool.submit(time.sleep, 0).result()  # start the workers outside the timed region
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        if args.source:
+            source = tmp_path / "source.png"
+            source.write_bytes(Path(args.source).read_bytes())
+            sources = {"source": source}
+        else:
+            sources = make_sources(tmp_path)
+        report = {name: measure_source(path, args.runs, pool) for name, path in sources.items()}
+    print(json.dumps({"runs": args.runs, "workers": VARIANT_WORKERS, "sources": report}, indent=2))
+
+if __name__ == "__main__":
+    main()
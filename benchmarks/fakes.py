@@ -0,0 +1,320 @@
+"""Local stand-ins for external services used by the benchmark scripts."""
+from __future__ import annotations
+import base64
+import datetime as dt
+import io
+import json
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Type, Union
+from urllib.parse import parse_qsl
+
+class FakeService:
+    """Runs a ThreadingHTTPServer for ``handler`` on a free localhost port while used as a context manager."""
+
+    handler: Type[BaseHTTPRequestHandler]
+
+    def __init__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self._server.daemon_threads = True
+        self._server.fake = self  # type: ignore[attr-defined]
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+class JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send(self, status: int, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class FakeLinkedInHandler(JSONHandler):
+    @property
+    def state(self) -> "FakeLinkedIn":
+        return self.server.fake  # type: ignore[attr-defined]
+
+    def do_POST(self):
+        if self.path.startswith("/oauth/v2/accessToken"):
+            form = dict(parse_qsl(self._body().decode()))
+            n = self.state.next_id()
+            if form.get("grant_type") not in ("authorization_code", "refresh_token"):
+                self._send(400, {"error": "unsupported_grant_type"})
+                return
+            self._send(200, {"access_token": f"token-{n}", "expires_in": self.state.token_ttl,
+                             "refresh_token": form.get("refresh_token") or f"refresh-{n}",
+                             "refresh_token_expires_in": 365 * 86400})
+            return
+        data = json.loads(self._body() or b"{}")
+        fake = self.state
+        if fake.latency:
+            time.sleep(fake.latency)
+        if self.path.startswith("/v2/assets"):
+            fake.count("register")
+            n = fake.next_id()
+            self._send(200, {"value": {
+                "asset": f"urn:li:digitalmediaAsset:{n}",
+                "uploadMechanism": {"com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                    "uploadUrl": f"{fake.base_url}/upload/{n}"}},
+            }})
+        elif self.path.startswith("/v2/ugcPosts"):
+            fake.count("post")
+            fault = fake.next_fault("post")
+            if fault == "reset" or isinstance(fault, int):
+                self._fail(fault)
+                return
+            retry_after = fake.throttle(data["author"])
+            if retry_after is not None:
+                self._send(429, {"message": "Throttled"}, {"Retry-After": f"{retry_after:.3f}"})
+                return
+            n = fake.next_id()
+            text = data["specificContent"]["com.linkedin.ugc.ShareContent"]["shareCommentary"]["text"]
+            fake.record({
+                "authorization": self.headers.get("Authorization"),
+                "author": data["author"],
+                "text": text,
+                "at": time.monotonic(),
+            })
+            if fault == "reset_after":
+                self._fail("reset")  # the post exists, but the client never hears so
+                return
+            self._send(201, {}, {"x-restli-id": f"urn:li:share:{n}"})
+        else:
+            self._send(404, {})
+
+    def do_PUT(self):
+        body = self._body()
+        fake = self.state
+        fake.count("upload")
+        fault = fake.next_fault("upload")
+        if fault is not None:
+            self._fail(fault)
+            return
+        if fake.latency:
+            time.sleep(fake.latency)
+        fake.add_upload_bytes(len(body))
+        self._send(201)
+
+    def _fail(self, fault: Union[int, str]) -> None:
+        """Answer with an injected status, or drop the connection without a response for ``"reset"``."""
+        if fault == "reset":
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self._send(int(fault), {"message": "Injected failure"})
+
+    def do_GET(self):
+        if self.path.startswith("/v2/userinfo"):
+            token = (self.headers.get("Authorization") or "").replace("Bearer ", "")
+            self.state.userinfo_calls += 1
+            # Refreshed tokens ("token-<n>") belong to the same member.
+            sub = "sub-oauth" if token.startswith("token-") else f"sub-{token}"
+            self._send(200, {"sub": sub, "name": token})
+        else:
+            self._send(404, {})
+
+class FakeLinkedIn(FakeService):
+    """
+    In-process LinkedIn API stand-in serving ``/v2/assets``, ``/v2/ugcPosts``, uploads, userinfo
+    and the OAuth token endpoint (``/oauth/v2/accessToken``, tokens valid for ``token_ttl`` seconds).
+    With ``author_limit``/``window`` set, each author may publish at most ``author_limit``
+    posts per ``window`` seconds; extra posts get 429 with a Retry-After header.
+    ``latency`` is added to every register, upload and post call.
+
+    ``inject("upload" | "post", *faults)`` queues failures for the next calls of that
+    kind: an HTTP status (e.g. 503), ``"reset"`` to drop the connection without a
+    response, or (posts only) ``"reset_after"`` to create the post and then drop the
+    connection. ``calls`` counts ``register``, ``upload`` and ``post`` requests.
+    """
+
+    handler = FakeLinkedInHandler
+
+    def __init__(self, author_limit: Optional[int] = None, window: float = 1.0, latency: float = 0.0,
+                 token_ttl: int = 60 * 86400):
+        super().__init__()
+        self.token_ttl = token_ttl
+        self.userinfo_calls = 0
+        self.author_limit = author_limit
+        self.window = window
+        self.latency = latency
+        self.posts: list = []
+        self.throttled = 0
+        self.upload_bytes = 0
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._faults: Dict[str, deque] = defaultdict(deque)
+        self._counter = 0
+        self._recent = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.api_base = f"{self.base_url}/v2"
+        self.oauth_base = f"{self.base_url}/oauth/v2"
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    def record(self, post: dict) -> None:
+        with self._lock:
+            self.posts.append(post)
+
+    def inject(self, call: str, *faults: Union[int, str]) -> None:
+        with self._lock:
+            self._faults[call].extend(faults)
+
+    def next_fault(self, call: str) -> Optional[Union[int, str]]:
+        with self._lock:
+            queue = self._faults[call]
+            return queue.popleft() if queue else None
+
+    def count(self, call: str) -> None:
+        with self._lock:
+            self.calls[call] += 1
+
+    def add_upload_bytes(self, n: int) -> None:
+        with self._lock:
+            self.upload_bytes += n
+
+    def throttle(self, author: str) -> Optional[float]:
+        if self.author_limit is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent[author]
+            while recent and now - recent[0] >= self.window:
+                recent.popleft()
+            if len(recent) >= self.author_limit:
+                self.throttled += 1
+                return self.window - (now - recent[0])
+            recent.append(now)
+            return None
+
+class FakeOpenAIHandler(JSONHandler):
+    def do_POST(self):
+        data = json.loads(self._body() or b"{}")
+        fake: "FakeOpenAI" = self.server.fake  # type: ignore[attr-defined]
+        if self.path.endswith("/chat/completions"):
+            prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in data.get("messages", []))
+            completion_tokens = len(fake.reply.split())
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            fake.count("chat")
+            if data.get("stream"):
+                self._stream_chat(fake, data, usage)
+                return
+            time.sleep(fake.chat_latency)
+            self._send(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": data.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": fake.reply}}],
+                "usage": usage,
+            })
+        elif self.path.endswith("/images/generations"):
+            time.sleep(fake.image_latency)
+            width, height = (int(v) for v in data.get("size", "1024x1024").split("x"))
+            fake.count("images")
+            self._send(200, {"created": int(time.time()), "data": [{"b64_json": fake.image_b64(width, height)}]})
+        else:
+            self._send(404, {})
+
+    def _stream_chat(self, fake: "FakeOpenAI", data: dict, usage: dict) -> None:
+        """Send the reply word by word as SSE chunks, spreading ``chat_latency`` across them."""
+        words = fake.reply.split(" ")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": data.get("model", "fake")}
+        chunks = [{**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}]
+        chunks += [{**base, "choices": [{"index": 0, "delta": {"content": w if i == 0 else " " + w}, "finish_reason": None}]}
+                   for i, w in enumerate(words)]
+        chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (data.get("stream_options") or {}).get("include_usage"):
+            chunks.append({**base, "choices": [], "usage": usage})
+        for i, chunk in enumerate(chunks):
+            if 0 < i <= len(words):
+                time.sleep(fake.chat_latency / len(words))
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+class FakeOpenAI(FakeService):
+    """
+    OpenAI API stand-in for ``/v1/chat/completions`` and ``/v1/images/generations``.
+    Point clients at ``api_base`` (e.g. via OPENAI_BASE_URL). Chat replies carry token
+    usage and can be streamed word by word; images are gradient PNGs of the requested
+    size, rendered once per size.
+    """
+
+    handler = FakeOpenAIHandler
+
+    def __init__(self, chat_latency: float = 0.0, image_latency: float = 0.0,
+                 reply: str = "Wishing everyone a joyful festival from all of us!"):
+        super().__init__()
+        self.chat_latency = chat_latency
+        self.image_latency = image_latency
+        self.reply = reply
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._images: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+        self.api_base = f"{self.base_url}/v1"
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+
+    def image_b64(self, width: int, height: int) -> str:
+        with self._lock:
+            cached = self._images.get((width, height))
+            if cached is None:
+                from PIL import Image
+                gradient = Image.linear_gradient("L").resize((width, height))
+                img = Image.merge("RGB", (gradient, gradient.rotate(90), gradient.transpose(Image.FLIP_TOP_BOTTOM)))
+                buf = io.BytesIO()
+                img.save(buf, format="PNG")
+                cached = self._images[(width, height)] = base64.b64encode(buf.getvalue()).decode()
+            return cached
+
+def write_ics(path: Path, events: int, start: Optional[dt.date] = None, per_day: int = 3) -> Path:
+    """Write a calendar with ``events`` all-day VEVENTs, ``per_day`` per date, starting at ``start``."""
+    start = start or dt.date.today() - dt.timedelta(days=events // (2 * per_day))
+    with open(path, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write("BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:-//bench//fixtures//EN\n")
+        for i in range(events):
+            day = start + dt.timedelta(days=i // per_day)
+            f.write(
+                "BEGIN:VEVENT\n"
+                f"UID:bench-{i}@fixtures\n"
+                f"DTSTART;VALUE=DATE:{day:%Y%m%d}\n"
+                f"DTEND;VALUE=DATE:{day + dt.timedelta(days=1):%Y%m%d}\n"
+                f"SUMMARY:Festival {i}\n"
+                f"DESCRIPTION:Generated fixture event number {i} for calendar benchmarks\n"
+                "END:VEVENT\n"
+            )
+        f.write("END:VCALENDAR\n")
+    return Path(path)
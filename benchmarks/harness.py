@@ -0,0 +1,560 @@
+"""
+Offline benchmark harness: the real workflow against local stand-ins for OpenAI
+(chat + images), LinkedIn (assets, uploads, ugcPosts, userinfo), company research
+and generated ICS calendars. Nothing leaves the machine.
+
+    python -m benchmarks.harness calendar --sizes 10,1000,100000
+    python -m benchmarks.harness single --runs 10 --llm-latency 0.3 --image-latency 0.8
+    python -m benchmarks.harness batch --tenants 50 --concurrency 16
+    python -m benchmarks.harness server --jobs 40 --clients 8
+    python -m benchmarks.harness stream --runs 5
+    python -m benchmarks.harness upload --mb 5 --uploads 10
+    python -m benchmarks.harness upload_faults --uploads 5 --faults 2
+    python -m benchmarks.harness downloads --banners 12 --clients 8 --reloads 5
+    python -m benchmarks.harness all --out bench.json
+    python -m benchmarks.harness compare baseline.json bench.json --tolerance 0.15
+
+Each scenario prints (and with ``--out`` writes) a JSON document with its parameters
+and results. ``compare`` diffs two such files and exits non-zero when a latency got
+slower or a throughput got lower by more than the tolerance.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from benchmarks.fakes import FakeLinkedIn, FakeOpenAI, write_ics
+
+SCENARIOS = ("calendar", "single", "batch", "server", "stream", "upload", "upload_faults", "downloads")
+
+# Result keys ending in these suffixes are compared as "lower is better" / "higher is better".
+LOWER_IS_BETTER = ("_s", "_ms")
+HIGHER_IS_BETTER = ("per_s", "per_min")
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {
+        "n": len(ordered),
+        "mean_s": round(statistics.mean(ordered), 6),
+        "p50_s": round(statistics.median(ordered), 6),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "max_s": round(ordered[-1], 6),
+    }
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+class Environment:
+    """Temp directories, fixtures and fake services; sets the env vars settings read at import."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.tmp = Path(tempfile.mkdtemp(prefix="genai-bench-"))
+        self.openai = FakeOpenAI(chat_latency=args.llm_latency, image_latency=args.image_latency)
+        self.linkedin = FakeLinkedIn(latency=args.linkedin_latency)
+        self.research = self.tmp / "research.json"
+        self.calendar = write_ics(self.tmp / "calendar.ics", 30)
+
+    def __enter__(self) -> "Environment":
+        self.openai.__enter__()
+        self.linkedin.__enter__()
+        self.research.write_text(json.dumps({f"brand{i}": [f"Brand {i} builds things"] for i in range(1000)}))
+        os.environ.update({
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_BASE_URL": self.openai.api_base,
+            "LINKEDIN_API_BASE": self.linkedin.api_base,
+            "CACHE_DIR": str(self.tmp / "cache"),
+            "DOWNLOAD_DIR": str(self.tmp / "downloads"),
+            "RESEARCH_FIXTURES": str(self.research),
+            "TRACE_DIR": "",
+            "PUBLISH_APP_PER_MIN": "600000",
+            "PUBLISH_APP_BURST": "1000",
+            "PUBLISH_AUTHOR_PER_MIN": "600000",
+            "PUBLISH_AUTHOR_BURST": "1000",
+            "UPLOAD_BACKOFF": "0.01",
+        })
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.linkedin.__exit__(*exc)
+        self.openai.__exit__(*exc)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def config(self, i: int = 0, regenerate: bool = False):
+        from genai_poster.models import AppConfig
+        return AppConfig(
+            brand_name=f"brand{i}",
+            linkedin_author_urn=f"urn:li:person:bench{i}",
+            linkedin_access_token=f"token{i}",
+            openai_api_key="sk-bench",
+            calendar_url=str(self.calendar),
+            regenerate_post=regenerate,
+            regenerate_banner=regenerate,
+        )
+
+def run_calendar(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    from genai_poster.content.calendar_cache import CalendarCache
+    from genai_poster.content.festival_content import load_festival_index
+    from genai_poster.content.calendar_sources import merge_indexes, parse_calendar_sources
+    from genai_poster.content.festival_content import get_upcoming_festival
+
+    results = []
+    today = dt.date.today()
+    for size in (int(s) for s in args.sizes.split(",")):
+        path = write_ics(env.tmp / f"calendar-{size}.ics", size)
+        cache = CalendarCache(cache_dir=env.tmp / f"calendar-cache-{size}")
+        cold = best_of(lambda: load_festival_index(str(path), use_cache=False), args.repeat)
+        cache.get(str(path))
+        warm = best_of(lambda: cache.get(str(path)), args.repeat)
+        index = cache.get(str(path))
+        lookup = best_of(lambda: index.next_on_or_after(today), args.repeat)
+        # Three feeds listing the same events: the heap merge's worst case for de-duplication.
+        merge = best_of(lambda: merge_indexes([("national", index), ("regional", index), ("company", index)]), args.repeat)
+        results.append({
+            "events": size,
+            "file_bytes": path.stat().st_size,
+            "parse_s": round(cold, 6),
+            "cached_load_s": round(warm, 6),
+            "next_lookup_s": round(lookup, 9),
+            "merge3_s": round(merge, 6),
+            "events_per_s": round(size / cold, 1) if cold else None,
+        })
+    # Specs must keep spaces in paths and commas in query strings inside one source.
+    (env.tmp / "my calendars").mkdir(exist_ok=True)
+    spaced = write_ics(env.tmp / "my calendars" / "fest, 2.ics", 30)
+    specs = {str(spaced): 1, f"national={spaced}; {env.calendar}": 2,
+             f"{spaced}\nhttps://example.com/export.ics?cal=1,x.ics&a=b": 2}
+    for spec, expected in specs.items():
+        got = parse_calendar_sources(spec)
+        if len(got) != expected:
+            raise RuntimeError(f"Calendar spec {spec!r} parsed into {got}")
+    if get_upcoming_festival(today, str(spaced)) is None:
+        raise RuntimeError(f"No festival loaded from {spaced}")
+    return {"sizes": results}
+
+def run_single(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    from genai_poster.workflow.checkpoint import run_workflow
+
+    trace_dir = env.tmp / "traces"
+    phases: Dict[str, Any] = {}
+    for phase, regenerate in (("cold", True), ("warm", False)):
+        samples, nodes = [], {}
+        for i in range(args.runs):
+            run_id = f"{phase}-{i}"
+            start = time.perf_counter()
+            run_workflow({"config": env.config(regenerate=regenerate)}, run_id, trace_dir=str(trace_dir))
+            samples.append(time.perf_counter() - start)
+            for span in json.loads((trace_dir / f"{run_id}.json").read_text())["spans"]:
+                if span["name"] == "node_duration_seconds":
+                    nodes.setdefault(span["node"], []).append(span["duration_s"])
+        phases[phase] = {"end_to_end": summarize(samples),
+                         "nodes": {name: summarize(v) for name, v in sorted(nodes.items())}}
+    return phases
+
+def run_batch_scenario(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    from genai_poster.workflow.batch import run_batch
+
+    tenants = [{
+        "name": f"tenant{i}",
+        **env.config(i, regenerate=True).model_dump(),
+    } for i in range(args.tenants)]
+    report = run_batch(tenants, concurrency=args.concurrency)
+    summary = report["summary"]
+    if summary["failed"]:
+        raise RuntimeError(f"{summary['failed']} of {summary['tenants']} batch tenants failed")
+    return {
+        "tenants": summary["tenants"],
+        "failed": summary["failed"],
+        "elapsed_s": summary["elapsed_s"],
+        "tenants_per_min": summary["tenants_per_min"],
+        "tenant_latency": summarize([t["elapsed_s"] for t in report["tenants"]]),
+    }
+
+@contextmanager
+def serve_wsgi(app) -> Iterator[str]:
+    """Serve a WSGI app on a free local port; yields its base URL."""
+    from werkzeug.serving import make_server
+
+    httpd = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_port}"
+    finally:
+        httpd.shutdown()
+
+@contextmanager
+def serve_app() -> Iterator[str]:
+    """Serve server.app on a free local port; yields its base URL."""
+    import server
+
+    with serve_wsgi(server.app) as base:
+        yield base
+
+def run_server(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    import requests
+
+    rejected = 0
+    lock = threading.Lock()
+    posts_before = len(env.linkedin.posts)
+    userinfo_before = env.linkedin.userinfo_calls
+
+    def one_job(i: int) -> float:
+        nonlocal rejected
+        form = {"brandName": f"brand{i}", "brandTone": "warm", "hashtags": "#Bench",
+                "linkedinToken": f"token{i % args.clients}", "openaiKey": "sk-bench", "calendarUrl": str(env.calendar),
+                "regeneratePost": True, "regenerateBanner": True}
+        start = time.perf_counter()
+        with requests.Session() as http:
+            while True:
+                r = http.post(f"{base}/api/jobs", json=form)
+                if r.status_code != 429:
+                    break
+                with lock:
+                    rejected += 1
+                time.sleep(0.05)
+            r.raise_for_status()
+            status_url = base + r.json()["status_url"]
+            while http.get(status_url).json()["status"] not in ("succeeded", "failed"):
+                time.sleep(0.01)
+        return time.perf_counter() - start
+
+    with serve_app() as base:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = list(pool.map(one_job, range(args.jobs)))
+        elapsed = time.perf_counter() - start
+    return {
+        "jobs": args.jobs,
+        "clients": args.clients,
+        "published": len(env.linkedin.posts) - posts_before,
+        "rejected_429": rejected,
+        "userinfo_calls": env.linkedin.userinfo_calls - userinfo_before,
+        "elapsed_s": round(elapsed, 3),
+        "jobs_per_s": round(args.jobs / elapsed, 3),
+        "job_latency": summarize(latencies),
+    }
+
+def run_stream(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time to the first progress event, first LLM token and final result over /api/jobs/<id>/stream."""
+    import requests
+
+    marks: Dict[str, List[float]] = {"first_event": [], "first_token": [], "done": []}
+    with serve_app() as base, requests.Session() as http:
+        for i in range(args.runs):
+            form = {"brandName": f"stream{i}", "brandTone": "warm", "hashtags": "#Bench", "linkedinToken": "stream",
+                    "openaiKey": "sk-bench", "calendarUrl": str(env.calendar),
+                    "regeneratePost": True, "regenerateBanner": True}
+            start = time.perf_counter()
+            r = http.post(f"{base}/api/jobs", json=form)
+            r.raise_for_status()
+            seen: Dict[str, float] = {}
+            with http.get(f"{base}/api/jobs/{r.json()['job_id']}/stream", stream=True) as events:
+                for line in events.iter_lines(decode_unicode=True):
+                    if not line.startswith("event: "):
+                        continue
+                    event = line[len("event: "):]
+                    key = {"node_finished": "first_event", "token": "first_token"}.get(event, event)
+                    seen.setdefault(key, time.perf_counter() - start)
+                    if event in ("done", "error"):
+                        break
+            if "error" in seen:
+                raise RuntimeError(f"Streamed run {i} failed")
+            for key in marks:
+                marks[key].append(seen[key])
+    return {"runs": args.runs, **{key: summarize(v) for key, v in marks.items()}}
+
+def run_upload(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    from genai_poster.publisher.post_manager import LinkedInClient
+
+    path = env.tmp / "upload.bin"
+    path.write_bytes(os.urandom(int(args.mb * 1024 * 1024)))
+    client = LinkedInClient("token-upload", api_base=env.linkedin.api_base)
+    samples = []
+    before = env.linkedin.upload_bytes
+    for _ in range(args.uploads):
+        start = time.perf_counter()
+        client.upload_image("urn:li:person:upload", path)
+        samples.append(time.perf_counter() - start)
+    uploaded = env.linkedin.upload_bytes - before
+    return {
+        "file_mb": args.mb,
+        "uploads": args.uploads,
+        "upload": summarize(samples),
+        "mb_per_s": round(uploaded / 1024 / 1024 / sum(samples), 2),
+    }
+
+def run_upload_faults(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Uploads against injected failures. Per banner: ``--faults`` 503s and a connection
+    reset that the retries absorb; then more resets than retries, which must surface as
+    LinkedInAPIError without a status, followed by a retry of the publish that reuses
+    the registered asset. Every banner must be registered exactly once.
+    """
+    from genai_poster.config.settings import UPLOAD_RETRIES
+    from genai_poster.publisher.post_manager import LinkedInAPIError, LinkedInClient
+
+    if args.faults + 1 > UPLOAD_RETRIES:
+        raise RuntimeError(f"--faults {args.faults} plus a reset needs more than UPLOAD_RETRIES={UPLOAD_RETRIES}")
+    fake = env.linkedin
+    client = LinkedInClient("token-faults", api_base=fake.api_base)
+    owner = "urn:li:person:faults"
+    before = dict(fake.calls)
+    recovered, resumed = [], []
+    for i in range(args.uploads):
+        path = env.tmp / f"faults-{i}.png"
+        path.write_bytes(os.urandom(64 * 1024))
+
+        fake.inject("upload", *([503] * args.faults), "reset")
+        start = time.perf_counter()
+        client.upload_image(owner, path)
+        recovered.append(time.perf_counter() - start)
+
+        path = env.tmp / f"faults-{i}-exhausted.png"
+        path.write_bytes(os.urandom(64 * 1024))
+        fake.inject("upload", *(["reset"] * (UPLOAD_RETRIES + 1)))
+        start = time.perf_counter()
+        try:
+            client.upload_image(owner, path)
+        except LinkedInAPIError as e:
+            if e.status_code is not None:
+                raise RuntimeError(f"Exhausted upload reported status {e.status_code}, expected none")
+        else:
+            raise RuntimeError("Upload succeeded although every attempt was reset")
+        client.upload_image(owner, path)
+        resumed.append(time.perf_counter() - start)
+
+    calls = {k: fake.calls[k] - before.get(k, 0) for k in ("register", "upload")}
+    expected = {
+        "register": 2 * args.uploads,
+        "upload": args.uploads * ((args.faults + 2) + (UPLOAD_RETRIES + 2)),
+    }
+    if calls != expected:
+        raise RuntimeError(f"Unexpected LinkedIn calls {calls}, expected {expected}")
+    return {
+        "banners": args.uploads,
+        "faults": args.faults,
+        "upload_retries": UPLOAD_RETRIES,
+        "register_calls": calls["register"],
+        "upload_attempts": calls["upload"],
+        "recovered": summarize(recovered),
+        "resumed": summarize(resumed),
+    }
+
+class BrowserCache:
+    """Just enough of a browser HTTP cache: fresh immutable responses are reused, the rest revalidated."""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def fetch(self, http, url: str) -> Optional[Dict[str, Any]]:
+        """GET ``url`` as a page reload would; None when served from the cache without a request."""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry["immutable"] and entry["expires"] > time.time():
+                return None
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            elif entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        start = time.perf_counter()
+        r = http.get(url, headers=headers)
+        elapsed = time.perf_counter() - start
+        if r.status_code == 200:
+            cc = r.headers.get("Cache-Control", "")
+            max_age = next((int(d.split("=", 1)[1]) for d in cc.split(", ") if d.startswith("max-age=")), 0)
+            self.entries[url] = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+                                 "immutable": "immutable" in cc, "expires": time.time() + max_age}
+        return {"status": r.status_code, "bytes": len(r.content), "latency_s": elapsed}
+
+def run_downloads(env: Environment, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Page loads against /downloads, before (plain send_from_directory) and after (ETag,
+    immutable Cache-Control, Range). Each client loads every banner cold, reloads
+    the page ``--reloads`` times, then resumes each download from its midpoint.
+    """
+    import hashlib
+    import requests
+    from flask import Flask, send_from_directory
+    from genai_poster.config.settings import DOWNLOAD_DIR
+
+    banners = DOWNLOAD_DIR / "banners"
+    banners.mkdir(parents=True, exist_ok=True)
+    paths, sizes = [], {}
+    for _ in range(args.banners):
+        data = os.urandom(int(args.file_kb * 1024))
+        name = f"{hashlib.sha256(data).hexdigest()}.png"
+        (banners / name).write_bytes(data)
+        paths.append(f"/downloads/banners/{name}")
+        sizes[paths[-1]] = len(data)
+
+    legacy = Flask("legacy_downloads")
+    legacy.add_url_rule("/downloads/<path:filename>", "download_file",
+                        lambda filename: send_from_directory(DOWNLOAD_DIR, filename))
+
+    def one_client(base: str) -> Dict[str, List[Dict[str, Any]]]:
+        browser = BrowserCache()
+        phases: Dict[str, List[Dict[str, Any]]] = {"cold": [], "reload": [], "range": []}
+        with requests.Session() as http:
+            for phase in ["cold"] + ["reload"] * args.reloads:
+                phases[phase].extend(browser.fetch(http, base + p) or {"status": 0, "bytes": 0, "latency_s": 0.0}
+                                     for p in paths)
+            for p in paths:
+                start = time.perf_counter()
+                r = http.get(base + p, headers={"Range": f"bytes={sizes[p] // 2}-"})
+                phases["range"].append({"status": r.status_code, "bytes": len(r.content),
+                                        "latency_s": time.perf_counter() - start})
+        return phases
+
+    def measure(app) -> Dict[str, Any]:
+        with serve_wsgi(app) as base, ThreadPoolExecutor(max_workers=args.clients) as pool:
+            clients = list(pool.map(lambda _: one_client(base), range(args.clients)))
+        out = {}
+        for phase in ("cold", "reload", "range"):
+            results = [r for c in clients for r in c[phase]]
+            sent = [r for r in results if r["status"]]
+            out[phase] = {
+                "loads": len(results),
+                "requests": len(sent),
+                "statuses": {str(code): sum(r["status"] == code for r in sent) for code in sorted({r["status"] for r in sent})},
+                "bytes": sum(r["bytes"] for r in results),
+                "latency": summarize([r["latency_s"] for r in sent]),
+            }
+        return out
+
+    import server
+    before = measure(legacy)
+    after = measure(server.app)
+    def saved(key: str) -> Optional[float]:
+        b, a = (sum(phase[key] for phase in m.values()) for m in (before, after))
+        return round(100 * (1 - a / b), 1) if b else None
+
+    return {
+        "banners": args.banners,
+        "file_kb": args.file_kb,
+        "clients": args.clients,
+        "reloads": args.reloads,
+        "send_from_directory": before,
+        "cached": after,
+        "requests_saved_pct": saved("requests"),
+        "bytes_saved_pct": saved("bytes"),
+    }
+
+RUNNERS = {
+    "calendar": run_calendar,
+    "single": run_single,
+    "batch": run_batch_scenario,
+    "server": run_server,
+    "stream": run_stream,
+    "upload": run_upload,
+    "upload_faults": run_upload_faults,
+    "downloads": run_downloads,
+}
+
+def run_scenarios(names: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault("JOB_WORKERS", str(args.workers))
+    os.environ.setdefault("JOB_QUEUE_SIZE", str(max(16, args.jobs)))
+    results = {}
+    with Environment(args) as env:
+        for name in names:
+            start = time.perf_counter()
+            results[name] = RUNNERS[name](env, args)
+            results[name]["scenario_wall_s"] = round(time.perf_counter() - start, 3)
+        fake_calls = dict(env.openai.calls)
+    return {
+        "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": {"llm_s": args.llm_latency, "image_s": args.image_latency, "linkedin_s": args.linkedin_latency},
+        "fake_openai_calls": fake_calls,
+        "scenarios": results,
+    }
+
+def flatten(doc: Any, prefix: str = "") -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    if isinstance(doc, dict):
+        for k, v in doc.items():
+            out.update(flatten(v, f"{prefix}.{k}" if prefix else str(k)))
+    elif isinstance(doc, list):
+        for i, v in enumerate(doc):
+            key = v.get("events", i) if isinstance(v, dict) else i
+            out.update(flatten(v, f"{prefix}[{key}]"))
+    elif isinstance(doc, (int, float)) and not isinstance(doc, bool):
+        out[prefix] = float(doc)
+    return out
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Metrics that regressed by more than ``tolerance`` (fractional) between two result files."""
+    old, new = flatten(baseline.get("scenarios", {})), flatten(current.get("scenarios", {}))
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        leaf = key.rsplit(".", 1)[-1]
+        if leaf == "scenario_wall_s" or not old[key]:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        if (leaf.endswith(HIGHER_IS_BETTER) and change < -tolerance) or \
+                (leaf.endswith(LOWER_IS_BETTER) and not leaf.endswith(HIGHER_IS_BETTER) and change > tolerance):
+            regressions.append({"metric": key, "baseline": old[key], "current": new[key], "change": round(change, 4)})
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against local service stand-ins.")
+    parser.add_argument("scenario", choices=SCENARIOS + ("all", "compare"))
+    parser.add_argument("files", nargs="*", type=Path, help="compare: baseline.json current.json")
+    parser.add_argument("--out", type=Path, help="also write the JSON result here")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--image-latency", type=float, default=0.5)
+    parser.add_argument("--linkedin-latency", type=float, default=0.02)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000", help="calendar: event counts")
+    parser.add_argument("--repeat", type=int, default=3, help="calendar: best-of repetitions")
+    parser.add_argument("--runs", type=int, default=5, help="single: runs per phase")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="batch: tenants in flight")
+    parser.add_argument("--jobs", type=int, default=20, help="server: jobs to submit")
+    parser.add_argument("--clients", type=int, default=8, help="server: concurrent HTTP clients")
+    parser.add_argument("--workers", type=int, default=4, help="server: JOB_WORKERS")
+    parser.add_argument("--mb", type=float, default=5.0, help="upload: file size")
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--faults", type=int, default=2, help="upload_faults: 503s before the reset per upload")
+    parser.add_argument("--banners", type=int, default=12, help="downloads: banners served")
+    parser.add_argument("--file-kb", type=float, default=768, help="downloads: banner size")
+    parser.add_argument("--reloads", type=int, default=5, help="downloads: page reloads per client")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="compare: allowed fractional regression")
+    args = parser.parse_args(argv)
+
+    if args.scenario == "compare":
+        if len(args.files) != 2:
+            parser.error("compare needs baseline and current result files")
+        baseline, current = (json.loads(p.read_text(encoding="utf-8")) for p in args.files)
+        regressions = compare(baseline, current, args.tolerance)
+        print(json.dumps({"tolerance": args.tolerance, "regressions": regressions}, indent=2))
+        if regressions:
+            sys.exit(1)
+        return
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    report = run_scenarios(names, args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
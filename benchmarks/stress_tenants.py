@@ -0,0 +1,118 @@
+"""
+Concurrency stress check for request-scoped configuration.
+
+    python -m benchmarks.stress_tenants --tenants 40 --workers 8
+
+Every tenant gets its own calendar file, access token and author URN. Jobs run
+through JobQueue with the real select_festival and post_linkedin nodes against a
+local stand-in for the LinkedIn API, which records the Authorization header of
+every call. The script exits non-zero if any post was published with another
+tenant's token, author or festival.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.fakes import FakeLinkedIn
+
+def write_calendar(path: Path, name: str, date: dt.date) -> None:
+    path.write_text(
+        "BEGIN:VCALENDAR\nVERSION:2.0\n"
+        f"BEGIN:VEVENT\nDTSTART;VALUE=DATE:{date:%Y%m%d}\nSUMMARY:Warmup {name}\nEND:VEVENT\n"
+        f"BEGIN:VEVENT\nDTSTART;VALUE=DATE:{date + dt.timedelta(days=1):%Y%m%d}\nSUMMARY:{name}\nEND:VEVENT\n"
+        "END:VCALENDAR\n",
+        encoding="utf-8",
+    )
+
+def stub_nodes(tmp: Path, delay: float) -> dict:
+    from genai_poster.models import PostDraft, BannerSpec
+
+    def search_company_info(state):
+        time.sleep(delay)
+        return {"search_results": ""}
+
+    def write_post(state):
+        time.sleep(delay)
+        fest = state["festival"]
+        return {"post": PostDraft(festival=fest, title=fest.name, body=state["config"].brand_name, hashtags=[])}
+
+    def make_banner(state):
+        time.sleep(delay)
+        path = tmp / f"{state['config'].brand_name}.png"
+        path.write_bytes(b"\x89PNG fake")
+        return {"banner": BannerSpec(festival=state["festival"], prompt=""), "banner_path": str(path)}
+
+    return {"search_company_info": search_company_info, "write_post": write_post, "make_banner": make_banner}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tenants", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.01, help="stub node latency in seconds")
+    args = parser.parse_args()
+
+    with FakeLinkedIn() as fake:
+        # Settings are read at import time, so point the client at the stand-in first.
+        os.environ["LINKEDIN_API_BASE"] = fake.api_base
+        os.environ.setdefault("PUBLISH_APP_PER_MIN", "60000")
+        os.environ.setdefault("PUBLISH_APP_BURST", str(args.tenants))
+        from genai_poster.models import AppConfig
+        from genai_poster.workflow.jobs import JobQueue
+        from genai_poster.workflow.langgraph_flow import build_graph
+
+        with tempfile.TemporaryDirectory() as d:
+            tmp = Path(d)
+            app = build_graph(stub_nodes(tmp, args.delay)).compile()
+            queue = JobQueue(app.invoke, workers=args.workers, max_queue=args.tenants)
+
+            today = dt.date.today()
+            expected = {}
+            jobs = []
+            for i in range(args.tenants):
+                brand = f"tenant{i}"
+                cal = tmp / f"{brand}.ics"
+                write_calendar(cal, f"Festival {i}", today + dt.timedelta(days=i % 7))
+                cfg = AppConfig(
+                    brand_name=brand,
+                    linkedin_author_urn=f"urn:li:person:{brand}",
+                    linkedin_access_token=f"token-{brand}",
+                    openai_api_key=f"sk-{brand}",
+                    calendar_url=str(cal),
+                )
+                expected[f"urn:li:person:{brand}"] = (f"Bearer token-{brand}", f"Festival {i}", brand)
+                state = {"config": cfg, "festival": None, "search_results": None, "post": None,
+                         "banner": None, "banner_path": None, "linkedin_result": None}
+                jobs.append(queue.submit(state))
+
+            start = time.perf_counter()
+            for job in jobs:
+                queue.wait(job.id)
+            elapsed = time.perf_counter() - start
+            queue.shutdown()
+
+        failed = [j.error for j in jobs if j.error]
+        crosstalk = []
+        for post in fake.posts:
+            token, festival, brand = expected[post["author"]]
+            if post["authorization"] != token or not post["text"].startswith(festival + "\n") or brand not in post["text"]:
+                crosstalk.append(post)
+
+        print(json.dumps({
+            "tenants": args.tenants,
+            "workers": args.workers,
+            "published": len(fake.posts),
+            "failed": len(failed),
+            "crosstalk": len(crosstalk),
+            "elapsed_s": round(elapsed, 3),
+        }))
+        if failed or crosstalk or len(fake.posts) != args.tenants:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+LinkedIn OAuth: authorization-code login, an encrypted token store and token resolution.
+
+Tokens obtained through the OAuth flow are kept in SQLite (``TOKEN_STORE_DB``) with the
+whole record Fernet-encrypted, and refreshed once they are within
+``TOKEN_REFRESH_MARGIN`` seconds of expiry. The access token never leaves the server:
+a login hands the client an opaque login key instead. ``TokenManager.resolve`` turns a
+login key (or a raw access token) into a usable token and its author URN before a run
+starts: the userinfo lookup is cached per token for ``PROFILE_CACHE_TTL`` seconds, and a
+stored token that has expired and cannot be refreshed fails up front instead of at
+publish time.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import requests
+from pydantic import BaseModel
+from genai_poster.config.settings import (
+    LINKEDIN_OAUTH_BASE, LINKEDIN_CLIENT_ID, LINKEDIN_CLIENT_SECRET, LINKEDIN_REDIRECT_URI, LINKEDIN_SCOPES,
+    TOKEN_STORE_DB, TOKEN_STORE_KEY, TOKEN_STORE_KEY_FILE, TOKEN_REFRESH_MARGIN, PROFILE_CACHE_TTL, HTTP_TIMEOUT,
+)
+from genai_poster.utils.cache import MemoryCache, canonical_hash
+from genai_poster.utils.metrics import count
+
+LOG = logging.getLogger(__name__)
+
+LOGIN_STATE_TTL = 600
+
+class TokenError(RuntimeError):
+    """A LinkedIn token is expired, unknown or could not be refreshed."""
+
+class OAuthToken(BaseModel):
+    access_token: str
+    expires_at: Optional[float] = None
+    refresh_token: Optional[str] = None
+    refresh_expires_at: Optional[float] = None
+    scope: Optional[str] = None
+    author_urn: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], now: Optional[float] = None) -> "OAuthToken":
+        now = now if now is not None else time.time()
+        return cls(
+            access_token=data["access_token"],
+            expires_at=now + float(data["expires_in"]) if data.get("expires_in") else None,
+            refresh_token=data.get("refresh_token"),
+            refresh_expires_at=now + float(data["refresh_token_expires_in"]) if data.get("refresh_token_expires_in") else None,
+            scope=data.get("scope"),
+        )
+
+    def expires_within(self, seconds: float, now: Optional[float] = None) -> bool:
+        return self.expires_at is not None and self.expires_at - (now if now is not None else time.time()) <= seconds
+
+    def can_refresh(self, now: Optional[float] = None) -> bool:
+        now = now if now is not None else time.time()
+        return bool(self.refresh_token) and (self.refresh_expires_at is None or self.refresh_expires_at > now)
+
+def token_hash(access_token: str) -> str:
+    return canonical_hash("linkedin-token", access_token)
+
+def login_key_hash(login_key: str) -> str:
+    return canonical_hash("login-key", login_key)
+
+def load_fernet(key: str = TOKEN_STORE_KEY, key_file: Path = TOKEN_STORE_KEY_FILE):
+    """Fernet cipher for the token store, generating a 0600 key file on first use when no key is configured."""
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        raise RuntimeError("cryptography is not installed. Please install it with `pip install cryptography`")
+
+    if not key:
+        key_file = Path(key_file)
+        try:
+            key = key_file.read_text(encoding="ascii").strip()
+        except FileNotFoundError:
+            key_file.parent.mkdir(parents=True, exist_ok=True)
+            key = Fernet.generate_key().decode("ascii")
+            fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(key)
+            LOG.info("Generated token store key at %s", key_file)
+    return Fernet(key.encode("ascii") if isinstance(key, str) else key)
+
+class TokenStore:
+    """
+    Encrypted token records keyed by author URN. Only the URN, a sha256 of the client's
+    login key and timestamps are stored in the clear.
+    """
+
+    def __init__(self, path: Path = TOKEN_STORE_DB, cipher=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.cipher = cipher or load_fernet()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                " author_urn TEXT PRIMARY KEY, key_hash TEXT, data BLOB NOT NULL,"
+                " expires_at REAL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tokens_key ON tokens (key_hash)")
+
+    def _decode(self, blob: bytes) -> OAuthToken:
+        return OAuthToken.model_validate_json(self.cipher.decrypt(blob))
+
+    def put(self, token: OAuthToken, login_key: Optional[str] = None) -> None:
+        """Store ``token``; a new ``login_key`` replaces the account's previous one, otherwise it is kept."""
+        if not token.author_urn:
+            raise ValueError("token.author_urn is required to store a token")
+        blob = self.cipher.encrypt(token.model_dump_json().encode("utf-8"))
+        key_hash = login_key_hash(login_key) if login_key else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO tokens (author_urn, key_hash, data, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (author_urn) DO UPDATE SET key_hash = COALESCE(excluded.key_hash, key_hash),"
+                " data = excluded.data, expires_at = excluded.expires_at, updated_at = excluded.updated_at",
+                (token.author_urn, key_hash, blob, token.expires_at, time.time()),
+            )
+
+    def get(self, author_urn: str) -> Optional[OAuthToken]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tokens WHERE author_urn = ?", (author_urn,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def find(self, login_key: str) -> Optional[OAuthToken]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tokens WHERE key_hash = ?", (login_key_hash(login_key),)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def expiring(self, before: float) -> List[OAuthToken]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM tokens WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                      (before,)).fetchall()
+        return [self._decode(r[0]) for r in rows]
+
+    def delete(self, author_urn: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tokens WHERE author_urn = ?", (author_urn,))
+
+class LinkedInOAuth:
+    """Authorization-code and refresh-token grants against LinkedIn's OAuth endpoints."""
+
+    def __init__(self, client_id: str = LINKEDIN_CLIENT_ID, client_secret: str = LINKEDIN_CLIENT_SECRET,
+                 redirect_uri: str = LINKEDIN_REDIRECT_URI, scopes: str = LINKEDIN_SCOPES,
+                 oauth_base: str = LINKEDIN_OAUTH_BASE):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.scopes = scopes
+        self.oauth_base = oauth_base
+        self.session = requests.Session()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    def authorization_url(self, state: str) -> str:
+        query = urlencode({"response_type": "code", "client_id": self.client_id,
+                           "redirect_uri": self.redirect_uri, "state": state, "scope": self.scopes})
+        return f"{self.oauth_base}/authorization?{query}"
+
+    def _token_request(self, form: Dict[str, str]) -> OAuthToken:
+        if not self.configured:
+            raise TokenError("LINKEDIN_CLIENT_ID and LINKEDIN_CLIENT_SECRET must be set for OAuth.")
+        r = self.session.post(f"{self.oauth_base}/accessToken", timeout=HTTP_TIMEOUT, data={
+            **form, "client_id": self.client_id, "client_secret": self.client_secret})
+        if r.status_code >= 300:
+            raise TokenError(f"LinkedIn token request ({form['grant_type']}) failed: {r.status_code} {r.text}")
+        return OAuthToken.from_response(r.json())
+
+    def exchange_code(self, code: str) -> OAuthToken:
+        return self._token_request({"grant_type": "authorization_code", "code": code, "redirect_uri": self.redirect_uri})
+
+    def refresh(self, refresh_token: str) -> OAuthToken:
+        return self._token_request({"grant_type": "refresh_token", "refresh_token": refresh_token})
+
+class TokenManager:
+    """
+    Resolves access tokens to (usable token, author URN) and keeps stored tokens fresh.
+    ``store`` may be None (no ``cryptography``), in which case OAuth tokens live in memory only.
+    """
+
+    def __init__(self, store: Optional[TokenStore] = None, oauth: Optional[LinkedInOAuth] = None,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN, profile_ttl: float = PROFILE_CACHE_TTL):
+        self.store = store
+        self.oauth = oauth or LinkedInOAuth()
+        self.refresh_margin = refresh_margin
+        self.profiles = MemoryCache(max_entries=1024, ttl=profile_ttl)
+        self._memory: Dict[str, OAuthToken] = {}
+        self._memory_keys: Dict[str, str] = {}
+        self._states: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _save(self, token: OAuthToken, login_key: Optional[str] = None) -> None:
+        if self.store is not None:
+            self.store.put(token, login_key)
+            return
+        with self._lock:
+            self._memory[token.author_urn] = token
+            if login_key:
+                self._memory_keys = {k: u for k, u in self._memory_keys.items() if u != token.author_urn}
+                self._memory_keys[login_key_hash(login_key)] = token.author_urn
+
+    def _lookup(self, login_key: Optional[str] = None, author_urn: Optional[str] = None) -> Optional[OAuthToken]:
+        if self.store is not None:
+            return self.store.get(author_urn) if author_urn else self.store.find(login_key)
+        with self._lock:
+            if not author_urn:
+                author_urn = self._memory_keys.get(login_key_hash(login_key))
+            return self._memory.get(author_urn) if author_urn else None
+
+    def profile(self, access_token: str) -> Dict[str, Any]:
+        """The token's userinfo, cached per token for ``PROFILE_CACHE_TTL`` seconds."""
+        from genai_poster.publisher.post_manager import get_linkedin_client
+
+        key = token_hash(access_token)
+        cached = self.profiles.get(key)
+        count("cache_requests_total", cache="profile", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return json.loads(cached)
+        profile = get_linkedin_client(access_token).get_self_profile()
+        self.profiles.set(key, json.dumps(profile))
+        return profile
+
+    def author_urn(self, access_token: str) -> str:
+        return f'urn:li:person:{self.profile(access_token)["sub"]}'
+
+    def authorization_url(self) -> str:
+        """Start a login: LinkedIn's consent URL with a fresh single-use ``state``."""
+        state = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._lock:
+            self._states = {s: t for s, t in self._states.items() if now - t < LOGIN_STATE_TTL}
+            self._states[state] = now
+        return self.oauth.authorization_url(state)
+
+    def login(self, code: str, state: str) -> Tuple[OAuthToken, str]:
+        """
+        Complete the authorization-code flow and store the token under its author URN.
+        Returns the token and a new login key, the client's handle for it in ``resolve``.
+        """
+        with self._lock:
+            started = self._states.pop(state, None)
+        if started is None or time.time() - started >= LOGIN_STATE_TTL:
+            raise TokenError("Unknown or expired OAuth state; start the login again.")
+        token = self.oauth.exchange_code(code)
+        token.author_urn = self.author_urn(token.access_token)
+        login_key = secrets.token_urlsafe(32)
+        self._save(token, login_key)
+        LOG.info("Stored LinkedIn token for %s", token.author_urn)
+        return token, login_key
+
+    def refresh(self, token: OAuthToken) -> OAuthToken:
+        """Exchange the refresh token for a new access token and store it."""
+        with self._refresh_lock:
+            # Another thread may have refreshed this account while we waited.
+            current = self._lookup(author_urn=token.author_urn) or token
+            if current.access_token != token.access_token and not current.expires_within(self.refresh_margin):
+                return current
+            if not current.can_refresh():
+                raise TokenError(f"LinkedIn token for {token.author_urn} cannot be refreshed; sign in again.")
+            fresh = self.oauth.refresh(current.refresh_token)
+            fresh.author_urn = current.author_urn
+            if not fresh.refresh_token:
+                fresh.refresh_token, fresh.refresh_expires_at = current.refresh_token, current.refresh_expires_at
+            self._save(fresh)
+            count("token_refreshes_total")
+            LOG.info("Refreshed LinkedIn token for %s", fresh.author_urn)
+            return fresh
+
+    def _ensure_fresh(self, token: OAuthToken) -> OAuthToken:
+        if not token.expires_within(self.refresh_margin):
+            return token
+        if token.can_refresh() and self.oauth.configured:
+            try:
+                return self.refresh(token)
+            except TokenError:
+                if token.expires_within(0):
+                    raise
+                LOG.warning("Refreshing the token for %s failed; using it until it expires", token.author_urn)
+                return token
+        if token.expires_within(0):
+            raise TokenError(f"LinkedIn token for {token.author_urn} has expired; sign in again.")
+        return token
+
+    def resolve(self, access_token: Optional[str] = None, login_key: Optional[str] = None,
+                author_urn: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Return ``(access_token, author_urn)`` ready for a run. A raw ``access_token`` is
+        used as given; a ``login_key`` (from ``login``) or, for trusted server-side
+        callers, an ``author_urn`` selects a stored token, which is refreshed first if it
+        is near expiry.
+        """
+        if access_token:
+            return access_token, self.author_urn(access_token)
+        if not login_key and not author_urn:
+            raise TokenError("A LinkedIn access token or login key is required.")
+        token = self._lookup(login_key=login_key, author_urn=author_urn)
+        if token is None:
+            raise TokenError("Unknown LinkedIn login; sign in again.")
+        token = self._ensure_fresh(token)
+        return token.access_token, token.author_urn
+
+    def refresh_due(self, now: Optional[float] = None) -> int:
+        """Refresh every stored token expiring within the margin; for periodic callers such as schedulers."""
+        if self.store is None:
+            return 0
+        refreshed = 0
+        for token in self.store.expiring((now if now is not None else time.time()) + self.refresh_margin):
+            try:
+                refreshed += self._ensure_fresh(token).access_token != token.access_token
+            except TokenError as e:
+                LOG.warning("%s", e)
+        return refreshed
+
+_default_manager: Optional[TokenManager] = None
+_default_lock = threading.Lock()
+
+def get_token_manager() -> TokenManager:
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            try:
+                store = TokenStore()
+            except RuntimeError as e:
+                LOG.warning("Token store disabled (%s); OAuth tokens are kept in memory only", e)
+                store = None
+            _default_manager = TokenManager(store)
+        return _default_manager
@@ -1,20 +1,108 @@
+"""
+Settings read from the environment, falling back to a ``.env`` file.
+
+Importing this module has no side effects: ``.env`` values are only read, not exported,
+and nothing is created on disk. Entry points call ``configure()`` once at startup to
+export ``.env`` into ``os.environ`` (for libraries that read it directly), set up
+logging and create DOWNLOAD_DIR.
+"""
 import logging
 import os
 from pathlib import Path
+from typing import Optional
 from zoneinfo import ZoneInfo
-from dotenv import load_dotenv
-
-load_dotenv()
+from dotenv import dotenv_values, load_dotenv
 
 LOG = logging.getLogger("festival_linkedin_bot")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-)
+
+_DOTENV = {k: v for k, v in dotenv_values().items() if v is not None}
+
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """``os.getenv`` that also sees ``.env``; the real environment wins, as with load_dotenv."""
+    return os.environ.get(name, _DOTENV.get(name, default))
+
+def configure(level: int = logging.INFO) -> None:
+    """Process setup for entry points (CLI, server, scheduler); safe to call more than once."""
+    load_dotenv()
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    )
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 INDIA_TZ = ZoneInfo("Asia/Kolkata")
 
-DEFAULT_OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-DEFAULT_IMAGE_MODEL = os.getenv("IMAGE_MODEL", "dall-e-3")
-DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", "./downloads")).resolve()
-DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+DEFAULT_OPENAI_MODEL = _env("OPENAI_MODEL", "gpt-4o-mini")
+DEFAULT_IMAGE_MODEL = _env("IMAGE_MODEL", "dall-e-3")
+DOWNLOAD_DIR = Path(_env("DOWNLOAD_DIR", "./downloads")).resolve()
+CACHE_DIR = Path(_env("CACHE_DIR", "./.cache")).resolve()
+DRAFT_CACHE_TTL = float(_env("DRAFT_CACHE_TTL", "86400"))
+DRAFT_CACHE_SIZE = int(_env("DRAFT_CACHE_SIZE", "256"))
+DRAFT_CACHE_DB = _env("DRAFT_CACHE_DB", str(CACHE_DIR / "drafts.sqlite3"))
+RESEARCH_FIXTURES = _env("RESEARCH_FIXTURES", "")
+RESEARCH_TTL = float(_env("RESEARCH_TTL", str(7 * 86400)))
+RESEARCH_STALE_TTL = float(_env("RESEARCH_STALE_TTL", str(30 * 86400)))
+RESEARCH_WORKERS = int(_env("RESEARCH_WORKERS", "2"))
+BANNER_CACHE_MAX_BYTES = int(float(_env("BANNER_CACHE_MAX_MB", "512")) * 1024 * 1024)
+# DOWNLOAD_DIR as a whole (banners, variants, pinned drafts): disk quota kept by a janitor.
+DOWNLOADS_MAX_BYTES = int(float(_env("DOWNLOADS_MAX_MB", "2048")) * 1024 * 1024)
+DOWNLOADS_JANITOR_INTERVAL = float(_env("DOWNLOADS_JANITOR_INTERVAL", "600"))
+CALENDAR_TIMEOUT = float(_env("CALENDAR_TIMEOUT", "30"))
+# Multi-source calendars: feeds fetched at once, and how long selection waits before using last good copies.
+CALENDAR_WORKERS = int(_env("CALENDAR_WORKERS", "8"))
+CALENDAR_SOURCE_DEADLINE = float(_env("CALENDAR_SOURCE_DEADLINE", "5"))
+BANNER_MODE = _env("BANNER_MODE", "api")
+BANNER_API_TIMEOUT = float(_env("BANNER_API_TIMEOUT", "60"))
+BANNER_FONT = _env("BANNER_FONT", "")
+# Sized JPEG/WebP variants encoded from each banner (see genai_poster.media.variants).
+BANNER_VARIANTS = [v.strip() for v in _env("BANNER_VARIANTS", "square,landscape,portrait,preview").split(",") if v.strip()]
+BANNER_UPLOAD_VARIANT = _env("BANNER_UPLOAD_VARIANT", "square")
+VARIANT_WORKERS = int(_env("VARIANT_WORKERS", str(min(4, os.cpu_count() or 1))))
+LINKEDIN_API_BASE = _env("LINKEDIN_API_BASE", "https://api.linkedin.com/v2")
+LINKEDIN_OAUTH_BASE = _env("LINKEDIN_OAUTH_BASE", "https://www.linkedin.com/oauth/v2")
+LINKEDIN_CLIENT_ID = _env("LINKEDIN_CLIENT_ID", "")
+LINKEDIN_CLIENT_SECRET = _env("LINKEDIN_CLIENT_SECRET", "")
+LINKEDIN_REDIRECT_URI = _env("LINKEDIN_REDIRECT_URI", "")
+LINKEDIN_SCOPES = _env("LINKEDIN_SCOPES", "openid profile w_member_social")
+HTTP_TIMEOUT = float(_env("HTTP_TIMEOUT", "60"))
+UPLOAD_RETRIES = int(_env("UPLOAD_RETRIES", "3"))
+UPLOAD_BACKOFF = float(_env("UPLOAD_BACKOFF", "1.0"))
+PUBLISH_APP_RATE = float(_env("PUBLISH_APP_PER_MIN", "60")) / 60
+PUBLISH_APP_BURST = float(_env("PUBLISH_APP_BURST", "10"))
+PUBLISH_AUTHOR_RATE = float(_env("PUBLISH_AUTHOR_PER_MIN", "6")) / 60
+PUBLISH_AUTHOR_BURST = float(_env("PUBLISH_AUTHOR_BURST", "2"))
+PUBLISH_MAX_ATTEMPTS = int(_env("PUBLISH_MAX_ATTEMPTS", "5"))
+PUBLISH_BACKOFF = float(_env("PUBLISH_BACKOFF", "2.0"))
+PUBLISH_WORKERS = int(_env("PUBLISH_WORKERS", "4"))
+
+JOB_WORKERS = int(_env("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(_env("JOB_QUEUE_SIZE", "16"))
+JOB_HISTORY = int(_env("JOB_HISTORY", "256"))
+JOB_WAIT_TIMEOUT = float(_env("JOB_WAIT_TIMEOUT", "600"))
+
+CLIENT_POOL_SIZE = int(_env("CLIENT_POOL_SIZE", "32"))
+CLIENT_IDLE_TTL = float(_env("CLIENT_IDLE_TTL", "900"))
+
+BATCH_TENANT_CONCURRENCY = int(_env("BATCH_TENANT_CONCURRENCY", "8"))
+BATCH_RESEARCH_CONCURRENCY = int(_env("BATCH_RESEARCH_CONCURRENCY", "4"))
+BATCH_LLM_CONCURRENCY = int(_env("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_IMAGE_CONCURRENCY = int(_env("BATCH_IMAGE_CONCURRENCY", "2"))
+BATCH_PUBLISH_CONCURRENCY = int(_env("BATCH_PUBLISH_CONCURRENCY", "4"))
+
+CHECKPOINT_DB = Path(_env("CHECKPOINT_DB", str(CACHE_DIR / "checkpoints.sqlite3")))
+# Directory for per-run JSON traces; empty disables them.
+TRACE_DIR = _env("TRACE_DIR", "")
+
+TOKEN_STORE_DB = Path(_env("TOKEN_STORE_DB", str(CACHE_DIR / "tokens.sqlite3")))
+# Fernet key for the token store; when empty a key file is generated at TOKEN_STORE_KEY_FILE.
+TOKEN_STORE_KEY = _env("TOKEN_STORE_KEY", "")
+TOKEN_STORE_KEY_FILE = Path(_env("TOKEN_STORE_KEY_FILE", str(CACHE_DIR / "token_store.key")))
+TOKEN_REFRESH_MARGIN = float(_env("TOKEN_REFRESH_MARGIN", "86400"))
+PROFILE_CACHE_TTL = float(_env("PROFILE_CACHE_TTL", "3600"))
+
+PREGEN_DB = Path(_env("PREGEN_DB", str(CACHE_DIR / "pregen.sqlite3")))
+PREGEN_LEAD_DAYS = int(_env("PREGEN_LEAD_DAYS", "3"))
+PREGEN_PUBLISH_TIME = _env("PREGEN_PUBLISH_TIME", "09:00")
+PREGEN_INTERVAL = float(_env("PREGEN_INTERVAL", "300"))
+PREGEN_REQUIRE_APPROVAL = _env("PREGEN_REQUIRE_APPROVAL", "true").lower() in ("1", "true", "yes")
+PREGEN_MAX_ATTEMPTS = int(_env("PREGEN_MAX_ATTEMPTS", "3"))
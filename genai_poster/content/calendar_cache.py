@@ -0,0 +1,134 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from genai_poster.content.calendar_index import FestivalIndex
+from genai_poster.config.settings import CACHE_DIR, CALENDAR_TIMEOUT
+from genai_poster.utils.metrics import count
+
+if TYPE_CHECKING:
+    import requests
+
+LOG = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+
+class CalendarCache:
+    """
+    On-disk cache of parsed calendars keyed by URL or file path.
+
+    Remote feeds are revalidated with ETag/If-Modified-Since, local files with
+    their mtime and size. Entries hold the festival index as compact, date-sorted
+    ``[ordinal, name]`` rows so a warm run skips both the fetch and the parser.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR / "calendars",
+                 session: Optional[requests.Session] = None,
+                 timeout: float = CALENDAR_TIMEOUT):
+        self.cache_dir = Path(cache_dir)
+        self._session = session
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # requests is only needed for remote feeds, so local calendars never import it.
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _entry_path(self, source: str) -> Path:
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.json"
+
+    def load(self, source: str) -> Optional[dict]:
+        path = self._entry_path(source)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION or entry.get("source") != source:
+            return None
+        return entry
+
+    def store(self, source: str, entry: dict) -> None:
+        entry = {**entry, "version": CACHE_VERSION, "source": source}
+        path = self._entry_path(source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def get(self, source: str) -> FestivalIndex:
+        """Return the festival index for ``source``, re-parsing only when the source changed."""
+        with self._lock:
+            entry = self.load(source)
+        if source.startswith("http"):
+            rows = self._get_remote(source, entry)
+        else:
+            rows = self._get_local(source, entry)
+        return FestivalIndex.from_rows(rows)
+
+    def last_good(self, source: str) -> Optional[FestivalIndex]:
+        """The most recently stored copy of ``source``, however old; for when a fetch fails or is too slow."""
+        with self._lock:
+            entry = self.load(source)
+        return FestivalIndex.from_rows(entry["rows"]) if entry else None
+
+    def _get_remote(self, url: str, entry: Optional[dict]) -> list:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as r:
+            if r.status_code == 304 and entry:
+                count("cache_requests_total", cache="calendar", result="hit")
+                LOG.info("Calendar not modified, using cached copy: %s", url)
+                return entry["rows"]
+            r.raise_for_status()
+            count("cache_requests_total", cache="calendar", result="miss")
+            if r.encoding is None:
+                r.encoding = "utf-8"
+            rows = FestivalIndex.from_lines(r.iter_lines(decode_unicode=True)).rows()
+
+        with self._lock:
+            self.store(url, {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "rows": rows,
+            })
+        return rows
+
+    def _get_local(self, path: str, entry: Optional[dict]) -> list:
+        st = os.stat(path)
+        if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            count("cache_requests_total", cache="calendar", result="hit")
+            LOG.info("Calendar file unchanged, using cached copy: %s", path)
+            return entry["rows"]
+
+        count("cache_requests_total", cache="calendar", result="miss")
+        with open(path, "r", encoding="utf-8") as f:
+            rows = FestivalIndex.from_lines(f).rows()
+        with self._lock:
+            self.store(path, {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "rows": rows})
+        return rows
+
+_default_cache: Optional[CalendarCache] = None
+_default_lock = threading.Lock()
+
+def get_calendar_cache() -> CalendarCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = CalendarCache()
+        return _default_cache
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import datetime as dt
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from genai_poster.models import FestivalInfo
+
+_UNESCAPE = {"n": "\n", "N": "\n", ",": ",", ";": ";", "\\": "\\"}
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 5545 folded lines (continuations start with a space or tab)."""
+    pending: Optional[str] = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def _split_property(line: str) -> Tuple[str, str]:
+    """Split ``NAME;PARAMS:VALUE`` into the upper-cased name and the raw value."""
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ":" and not in_quotes:
+            return line[:i].split(";", 1)[0].upper(), line[i + 1:]
+    return line.upper(), ""
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    out = []
+    it = iter(value)
+    for ch in it:
+        if ch == "\\":
+            nxt = next(it, "")
+            out.append(_UNESCAPE.get(nxt, nxt))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Stream ``(date ordinal, summary)`` pairs out of ICS text without building a calendar object.
+    Only DTSTART and SUMMARY of top-level VEVENTs are read; events missing either are skipped.
+    """
+    stack: List[str] = []
+    start: Optional[int] = None
+    summary: Optional[str] = None
+    for line in _unfold(lines):
+        name, value = _split_property(line)
+        if name == "BEGIN":
+            stack.append(value.strip().upper())
+            if stack[-1] == "VEVENT":
+                start, summary = None, None
+        elif name == "END":
+            component = stack.pop() if stack else ""
+            if component == "VEVENT" and start is not None and summary:
+                yield start, summary
+        elif stack and stack[-1] == "VEVENT":
+            if name == "DTSTART":
+                digits = value.strip()[:8]
+                try:
+                    start = dt.date(int(digits[:4]), int(digits[4:6]), int(digits[6:8])).toordinal()
+                except ValueError:
+                    start = None
+            elif name == "SUMMARY":
+                summary = _unescape(value).strip()
+
+class FestivalIndex:
+    """
+    Date-sorted, array-backed festival index.
+
+    Dates are kept as ordinals in an ``array`` next to a parallel list of names (and,
+    for merged calendars, of source regions), so lookups are bisects and
+    FestivalInfo objects are only built for returned rows.
+    """
+
+    __slots__ = ("_ordinals", "_names", "_regions")
+
+    def __init__(self, ordinals: Sequence[int] = (), names: Sequence[str] = (),
+                 regions: Optional[Sequence[Optional[str]]] = None):
+        self._ordinals = array("l", ordinals)
+        self._names = list(names)
+        self._regions = list(regions) if regions is not None and any(regions) else None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "FestivalIndex":
+        ordered = sorted((int(o), n) for o, n in rows)
+        return cls([o for o, _ in ordered], [n for _, n in ordered])
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "FestivalIndex":
+        return cls.from_rows(iter_vevents(lines))
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        """``(date ordinal, name)`` pairs in date order."""
+        return zip(self._ordinals, self._names)
+
+    def rows(self) -> List[list]:
+        return [[o, n] for o, n in zip(self._ordinals, self._names)]
+
+    def _festival(self, i: int) -> FestivalInfo:
+        return FestivalInfo(name=self._names[i], date=dt.date.fromordinal(self._ordinals[i]),
+                            region=self._regions[i] if self._regions else None)
+
+    def next_on_or_after(self, date: dt.date, offset: int = 0) -> Optional[FestivalInfo]:
+        """Return the festival ``offset`` positions after the first one on or after ``date``."""
+        i = bisect_left(self._ordinals, date.toordinal()) + offset
+        if i >= len(self._ordinals):
+            return None
+        return self._festival(i)
+
+    def window(self, start: dt.date, end: dt.date) -> List[FestivalInfo]:
+        """Return all festivals with ``start <= date <= end``."""
+        lo = bisect_left(self._ordinals, start.toordinal())
+        hi = bisect_right(self._ordinals, end.toordinal(), lo)
+        return [self._festival(i) for i in range(lo, hi)]
+
+    def festivals(self) -> List[FestivalInfo]:
+        return [self._festival(i) for i in range(len(self._ordinals))]
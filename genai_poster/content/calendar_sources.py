@@ -0,0 +1,131 @@
+"""
+Several ICS feeds (national, regional, company holidays) read as one calendar.
+
+A calendar spec lists sources, each an ICS URL or file path optionally prefixed with a
+region tag: ``national=https://...; tn=https://...; ./office.ics``. Sources are
+separated by newlines or ``;`` (or given as a list), so spaces in paths and commas in a
+feed's query string are kept.
+Feeds are fetched concurrently through the shared calendar cache, so remote feeds
+reuse its HTTP session and are revalidated rather than re-downloaded, and each one is
+parsed as it streams in. Whatever has not arrived by the deadline, or failed, is
+served from its last good copy or skipped.
+
+The per-feed indexes are already date-sorted, so they are combined with a k-way heap
+merge. The same festival listed by several feeds (same date, same name after
+normalization) is kept once, tagged with the region of the first source listing it.
+"""
+from __future__ import annotations
+import functools
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+from genai_poster.content.calendar_cache import CalendarCache, get_calendar_cache
+from genai_poster.content.calendar_index import FestivalIndex
+from genai_poster.config.settings import CALENDAR_WORKERS, CALENDAR_SOURCE_DEADLINE
+from genai_poster.utils.metrics import count, timed
+
+LOG = logging.getLogger(__name__)
+
+class CalendarSource(NamedTuple):
+    url: str
+    region: Optional[str] = None
+
+_REGION_PREFIX = re.compile(r"^([\w.-]+)=(.+)$")
+_SEPARATOR = re.compile(r"[;\r\n]")
+
+def parse_calendar_sources(spec: Union[str, Sequence[str]]) -> List[CalendarSource]:
+    """Split a calendar spec (or a list of entries) into sources, in priority order."""
+    items = _SEPARATOR.split(spec) if isinstance(spec, str) else spec
+    sources = []
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        m = _REGION_PREFIX.match(item)
+        sources.append(CalendarSource(m.group(2).strip(), m.group(1)) if m else CalendarSource(item))
+    return sources
+
+@functools.lru_cache(maxsize=4096)
+def normalize_name(name: str) -> str:
+    """Case-, accent-, punctuation- and emoji-insensitive festival name used to spot duplicates."""
+    text = unicodedata.normalize("NFKD", name.casefold())
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text if not unicodedata.combining(ch)).split())
+
+def _stream(priority: int, region: Optional[str], index: FestivalIndex) -> Iterator[Tuple[int, int, int, str, Optional[str]]]:
+    # (date, feed priority, position in feed) is unique, so names and regions are never compared.
+    for i, (ordinal, name) in enumerate(index):
+        yield ordinal, priority, i, name, region
+
+def merge_indexes(indexes: Sequence[Tuple[Optional[str], FestivalIndex]]) -> FestivalIndex:
+    """
+    Merge ``(region, index)`` pairs into one date-ordered index. Within a date, earlier
+    pairs win: a festival already taken from one feed is dropped from the later ones.
+    """
+    streams = [_stream(priority, region, index) for priority, (region, index) in enumerate(indexes)]
+    ordinals: List[int] = []
+    names: List[str] = []
+    regions: List[Optional[str]] = []
+    day: Optional[int] = None
+    seen: Set[str] = set()
+    duplicates = 0
+    for ordinal, _, _, name, region in heapq.merge(*streams):
+        if ordinal != day:
+            day, seen = ordinal, set()
+        key = normalize_name(name)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        ordinals.append(ordinal)
+        names.append(name)
+        regions.append(region)
+    if duplicates:
+        count("calendar_duplicates_total", duplicates)
+    return FestivalIndex(ordinals, names, regions)
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_fetch_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, CALENDAR_WORKERS), thread_name_prefix="calendar")
+        return _pool
+
+def load_calendars(sources: Sequence[CalendarSource], deadline: float = CALENDAR_SOURCE_DEADLINE,
+                   cache: Optional[CalendarCache] = None) -> FestivalIndex:
+    """
+    Fetch ``sources`` concurrently and merge them. A feed still loading after
+    ``deadline`` seconds keeps running in the background (refreshing the cache for the
+    next run) while this run uses its last good copy.
+    """
+    cache = cache or get_calendar_cache()
+    pool = get_fetch_pool()
+    futures = {pool.submit(cache.get, source.url): source for source in sources}
+    done, _ = wait(futures, timeout=deadline)
+
+    indexes: List[Tuple[Optional[str], FestivalIndex]] = []
+    for future, source in futures.items():
+        if future in done and future.exception() is None:
+            count("calendar_sources_total", result="fresh")
+            indexes.append((source.region, future.result()))
+            continue
+        reason = f"not loaded within {deadline:g}s" if future not in done else f"failed: {future.exception()}"
+        index = cache.last_good(source.url)
+        if index is None:
+            count("calendar_sources_total", result="skipped")
+            LOG.warning("Calendar %s %s; no earlier copy, skipping it", source.url, reason)
+            continue
+        count("calendar_sources_total", result="stale")
+        LOG.warning("Calendar %s %s; using its last good copy", source.url, reason)
+        indexes.append((source.region, index))
+
+    if not indexes:
+        raise RuntimeError("None of the calendar sources could be loaded.")
+    with timed("calendar_merge_seconds", sources=len(indexes)):
+        return merge_indexes(indexes)
@@ -1,51 +1,104 @@
 from __future__ import annotations
 import datetime as dt
-from typing import List, Optional
-from ics import Calendar
-import requests
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 from genai_poster.models import FestivalInfo
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-
-def fetch_festivals_from_calendar(url: str) -> List[FestivalInfo]:
+from genai_poster.content.calendar_cache import get_calendar_cache
+from genai_poster.content.calendar_index import FestivalIndex
+from genai_poster.content.calendar_sources import parse_calendar_sources, load_calendars
+from genai_poster.config.settings import CALENDAR_TIMEOUT, DRAFT_CACHE_TTL, DRAFT_CACHE_SIZE, DRAFT_CACHE_DB
+from genai_poster.utils.pool import ClientPool
+from genai_poster.utils.cache import ResponseCache, MemoryCache, SQLiteCache, TieredCache, canonical_hash
+from genai_poster.utils.metrics import timed
+
+if TYPE_CHECKING:
+    # The LangChain/OpenAI stack takes about a second to import; it is loaded on first use.
+    from langchain_core.messages import BaseMessage
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+def parse_calendar(data: str) -> List[FestivalInfo]:
+    """Parse ICS text into a date-ordered FestivalInfo list."""
+    return FestivalIndex.from_lines(data.splitlines()).festivals()
+
+def load_festival_index(url: str, use_cache: bool = True) -> FestivalIndex:
     """
-    Fetch events from an ICS calendar (public URL or local file) and convert to FestivalInfo list.
+    Load an ICS calendar (public URL or local file) into a date-sorted FestivalIndex.
+    Results are served from the on-disk calendar cache unless the source has changed.
     """
-    if url.startswith("http"):
-        r = requests.get(url)
-        r.raise_for_status()
-        data = r.text
-    else:
+    with timed("calendar_fetch_seconds", remote=url.startswith("http")):
+        if use_cache:
+            return get_calendar_cache().get(url)
+
+        if url.startswith("http"):
+            import requests
+            with requests.get(url, timeout=CALENDAR_TIMEOUT, stream=True) as r:
+                r.raise_for_status()
+                if r.encoding is None:
+                    r.encoding = "utf-8"
+                return FestivalIndex.from_lines(r.iter_lines(decode_unicode=True))
         with open(url, "r", encoding="utf-8") as f:
-            data = f.read()
-
-    cal = Calendar(data)
-    festivals: List[FestivalInfo] = []
-    for event in cal.events:
-        if not event.begin:
-            continue
-        date = event.begin.date()
-        festivals.append(FestivalInfo(
-            name=event.name,
-            date=date,
-            region=None,
-            emoji=None,
-            colors=None,
-        ))
-    return festivals
+            return FestivalIndex.from_lines(f)
 
-def get_upcoming_festival(today: dt.date, calendar_url: str) -> Optional[FestivalInfo]:
-    festivals = fetch_festivals_from_calendar(calendar_url)
-    upcoming = [f for f in festivals if f.date >= today]
-    if not upcoming:
-        return None
-    upcoming.sort(key=lambda f: f.date)
-    return upcoming[1]
+def fetch_festivals_from_calendar(url: str, use_cache: bool = True) -> List[FestivalInfo]:
+    """
+    Fetch events from an ICS calendar (public URL or local file) and convert to FestivalInfo list.
+    """
+    return load_festival_index(url, use_cache=use_cache).festivals()
 
-def make_llm(model: str) -> ChatOpenAI:
-    return ChatOpenAI(model=model, temperature=0.7)
+def load_calendar(spec: str) -> FestivalIndex:
+    """
+    Load a calendar spec: one ICS source, or several (separated by newlines or ``;``) with optional
+    ``region=`` tags, fetched concurrently and merged (see calendar_sources).
+    """
+    sources = parse_calendar_sources(spec)
+    if not sources:
+        raise RuntimeError("No calendar source given.")
+    if len(sources) == 1 and sources[0].region is None:
+        return load_festival_index(sources[0].url)
+    with timed("calendar_fetch_seconds", remote=any(s.url.startswith("http") for s in sources)):
+        return load_calendars(sources)
 
-POST_PROMPT = ChatPromptTemplate.from_messages([
+def get_upcoming_festival(today: dt.date, calendar_url: str) -> Optional[FestivalInfo]:
+    return load_calendar(calendar_url).next_on_or_after(today, offset=1)
+
+def make_llm(model: str, api_key: Optional[str] = None) -> ChatOpenAI:
+    from langchain_openai import ChatOpenAI
+    # stream_usage keeps token counts available when the completion is streamed to the UI.
+    return ChatOpenAI(model=model, temperature=0.7, api_key=api_key, stream_usage=True)
+
+_LLM_POOL: ClientPool[ChatOpenAI] = ClientPool("llm", lambda key: make_llm(*key))
+
+def get_llm(model: str, api_key: Optional[str] = None) -> ChatOpenAI:
+    """Return a pooled chat model for (model, api_key), reusing its HTTP connections across runs."""
+    return _LLM_POOL.get((model, api_key))
+
+def draft_cache_key(model: str, messages: List[BaseMessage]) -> str:
+    """Canonical hash of the formatted prompt messages and the model name."""
+    return canonical_hash(model, [[m.type, m.content] for m in messages])
+
+_draft_cache: Optional[ResponseCache] = None
+_draft_lock = threading.Lock()
+
+def get_draft_cache() -> ResponseCache:
+    """Process-wide LLM response cache: an in-memory LRU tier plus an optional SQLite tier."""
+    global _draft_cache
+    with _draft_lock:
+        if _draft_cache is None:
+            tiers: List[ResponseCache] = [MemoryCache(DRAFT_CACHE_SIZE, ttl=DRAFT_CACHE_TTL)]
+            if DRAFT_CACHE_DB:
+                tiers.append(SQLiteCache(Path(DRAFT_CACHE_DB), ttl=DRAFT_CACHE_TTL, table="drafts"))
+            _draft_cache = TieredCache(tiers)
+        return _draft_cache
+
+def set_draft_cache(cache: ResponseCache) -> None:
+    """Replace the draft cache (e.g. with a shared or no-op backend)."""
+    global _draft_cache
+    with _draft_lock:
+        _draft_cache = cache
+
+POST_PROMPT_MESSAGES = [
     ("system",
      """You are a world-class creative director and social media strategist, specializing in crafting emotionally resonant and culturally aware content for a discerning professional audience on LinkedIn.
 
@@ -79,7 +132,17 @@ Your writing should always reflect the brand’s core values and tone, prioritiz
 3.  **The Call-to-Action (1 line):** End with a warm, inviting CTA that encourages engagement (e.g., sharing stories, reflections, or visiting a link).
 
 **Crucially, ensure your content is original, culturally respectful, and aligns with the highest professional and ethical standards."""),
-])
+]
+
+_post_prompt: Optional[ChatPromptTemplate] = None
+
+def get_post_prompt() -> ChatPromptTemplate:
+    """The post-writing prompt, built on first use so importing this module stays cheap."""
+    global _post_prompt
+    if _post_prompt is None:
+        from langchain_core.prompts import ChatPromptTemplate
+        _post_prompt = ChatPromptTemplate.from_messages(POST_PROMPT_MESSAGES)
+    return _post_prompt
 
 
 BANNER_PROMPT_TMPL = """Create a visually stunning, clean, and modern LinkedIn banner that celebrates {festival_name} for a sophisticated Indian professional audience. The design should be a masterpiece of minimalist elegance, blending cultural authenticity with a contemporary corporate aesthetic.
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from genai_poster.config.settings import (
+    CACHE_DIR, RESEARCH_FIXTURES, RESEARCH_TTL, RESEARCH_STALE_TTL, RESEARCH_WORKERS,
+)
+from genai_poster.utils.cache import ResponseCache, MemoryCache, SQLiteCache, TieredCache, canonical_hash
+from genai_poster.utils.metrics import count
+
+LOG = logging.getLogger(__name__)
+
+def _slug(brand_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", brand_name.lower()).strip("_")
+
+class ResearchProvider:
+    """Returns background research on a brand as prompt-ready text ("" when nothing is known)."""
+
+    name = "base"
+
+    def lookup(self, brand_name: str) -> str:
+        raise NotImplementedError
+
+class GoogleSearchProvider(ResearchProvider):
+    name = "google"
+
+    def __init__(self, num_results: int = 5):
+        self.num_results = num_results
+
+    def lookup(self, brand_name: str) -> str:
+        try:
+            from googlesearch import search
+        except ImportError:
+            raise RuntimeError("googlesearch-python is not installed. Please install it with `pip install googlesearch-python`")
+
+        query = f"{brand_name} company profile"
+        search_results = ""
+        for url in search(query, num_results=self.num_results):
+            search_results += f"- {url}\n"
+        return search_results
+
+class FileResearchProvider(ResearchProvider):
+    """
+    Offline provider backed by local fixtures: either a JSON/YAML file mapping brand
+    names to text (or lists of lines), or a directory of ``<brand_slug>.txt``/``.md`` files.
+    """
+
+    name = "file"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._data: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._data is None:
+            if self.path.suffix in (".yaml", ".yml"):
+                import yaml
+                raw = yaml.safe_load(self.path.read_text(encoding="utf-8")) or {}
+            else:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._data = {
+                _slug(k): "\n".join(f"- {line}" for line in v) + "\n" if isinstance(v, list) else str(v)
+                for k, v in raw.items()
+            }
+        return self._data
+
+    def lookup(self, brand_name: str) -> str:
+        slug = _slug(brand_name)
+        if self.path.is_dir():
+            for suffix in (".txt", ".md"):
+                candidate = self.path / f"{slug}{suffix}"
+                if candidate.exists():
+                    return candidate.read_text(encoding="utf-8")
+            return ""
+        return self._load().get(slug, "")
+
+class CachedResearchProvider(ResearchProvider):
+    """
+    Persistent per-brand cache in front of another provider.
+
+    Entries younger than ``ttl`` are served directly. Entries up to ``ttl + stale_ttl``
+    old are served immediately while a background refresh runs (stale-while-revalidate).
+    Concurrent lookups for the same brand share one in-flight fetch, and ``prefetch``
+    starts a lookup ahead of time so the research step never blocks the critical path.
+    """
+
+    def __init__(self, inner: ResearchProvider, cache: ResponseCache,
+                 ttl: float = RESEARCH_TTL, stale_ttl: float = RESEARCH_STALE_TTL,
+                 workers: int = RESEARCH_WORKERS):
+        self.inner = inner
+        self.name = f"cached-{inner.name}"
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="research")
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, brand_name: str) -> str:
+        return canonical_hash("research", self.inner.name, _slug(brand_name))
+
+    def _fetch(self, key: str, brand_name: str) -> str:
+        try:
+            text = self.inner.lookup(brand_name)
+            self.cache.set(key, json.dumps({"text": text, "stored_at": time.time()}))
+            return text
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch_async(self, key: str, brand_name: str) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._fetch, key, brand_name)
+                self._inflight[key] = future
+            return future
+
+    def prefetch(self, brand_name: str) -> Optional[Future]:
+        """Warm the cache in the background unless a fresh entry already exists."""
+        key = self._key(brand_name)
+        cached = self.cache.get(key)
+        if cached is not None and time.time() - json.loads(cached)["stored_at"] < self.ttl:
+            return None
+        return self._fetch_async(key, brand_name)
+
+    def lookup(self, brand_name: str) -> str:
+        key = self._key(brand_name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            entry = json.loads(cached)
+            age = time.time() - entry["stored_at"]
+            if age < self.ttl:
+                count("cache_requests_total", cache="research", result="hit")
+                return entry["text"]
+            if age < self.ttl + self.stale_ttl:
+                count("cache_requests_total", cache="research", result="stale")
+                LOG.info("Serving stale research for %s while refreshing", brand_name)
+                self._fetch_async(key, brand_name)
+                return entry["text"]
+        count("cache_requests_total", cache="research", result="miss")
+        return self._fetch_async(key, brand_name).result()
+
+_default_provider: Optional[CachedResearchProvider] = None
+_default_lock = threading.Lock()
+
+def get_research_provider() -> CachedResearchProvider:
+    """Process-wide provider: local fixtures when RESEARCH_FIXTURES is set, else live search; always cached."""
+    global _default_provider
+    with _default_lock:
+        if _default_provider is None:
+            inner: ResearchProvider = (
+                FileResearchProvider(Path(RESEARCH_FIXTURES)) if RESEARCH_FIXTURES else GoogleSearchProvider()
+            )
+            max_age = RESEARCH_TTL + RESEARCH_STALE_TTL
+            cache = TieredCache([
+                MemoryCache(256, ttl=max_age),
+                SQLiteCache(CACHE_DIR / "research.sqlite3", ttl=max_age, table="research"),
+            ])
+            _default_provider = CachedResearchProvider(inner, cache)
+        return _default_provider
+
+def set_research_provider(provider: CachedResearchProvider) -> None:
+    global _default_provider
+    with _default_lock:
+        _default_provider = provider
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from genai_poster.config.settings import DOWNLOAD_DIR, BANNER_CACHE_MAX_BYTES
+
+LOG = logging.getLogger(__name__)
+
+def banner_cache_key(prompt: str, image_model: str, width: int, height: int) -> str:
+    h = hashlib.sha256()
+    for part in (prompt, image_model, str(width), str(height)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+class BannerCache:
+    """
+    Content-addressed PNG store: ``<root>/<sha256>.png``.
+
+    Files are never rewritten in place, so a path always identifies the same image.
+    Recency is tracked through file mtimes; once the store grows past ``max_bytes``
+    the least recently used banners are deleted, together with their sized variants
+    under ``<root>/variants/``.
+    """
+
+    def __init__(self, root: Path = DOWNLOAD_DIR / "banners", max_bytes: int = BANNER_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        LOG.info("Banner cache hit: %s", path.name)
+        return path
+
+    def put(self, key: str, png: bytes) -> Path:
+        path = self.path_for(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """
+        Delete least recently used banners, with their sized variants, until the store
+        fits ``max_bytes``; returns bytes freed.
+        """
+        with self._lock:
+            variants: Dict[str, List[Tuple[int, Path]]] = {}
+            for v in (self.root / "variants").glob("*"):
+                try:
+                    variants.setdefault(v.name.split("-", 1)[0], []).append((v.stat().st_size, v))
+                except FileNotFoundError:
+                    continue
+            entries = []
+            total = 0
+            for p in self.root.glob("*.png"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                size = st.st_size + sum(n for n, _ in variants.get(p.stem, ()))
+                entries.append((st.st_mtime, size, p))
+                total += size
+            freed = 0
+            entries.sort()
+            for _, size, p in entries:
+                if total - freed <= self.max_bytes:
+                    break
+                if keep is not None and p == keep:
+                    continue
+                try:
+                    p.unlink()
+                    freed += size
+                except FileNotFoundError:
+                    continue
+                for _, v in variants.get(p.stem, ()):
+                    v.unlink(missing_ok=True)
+            if freed:
+                LOG.info("Banner cache evicted %d bytes", freed)
+            return freed
+
+_default_cache: Optional[BannerCache] = None
+_default_lock = threading.Lock()
+
+def get_banner_cache() -> BannerCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = BannerCache()
+        return _default_cache
@@ -0,0 +1,158 @@
+"""
+Template-based banner renderer: a fast, offline alternative to the image API.
+
+A banner is a palette gradient with soft festive motifs (cached per palette and
+size), a headline, the brand name and an optional logo in the bottom-right slot.
+Fonts, background layers and decoded logos are cached in memory, so after the
+first banner of a given size only the text is drawn and the PNG encoded.
+"""
+from __future__ import annotations
+import functools
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+from genai_poster.models import FestivalInfo
+from genai_poster.config.settings import BANNER_FONT
+
+LOG = logging.getLogger(__name__)
+
+RGB = Tuple[int, int, int]
+
+DEFAULT_PALETTE = ("#1B2A49", "#7A3E65", "#E8B04B")
+TEXT_COLOR: RGB = (255, 255, 255)
+MAX_LAYERS = 32
+
+def parse_palette(colors: Optional[Sequence[str]]) -> List[RGB]:
+    """Resolve CSS colour names/hex codes, skipping unknown names; pads to three colours."""
+    palette: List[RGB] = []
+    for color in colors or ():
+        try:
+            palette.append(ImageColor.getrgb(color.strip())[:3])
+        except (ValueError, AttributeError):
+            LOG.debug("Ignoring unknown banner colour %r", color)
+    palette += [ImageColor.getrgb(c)[:3] for c in DEFAULT_PALETTE[len(palette):]]
+    return palette[:3]
+
+@functools.lru_cache(maxsize=32)
+def load_font(size: int, path: Optional[str] = BANNER_FONT) -> ImageFont.FreeTypeFont:
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError as e:
+            LOG.warning("Banner font %s unavailable (%s); using the bundled font", path, e)
+    return ImageFont.load_default(size)
+
+def _text_width(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont) -> int:
+    left, _, right, _ = draw.textbbox((0, 0), text, font=font)
+    return right - left
+
+def fit_font(draw: ImageDraw.ImageDraw, text: str, max_width: int, start: int, minimum: int = 16) -> ImageFont.FreeTypeFont:
+    """Largest cached font size (stepping down by ~10%) at which ``text`` fits ``max_width``."""
+    size = start
+    while size > minimum and _text_width(draw, text, load_font(size)) > max_width:
+        size = max(minimum, int(size * 0.9))
+    return load_font(size)
+
+class BannerRenderer:
+    """Renders festival banners in-process; safe to share across threads."""
+
+    def __init__(self, max_layers: int = MAX_LAYERS):
+        self.max_layers = max_layers
+        self._layers: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key: tuple, build) -> Image.Image:
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is not None:
+                self._layers.move_to_end(key)
+                return layer
+        layer = build()
+        with self._lock:
+            self._layers[key] = layer
+            while len(self._layers) > self.max_layers:
+                self._layers.popitem(last=False)
+        return layer
+
+    def background(self, palette: Sequence[RGB], width: int, height: int) -> Image.Image:
+        return self._cached(("bg", tuple(palette), width, height),
+                            lambda: self._build_background(palette, width, height))
+
+    @staticmethod
+    def _build_background(palette: Sequence[RGB], width: int, height: int) -> Image.Image:
+        top, bottom, accent = palette[0], palette[1], palette[2]
+        mask = Image.linear_gradient("L").resize((width, height))
+        bg = Image.composite(Image.new("RGB", (width, height), bottom), Image.new("RGB", (width, height), top), mask)
+
+        # Soft concentric "lamp glow" motifs in the accent colour, kept away from the centre text.
+        motifs = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(motifs)
+        unit = min(width, height)
+        for cx, cy, r in ((0.12, 0.14, 0.22), (0.9, 0.2, 0.14), (0.08, 0.86, 0.12), (0.82, 0.9, 0.26)):
+            x, y, radius = cx * width, cy * height, r * unit
+            for step, alpha in ((1.0, 40), (0.7, 60), (0.4, 90)):
+                rr = radius * step
+                draw.ellipse((x - rr, y - rr, x + rr, y + rr), fill=accent + (alpha,))
+        motifs = motifs.filter(ImageFilter.GaussianBlur(unit / 80))
+        bg = bg.convert("RGBA")
+        bg.alpha_composite(motifs)
+
+        # Thin accent rule under the headline area.
+        rule = ImageDraw.Draw(bg)
+        rule.rectangle((width * 0.3, height * 0.585, width * 0.7, height * 0.585 + max(2, unit // 200)),
+                       fill=accent + (255,))
+        return bg.convert("RGB")
+
+    def logo(self, path: str, box: int) -> Optional[Image.Image]:
+        def build():
+            with Image.open(path) as img:
+                logo = img.convert("RGBA")
+            logo.thumbnail((box, box))
+            return logo
+        try:
+            return self._cached(("logo", path, box), build)
+        except OSError as e:
+            LOG.warning("Could not load logo %s: %s", path, e)
+            return None
+
+    def render(self, festival: FestivalInfo, brand_name: Optional[str] = None, width: int = 1024,
+               height: int = 1024, logo_path: Optional[str] = None) -> bytes:
+        """Render a banner and return PNG bytes."""
+        img = self.background(parse_palette(festival.colors), width, height).copy()
+        draw = ImageDraw.Draw(img)
+        margin = int(width * 0.08)
+
+        headline = f"Happy {festival.name}!"
+        font = fit_font(draw, headline, width - 2 * margin, start=int(height * 0.11))
+        draw.text((width / 2, height * 0.5), headline, font=font, fill=TEXT_COLOR, anchor="ms",
+                  stroke_width=max(1, font.size // 40), stroke_fill=(0, 0, 0))
+
+        sub_font = load_font(max(14, int(height * 0.035)))
+        draw.text((width / 2, height * 0.64), festival.date.strftime("%d %B %Y"), font=sub_font,
+                  fill=TEXT_COLOR, anchor="ma")
+        if brand_name:
+            brand_font = fit_font(draw, brand_name, width // 2, start=max(16, int(height * 0.045)))
+            draw.text((margin, height - margin), brand_name, font=brand_font, fill=TEXT_COLOR, anchor="ls")
+
+        # Logo slot: bottom-right square, left empty when no logo is configured.
+        box = int(min(width, height) * 0.14)
+        logo = self.logo(logo_path, box) if logo_path else None
+        if logo is not None:
+            img.paste(logo, (width - margin - logo.width, height - margin - logo.height), logo)
+
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", compress_level=1)
+        return buf.getvalue()
+
+_default_renderer: Optional[BannerRenderer] = None
+_default_lock = threading.Lock()
+
+def get_banner_renderer() -> BannerRenderer:
+    global _default_renderer
+    with _default_lock:
+        if _default_renderer is None:
+            _default_renderer = BannerRenderer()
+        return _default_renderer
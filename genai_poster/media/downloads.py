@@ -0,0 +1,204 @@
+"""
+Serving and housekeeping for DOWNLOAD_DIR (banners, their variants, pinned drafts).
+
+``DownloadStore.open`` resolves a request path to a ``Download`` carrying a strong
+ETag and whether the file is immutable; the route streams the file itself from disk.
+Banners and their variants are content-named (the name starts with the banner's
+SHA-256 key and files are never rewritten in place), so their ETag is derived from the
+name and clients may cache them indefinitely; any other file gets a content hash and
+must be revalidated. Content hashes are cached per path and reused only while the
+file's inode, size and modification time are unchanged.
+
+``DownloadJanitor`` keeps DOWNLOAD_DIR under a disk quota by deleting the least
+recently modified files. ``scheduled/`` (banners pinned for pre-generated drafts)
+counts towards the quota but is never deleted. A banner deleted under a checkpointed
+run is made again by the publish step when the run resumes (see restore_banner).
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from genai_poster.config.settings import DOWNLOAD_DIR, DOWNLOADS_MAX_BYTES, DOWNLOADS_JANITOR_INTERVAL
+from genai_poster.utils.metrics import count
+
+LOG = logging.getLogger(__name__)
+
+_CONTENT_NAMED = re.compile(r"^[0-9a-f]{64}[-.]")
+
+class Download(NamedTuple):
+    path: Path
+    size: int
+    mtime: float
+    etag: str
+    immutable: bool
+
+def is_content_named(path: Path) -> bool:
+    return bool(_CONTENT_NAMED.match(path.name))
+
+class DownloadStore:
+    """Resolves download paths and caches the content-hash ETags of mutable files."""
+
+    def __init__(self, root: Path = DOWNLOAD_DIR, max_etags: int = 4096):
+        self.root = Path(root).resolve()
+        self.max_etags = max_etags
+        # path -> ((inode, size, mtime_ns), etag)
+        self._etags: "OrderedDict[str, Tuple[Tuple[int, int, int], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Absolute path for ``name`` if it lies inside the root and is not a hidden (temporary) file."""
+        path = (self.root / name).resolve()
+        if self.root not in path.parents or any(part.startswith(".") for part in path.relative_to(self.root).parts):
+            return None
+        return path
+
+    def open(self, name: str) -> Optional[Download]:
+        path = self.resolve(name)
+        if path is None:
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            self.discard(path)
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        immutable = is_content_named(path)
+        try:
+            etag = self._etag(path, st, immutable)
+        except OSError:
+            return None
+        count("download_requests_total")
+        return Download(path, st.st_size, st.st_mtime, etag, immutable)
+
+    def discard(self, path: Path) -> None:
+        with self._lock:
+            self._etags.pop(str(path), None)
+
+    def _etag(self, path: Path, st: os.stat_result, immutable: bool) -> str:
+        if immutable:
+            # The name identifies the content; the size guards against a truncated copy.
+            return f"{path.stem}-{st.st_size}"
+        key, sig = str(path), (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._etags.get(key)
+            if cached is not None and cached[0] == sig:
+                self._etags.move_to_end(key)
+                return cached[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        etag = h.hexdigest()[:32]
+        with self._lock:
+            self._etags[key] = (sig, etag)
+            self._etags.move_to_end(key)
+            while len(self._etags) > self.max_etags:
+                self._etags.popitem(last=False)
+        return etag
+
+class DownloadJanitor:
+    """Deletes the least recently modified files under ``root`` until it fits ``max_bytes``."""
+
+    def __init__(self, root: Path = DOWNLOAD_DIR, max_bytes: int = DOWNLOADS_MAX_BYTES,
+                 protect: Sequence[str] = ("scheduled",), min_age: float = 600.0,
+                 store: Optional[DownloadStore] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.protect = set(protect)
+        # Files younger than this may belong to a run that has not published yet.
+        self.min_age = min_age
+        self.store = store
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _files(self) -> Tuple[int, List[Tuple[float, int, Path]]]:
+        """Total bytes under root (protected files included) and the deletable files as ``(mtime, size, path)``."""
+        total = 0
+        candidates = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                total += st.st_size
+                if not self._protected(path):
+                    candidates.append((st.st_mtime, st.st_size, path))
+        return total, candidates
+
+    def _protected(self, path: Path) -> bool:
+        parts = path.relative_to(self.root).parts
+        return len(parts) > 1 and parts[0] in self.protect
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete files until DOWNLOAD_DIR fits the quota; returns bytes freed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            total, candidates = self._files()
+            freed = 0
+            candidates.sort()
+            for mtime, size, path in candidates:
+                if total - freed <= self.max_bytes:
+                    break
+                if now - mtime < self.min_age:
+                    break  # sorted by age, so everything after is younger too
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                freed += size
+                if self.store is not None:
+                    self.store.discard(path.resolve())
+            if freed:
+                count("download_janitor_bytes_total", freed)
+                LOG.info("Download janitor freed %d bytes (%d bytes over quota)", freed, max(0, total - self.max_bytes))
+            return freed
+
+    def start(self, interval: float = DOWNLOADS_JANITOR_INTERVAL) -> None:
+        """Sweep every ``interval`` seconds on a daemon thread; no-op if already running or interval <= 0."""
+        if interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.sweep()
+                except Exception as e:
+                    LOG.warning("Download janitor sweep failed: %s", e)
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="download-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+_default_store: Optional[DownloadStore] = None
+_default_janitor: Optional[DownloadJanitor] = None
+_default_lock = threading.Lock()
+
+def get_download_store() -> DownloadStore:
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = DownloadStore()
+        return _default_store
+
+def get_download_janitor() -> DownloadJanitor:
+    global _default_janitor
+    store = get_download_store()
+    with _default_lock:
+        if _default_janitor is None:
+            _default_janitor = DownloadJanitor(store=store)
+        return _default_janitor
@@ -2,27 +2,42 @@ from __future__ import annotations
 import base64
 import logging
 from pathlib import Path
+from typing import Optional
+from genai_poster.utils.pool import ClientPool
+from genai_poster.utils.metrics import timed, count
 
 LOG = logging.getLogger(__name__)
 
-def generate_image_bytes(prompt: str, width: int, height: int, image_model: str) -> bytes:
-    """Calls OpenAI Image API and returns raw PNG bytes."""
+def _make_client(api_key: Optional[str]):
     try:
         from openai import OpenAI
     except Exception as e:
         raise RuntimeError("openai Python package is required. Install with `pip install openai`. ") from e
+    return OpenAI(api_key=api_key)
 
-    client = OpenAI()
+# The OpenAI client closes its HTTP connections when collected, so no finalizer is needed.
+_CLIENT_POOL = ClientPool("openai-image", _make_client)
+
+def generate_image_bytes(prompt: str, width: int, height: int, image_model: str,
+                         api_key: Optional[str] = None, timeout: Optional[float] = None) -> bytes:
+    """Calls OpenAI Image API and returns raw PNG bytes. ``timeout`` bounds the request (seconds, no retries)."""
+    client = _CLIENT_POOL.get(api_key)
     LOG.info("Generating image via %s ...", image_model)
-    img = client.images.generate(
-        model=image_model,
-        prompt=prompt,
-        size=f"{width}x{height}",
-        n=1
-    )
-    
-    b64 = img.data[0].b64_json
-    return base64.b64decode(b64)
+    with timed("image_request_seconds", model=image_model) as span:
+        if timeout is not None:
+            client = client.with_options(timeout=timeout, max_retries=0)
+        img = client.images.generate(
+            model=image_model,
+            prompt=prompt,
+            size=f"{width}x{height}",
+            n=1
+        )
+
+        b64 = img.data[0].b64_json
+        png = base64.b64decode(b64)
+        span["bytes"] = len(png)
+    count("image_bytes_total", len(png), model=image_model)
+    return png
 
 def save_png(png_bytes: bytes, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
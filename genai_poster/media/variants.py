@@ -0,0 +1,144 @@
+"""
+Platform-sized banner variants derived from one source image.
+
+Each variant is a centre crop to the target aspect ratio, resized with Lanczos and
+encoded as optimized JPEG or WebP. With ``max_bytes`` set, the highest quality at or
+below ``quality`` that fits the budget is chosen by binary search. Encoding is
+CPU-bound, so it runs on a process pool instead of the threads running workflow
+nodes. Variants are written next to their source under ``variants/`` and reused
+while they exist.
+"""
+from __future__ import annotations
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+from PIL import Image, ImageOps
+from genai_poster.config.settings import VARIANT_WORKERS
+
+LOG = logging.getLogger(__name__)
+
+class Variant(NamedTuple):
+    name: str
+    width: int
+    height: int
+    format: str = "JPEG"
+    quality: int = 85
+    min_quality: int = 60
+    max_bytes: Optional[int] = None
+
+    @property
+    def suffix(self) -> str:
+        return ".webp" if self.format == "WEBP" else ".jpg"
+
+    @property
+    def tag(self) -> str:
+        budget = f"-{self.max_bytes // 1024}k" if self.max_bytes else ""
+        return f"{self.name}-{self.width}x{self.height}-q{self.quality}{budget}"
+
+# LinkedIn feed sizes (square, link/landscape, portrait) plus a WebP preview for the web UI.
+# LinkedIn image uploads accept JPEG/PNG/GIF, so upload variants are JPEG.
+VARIANTS: Dict[str, Variant] = {v.name: v for v in (
+    Variant("square", 1080, 1080, max_bytes=300 * 1024),
+    Variant("landscape", 1200, 627, max_bytes=250 * 1024),
+    Variant("portrait", 1080, 1350, max_bytes=350 * 1024),
+    Variant("preview", 540, 540, format="WEBP", quality=80, max_bytes=60 * 1024),
+)}
+
+def variant_path(source: Path, variant: Variant) -> Path:
+    return source.parent / "variants" / f"{source.stem}-{variant.tag}{variant.suffix}"
+
+def _encode(img: Image.Image, variant: Variant, quality: int) -> bytes:
+    buf = io.BytesIO()
+    if variant.format == "WEBP":
+        img.save(buf, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True, subsampling="4:2:0")
+    return buf.getvalue()
+
+def encode_variant(source: str, variant: Variant) -> Dict[str, Union[str, int, float]]:
+    """Crop, resize and encode one variant of ``source``; runs inside pool workers."""
+    start = time.perf_counter()
+    with Image.open(source) as src:
+        img = ImageOps.fit(src.convert("RGB"), (variant.width, variant.height), Image.LANCZOS)
+
+    quality = variant.quality
+    data = _encode(img, variant, quality)
+    if variant.max_bytes and len(data) > variant.max_bytes:
+        lo, hi, best = variant.min_quality, quality - 1, None
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            candidate = _encode(img, variant, mid)
+            if len(candidate) <= variant.max_bytes:
+                best, lo = (mid, candidate), mid + 1
+            else:
+                hi = mid - 1
+        # Over budget even at min_quality: keep the smallest encoding rather than fail.
+        quality, data = best or (variant.min_quality, _encode(img, variant, variant.min_quality))
+
+    out = variant_path(Path(source), variant)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, out)
+    return {"path": str(out), "bytes": len(data), "quality": quality,
+            "encode_s": round(time.perf_counter() - start, 6)}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_variant_pool() -> ProcessPoolExecutor:
+    """Process-wide encoder pool. Uses spawn so workers never inherit locks held by other threads."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(1, VARIANT_WORKERS),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def make_variants(source: Union[str, os.PathLike], names: Optional[Iterable[str]] = None,
+                  pool: Optional[ProcessPoolExecutor] = None) -> Dict[str, str]:
+    """
+    Return ``{variant name: path}`` for ``names`` (default: all VARIANTS), encoding
+    only the ones not already on disk. Falls back to in-process encoding if the
+    pool is unavailable.
+    """
+    source = Path(source)
+    wanted = [VARIANTS[n] for n in (names if names is not None else VARIANTS)]
+    paths: Dict[str, str] = {}
+    missing = []
+    for v in wanted:
+        out = variant_path(source, v)
+        if out.exists():
+            paths[v.name] = str(out)
+        else:
+            missing.append(v)
+    if not missing:
+        return paths
+
+    # Only pool failures fall back to in-process encoding; encode errors propagate.
+    results = None
+    try:
+        executor = pool or get_variant_pool()
+        futures = {v.name: executor.submit(encode_variant, str(source), v) for v in missing}
+    except (RuntimeError, OSError) as e:
+        unavailable = e
+    else:
+        try:
+            results = {name: f.result() for name, f in futures.items()}
+        except BrokenProcessPool as e:
+            unavailable = e
+    if results is None:
+        LOG.warning("Variant pool unavailable (%s); encoding in-process", unavailable)
+        results = {v.name: encode_variant(str(source), v) for v in missing}
+
+    for name, info in results.items():
+        LOG.info("Banner variant %s: %d bytes (q=%s) in %.3fs", name, info["bytes"], info["quality"], info["encode_s"])
+        paths[name] = str(info["path"])
+    return paths
@@ -1,9 +1,12 @@
 
 from __future__ import annotations
 import datetime as dt
-from typing import List, Optional
-from pydantic import BaseModel, Field
-from genai_poster.config.settings import DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+from genai_poster.config.settings import DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL, BANNER_MODE, BANNER_UPLOAD_VARIANT
+
+# AppConfig fields that must never be written to disk (draft store, checkpoints).
+SECRET_FIELDS = {"openai_api_key", "linkedin_access_token"}
 
 class FestivalInfo(BaseModel):
     name: str
@@ -36,3 +39,29 @@ class AppConfig(BaseModel):
     linkedin_author_urn: str = Field(..., description="urn:li:person:XXXX or urn:li:organization:XXXX")
     openai_model: str = Field(default=DEFAULT_OPENAI_MODEL)
     image_model: str = Field(default=DEFAULT_IMAGE_MODEL)
+    # Request-scoped credentials and sources; fall back to the process environment when unset.
+    openai_api_key: Optional[str] = Field(default=None, repr=False)
+    linkedin_access_token: Optional[str] = Field(default=None, repr=False)
+    calendar_url: Optional[str] = Field(
+        default=None,
+        description="ICS file path or feed URL, or several separated by newlines or ';', each optionally prefixed with region=",
+    )
+    regenerate_post: bool = Field(default=False, description="Bypass the draft cache and call the LLM")
+    regenerate_banner: bool = Field(default=False, description="Bypass the banner cache and call the image API")
+    banner_mode: Literal["api", "local", "fallback"] = Field(
+        default=BANNER_MODE,
+        description="api: image API only; local: Pillow renderer only; fallback: API, local render if it fails or times out",
+    )
+    logo_path: Optional[str] = Field(default=None, description="Logo image for the local renderer's logo slot")
+    # The WebP "preview" variant is for the web UI only; LinkedIn does not accept WebP uploads.
+    upload_variant: Literal["square", "landscape", "portrait", "original"] = Field(
+        default=BANNER_UPLOAD_VARIANT,
+        validate_default=True,
+        description='Banner variant uploaded to LinkedIn (square, landscape, portrait) or "original" for the source PNG',
+    )
+
+    @field_validator("calendar_url", mode="before")
+    @classmethod
+    def join_calendar_sources(cls, value):
+        # Tenant files and JSON payloads may list the sources instead of joining them.
+        return "\n".join(value) if isinstance(value, (list, tuple)) else value
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from genai_poster.models import LinkedInPostResult
+from genai_poster.config.settings import CHECKPOINT_DB
+from genai_poster.utils.cache import canonical_hash
+
+LOG = logging.getLogger(__name__)
+
+PENDING = "pending"
+PUBLISHED = "published"
+
+class PublishOutcomeUnknown(RuntimeError):
+    """A previous attempt for this publish may have reached LinkedIn; retrying could post twice."""
+
+def publish_key(run_id: str, author_urn: str, text: str, banner_path: str) -> str:
+    return canonical_hash("publish", run_id, author_urn, text, banner_path)
+
+class PublishLedger:
+    """
+    Durable record of publish intents and results, used to make the publish step idempotent.
+
+    ``begin`` records a PENDING intent before the LinkedIn calls and returns the stored
+    result if the publish already succeeded. ``complete`` stores the result; ``abort``
+    clears the intent when the post was definitely not created (the failure came before
+    the post request, or LinkedIn rejected it). An intent left PENDING (crash, or no
+    response to the post request) blocks automatic retries until ``forget`` is called
+    for the run (``python main.py forget RUN_ID``), since the post may already be live.
+    """
+
+    def __init__(self, path: Path = CHECKPOINT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS publishes ("
+                " key TEXT PRIMARY KEY, run_id TEXT NOT NULL, status TEXT NOT NULL,"
+                " result TEXT, updated_at REAL NOT NULL)"
+            )
+
+    def begin(self, key: str, run_id: str) -> Optional[LinkedInPostResult]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status, result FROM publishes WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO publishes (key, run_id, status, updated_at) VALUES (?, ?, ?, ?)",
+                    (key, run_id, PENDING, time.time()),
+                )
+                return None
+        status, result = row
+        if status == PUBLISHED:
+            return LinkedInPostResult.model_validate_json(result)
+        raise PublishOutcomeUnknown(
+            f"Run {run_id} has an unconfirmed publish attempt; check LinkedIn, then run "
+            f"`python main.py forget {run_id}` to allow a retry."
+        )
+
+    def complete(self, key: str, result: LinkedInPostResult) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE publishes SET status = ?, result = ?, updated_at = ? WHERE key = ?",
+                (PUBLISHED, result.model_dump_json(), time.time(), key),
+            )
+
+    def abort(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM publishes WHERE key = ? AND status = ?", (key, PENDING))
+
+    def forget(self, run_id: str) -> int:
+        """Drop unconfirmed intents for a run so its publish can be retried."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM publishes WHERE run_id = ? AND status = ?", (run_id, PENDING))
+            return cur.rowcount
+
+_default_ledger: Optional[PublishLedger] = None
+_default_lock = threading.Lock()
+
+def get_publish_ledger() -> PublishLedger:
+    global _default_ledger
+    with _default_lock:
+        if _default_ledger is None:
+            _default_ledger = PublishLedger()
+        return _default_ledger
@@ -1,17 +1,85 @@
 from __future__ import annotations
-from typing import Tuple
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Callable, IO, Optional, Tuple, Union
 import requests
 from genai_poster.models import LinkedInPostResult
+from genai_poster.config.settings import LINKEDIN_API_BASE, HTTP_TIMEOUT, UPLOAD_RETRIES, UPLOAD_BACKOFF
+from genai_poster.utils.pool import ClientPool
+from genai_poster.utils.metrics import timed, count
+
+LOG = logging.getLogger(__name__)
+
+MAX_PENDING_UPLOADS = 128
+
+class LinkedInAPIError(RuntimeError):
+    """A LinkedIn call returned an error status (``status_code`` is None for transport errors)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class RateLimitError(LinkedInAPIError):
+    """LinkedIn answered 429; ``retry_after`` is the server-requested delay in seconds, if any."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, 429)
+        self.retry_after = retry_after
+
+class PostNotConfirmed(LinkedInAPIError):
+    """The post request was sent but no response arrived, so the post may or may not be live."""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def raise_for_linkedin(r: requests.Response, action: str) -> None:
+    if r.status_code < 300:
+        return
+    message = f"LinkedIn {action} failed: {r.status_code} {r.text}"
+    if r.status_code == 429:
+        raise RateLimitError(message, parse_retry_after(r.headers.get("Retry-After")))
+    raise LinkedInAPIError(message, r.status_code)
 
 class LinkedInClient:
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, api_base: str = LINKEDIN_API_BASE):
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {access_token}",
             "X-Restli-Protocol-Version": "2.0.0",
             "Content-Type": "application/json",
         })
-        self.api_base = "https://api.linkedin.com/v2"
+        self.api_base = api_base
+        # (owner_urn, file path) -> (asset_urn, upload_url) registered but not yet uploaded,
+        # so a retried publish reuses the asset instead of registering a new one.
+        self._pending_uploads: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+
+    def _request(self, call: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request on the pooled session, recording its latency and status per ``call``."""
+        with timed("linkedin_request_seconds", call=call) as span:
+            try:
+                r = self.session.request(method, url, timeout=HTTP_TIMEOUT, **kwargs)
+            except requests.RequestException:
+                count("linkedin_responses_total", call=call, status="error")
+                raise
+            span["status"] = r.status_code
+        count("linkedin_responses_total", call=call, status=r.status_code)
+        return r
 
     def register_image_upload(self, owner_urn: str) -> Tuple[str, str]:
         url = f"{self.api_base}/assets?action=registerUpload"
@@ -24,9 +92,8 @@ class LinkedInClient:
                 ],
             }
         }
-        r = self.session.post(url, json=payload)
-        if r.status_code >= 300:
-            raise RuntimeError(f"LinkedIn registerUpload failed: {r.status_code} {r.text}")
+        r = self._request("register_upload", "POST", url, json=payload)
+        raise_for_linkedin(r, "registerUpload")
         data = r.json()
         asset_urn = data.get("value", {}).get("asset")
         upload_url = data.get("value", {}).get("uploadMechanism", {}) \
@@ -36,11 +103,78 @@ class LinkedInClient:
             raise RuntimeError(f"Invalid registerUpload response: {data}")
         return asset_urn, upload_url
 
-    def upload_binary(self, upload_url: str, binary: bytes, content_type: str = "image/png") -> None:
-        headers = {"Content-Type": content_type}
-        r = requests.put(upload_url, data=binary, headers=headers)
-        if r.status_code >= 300:
-            raise RuntimeError(f"LinkedIn binary upload failed: {r.status_code} {r.text}")
+    def _put_with_retry(self, upload_url: str, body: Callable[[], Union[bytes, IO[bytes]]],
+                        headers: dict, retries: int, backoff: float) -> None:
+        """
+        PUT ``body()`` over the pooled session, retrying 5xx and connection errors with
+        exponential backoff. Raises LinkedInAPIError once retries are exhausted
+        (``status_code`` None when the last attempt failed in transport).
+        """
+        for attempt in range(retries + 1):
+            data = body()
+            try:
+                r = self._request("upload", "PUT", upload_url, data=data, headers=headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error: Exception = e
+            else:
+                if r.status_code < 300:
+                    if headers.get("Content-Length"):
+                        count("linkedin_upload_bytes_total", int(headers["Content-Length"]))
+                    return
+                if r.status_code < 500:
+                    raise_for_linkedin(r, "binary upload")
+                error = LinkedInAPIError(f"LinkedIn binary upload failed: {r.status_code} {r.text}", r.status_code)
+            finally:
+                if hasattr(data, "close"):
+                    data.close()
+            if attempt == retries:
+                if isinstance(error, LinkedInAPIError):
+                    raise error
+                raise LinkedInAPIError(f"LinkedIn binary upload failed after {retries + 1} attempts: {error}") from error
+            delay = backoff * (2 ** attempt)
+            LOG.warning("Upload attempt %d failed (%s); retrying in %.1fs", attempt + 1, error, delay)
+            time.sleep(delay)
+
+    def upload_binary(self, upload_url: str, binary: bytes, content_type: str = "image/png",
+                      retries: int = UPLOAD_RETRIES, backoff: float = UPLOAD_BACKOFF) -> None:
+        headers = {"Content-Type": content_type, "Content-Length": str(len(binary))}
+        self._put_with_retry(upload_url, lambda: binary, headers, retries, backoff)
+
+    def upload_file(self, upload_url: str, path: Union[str, os.PathLike], content_type: str = "image/png",
+                    retries: int = UPLOAD_RETRIES, backoff: float = UPLOAD_BACKOFF) -> None:
+        """Stream a file to ``upload_url`` in chunks instead of reading it into memory."""
+        headers = {"Content-Type": content_type, "Content-Length": str(os.path.getsize(path))}
+        self._put_with_retry(upload_url, lambda: open(path, "rb"), headers, retries, backoff)
+
+    def upload_image(self, owner_urn: str, path: Union[str, os.PathLike], content_type: str = "image/png") -> str:
+        """
+        Register (or reuse a pending registration for) an image asset and stream the file to it.
+        Returns the asset URN. A registration is only forgotten once its upload succeeds.
+        """
+        key = (owner_urn, os.fspath(path))
+        with self._pending_lock:
+            registered = self._pending_uploads.get(key)
+        if registered is None:
+            registered = self.register_image_upload(owner_urn)
+            with self._pending_lock:
+                self._pending_uploads[key] = registered
+                while len(self._pending_uploads) > MAX_PENDING_UPLOADS:
+                    self._pending_uploads.popitem(last=False)
+        else:
+            LOG.info("Reusing registered asset %s for retried upload", registered[0])
+
+        asset_urn, upload_url = registered
+        try:
+            self.upload_file(upload_url, path, content_type=content_type)
+        except LinkedInAPIError as e:
+            if e.status_code is not None and e.status_code < 500 and not isinstance(e, RateLimitError):
+                # The upload URL was rejected (e.g. expired); register afresh next time.
+                with self._pending_lock:
+                    self._pending_uploads.pop(key, None)
+            raise
+        with self._pending_lock:
+            self._pending_uploads.pop(key, None)
+        return asset_urn
 
     def create_post_with_image(self, owner_urn: str, asset_urn: str, text: str) -> LinkedInPostResult:
         url = f"{self.api_base}/ugcPosts"
@@ -63,14 +197,23 @@ class LinkedInClient:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
         }
-        r = self.session.post(url, json=payload)
-        if r.status_code >= 300:
-            raise RuntimeError(f"LinkedIn post failed: {r.status_code} {r.text}")
+        try:
+            r = self._request("create_post", "POST", url, json=payload)
+        except requests.RequestException as e:
+            raise PostNotConfirmed(f"LinkedIn post got no response: {e}") from e
+        raise_for_linkedin(r, "post")
         post_urn = r.headers.get("x-restli-id")
         return LinkedInPostResult(post_urn=post_urn, asset_urn=asset_urn, share_url=None)
 
     def get_self_profile(self) -> dict:
         url = f"{self.api_base}/userinfo"
-        r = self.session.get(url)
+        r = self._request("userinfo", "GET", url)
         r.raise_for_status()
         return r.json()
+
+_CLIENT_POOL: ClientPool[LinkedInClient] = ClientPool(
+    "linkedin", lambda key: LinkedInClient(*key), finalizer=lambda client: client.session.close)
+
+def get_linkedin_client(access_token: str, api_base: str = LINKEDIN_API_BASE) -> LinkedInClient:
+    """Return a pooled client (and requests.Session) for the token, shared across runs."""
+    return _CLIENT_POOL.get((access_token, api_base))
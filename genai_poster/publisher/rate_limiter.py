@@ -0,0 +1,252 @@
+from __future__ import annotations
+import contextvars
+import heapq
+import itertools
+import logging
+import mimetypes
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from genai_poster.models import LinkedInPostResult
+from genai_poster.publisher.post_manager import LinkedInClient, RateLimitError, get_linkedin_client
+from genai_poster.config.settings import (
+    PUBLISH_APP_RATE, PUBLISH_APP_BURST, PUBLISH_AUTHOR_RATE, PUBLISH_AUTHOR_BURST,
+    PUBLISH_MAX_ATTEMPTS, PUBLISH_BACKOFF, PUBLISH_WORKERS,
+)
+
+LOG = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens/second up to ``capacity``.
+    ``pause`` blocks the bucket until a deadline (used for Retry-After).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float, now: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+
+class _PublishTask:
+    __slots__ = ("access_token", "author_urn", "banner_path", "text", "priority", "future",
+                 "submitted_at", "attempts", "asset_urn", "context")
+
+    def __init__(self, access_token: str, author_urn: str, banner_path: str, text: str, priority: int):
+        self.access_token = access_token
+        self.author_urn = author_urn
+        self.banner_path = banner_path
+        self.text = text
+        self.priority = priority
+        self.future: "Future[LinkedInPostResult]" = Future()
+        self.submitted_at = time.monotonic()
+        self.attempts = 0
+        self.asset_urn: Optional[str] = None
+        # Submitter's context, so LinkedIn calls are traced under the run that queued them.
+        self.context = contextvars.copy_context()
+
+class PublishScheduler:
+    """
+    Rate-limit-aware publisher on top of LinkedInClient.
+
+    Every publish takes a token from an app-wide bucket and from its author's bucket.
+    A dispatcher thread serves ready posts in priority order (lower value first, then
+    FIFO) and parks posts whose author is out of tokens until the bucket refills, which
+    spreads bursts across the rate window. A 429 pauses the author for ``Retry-After``
+    (or exponential backoff when absent) and halves the app rate; successful publishes
+    restore it gradually.
+    """
+
+    def __init__(self, client_factory: Callable[[str], LinkedInClient] = get_linkedin_client,
+                 app_rate: float = PUBLISH_APP_RATE, app_burst: float = PUBLISH_APP_BURST,
+                 author_rate: float = PUBLISH_AUTHOR_RATE, author_burst: float = PUBLISH_AUTHOR_BURST,
+                 max_attempts: int = PUBLISH_MAX_ATTEMPTS, backoff: float = PUBLISH_BACKOFF,
+                 workers: int = PUBLISH_WORKERS):
+        self.client_factory = client_factory
+        self.max_app_rate = app_rate
+        self.app_bucket = TokenBucket(app_rate, app_burst)
+        self.author_rate = author_rate
+        self.author_burst = author_burst
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._authors: Dict[str, TokenBucket] = {}
+        self._ready: List[Tuple[int, int, _PublishTask]] = []
+        self._delayed: List[Tuple[float, int, _PublishTask]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="publish")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopped = False
+        self._inflight = 0
+        self._started_at: Optional[float] = None
+        self._latencies: "deque[float]" = deque(maxlen=1000)
+        self._counts = {"submitted": 0, "published": 0, "failed": 0, "rate_limited": 0}
+
+    def submit(self, access_token: str, author_urn: str, banner_path: str, text: str,
+               priority: int = 0) -> "Future[LinkedInPostResult]":
+        task = _PublishTask(access_token, author_urn, banner_path, text, priority)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("PublishScheduler is shut down.")
+            if self._started_at is None:
+                self._started_at = task.submitted_at
+            self._counts["submitted"] += 1
+            heapq.heappush(self._ready, (priority, next(self._seq), task))
+            self._ensure_dispatcher()
+            self._cond.notify_all()
+        return task.future
+
+    def publish(self, access_token: str, author_urn: str, banner_path: str, text: str,
+                priority: int = 0, timeout: Optional[float] = None) -> LinkedInPostResult:
+        return self.submit(access_token, author_urn, banner_path, text, priority).result(timeout)
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._ready) + len(self._delayed)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            latencies = sorted(self._latencies)
+            stats: Dict[str, float] = dict(self._counts)
+            stats.update({
+                "queued": len(self._ready) + len(self._delayed),
+                "app_rate": round(self.app_bucket.rate, 4),
+                "throughput_per_s": round(self._counts["published"] / elapsed, 4) if elapsed else 0.0,
+            })
+        if latencies:
+            stats["queue_latency_p50_s"] = round(statistics.median(latencies), 4)
+            stats["queue_latency_p95_s"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4)
+            stats["queue_latency_max_s"] = round(latencies[-1], 4)
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if wait and self._dispatcher is not None:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name="publish-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _author_bucket(self, author_urn: str) -> TokenBucket:
+        bucket = self._authors.get(author_urn)
+        if bucket is None:
+            bucket = self._authors[author_urn] = TokenBucket(self.author_rate, self.author_burst)
+        return bucket
+
+    def _dispatch(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, _, task = heapq.heappop(self._delayed)
+                    heapq.heappush(self._ready, (task.priority, next(self._seq), task))
+
+                if self._stopped and not self._ready and not self._delayed and not self._inflight:
+                    return
+
+                timeout: Optional[float] = self._delayed[0][0] - now if self._delayed else None
+                if self._ready:
+                    app_wait = self.app_bucket.wait_time(now)
+                    if app_wait > 0:
+                        timeout = app_wait if timeout is None else min(timeout, app_wait)
+                    else:
+                        _, _, task = heapq.heappop(self._ready)
+                        author = self._author_bucket(task.author_urn)
+                        author_wait = author.wait_time(now)
+                        if author_wait > 0:
+                            heapq.heappush(self._delayed, (now + author_wait, next(self._seq), task))
+                        else:
+                            self.app_bucket.take(now)
+                            author.take(now)
+                            if task.attempts == 0:
+                                self._latencies.append(now - task.submitted_at)
+                            self._inflight += 1
+                            self._executor.submit(self._run, task)
+                        continue
+                self._cond.wait(timeout)
+
+    def _run(self, task: _PublishTask) -> None:
+        try:
+            task.context.copy().run(self._attempt, task)
+        finally:
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def _attempt(self, task: _PublishTask) -> None:
+        task.attempts += 1
+        try:
+            client = self.client_factory(task.access_token)
+            if task.asset_urn is None:
+                content_type = mimetypes.guess_type(task.banner_path)[0] or "image/png"
+                task.asset_urn = client.upload_image(task.author_urn, task.banner_path, content_type=content_type)
+            result = client.create_post_with_image(task.author_urn, task.asset_urn, task.text)
+        except RateLimitError as e:
+            self._on_rate_limited(task, e)
+            return
+        except Exception as e:
+            with self._cond:
+                self._counts["failed"] += 1
+            task.future.set_exception(e)
+            return
+
+        with self._cond:
+            self._counts["published"] += 1
+            # Additive recovery towards the configured app rate after a 429 halved it.
+            self.app_bucket.rate = min(self.max_app_rate, self.app_bucket.rate + self.max_app_rate * 0.1)
+        task.future.set_result(result)
+
+    def _on_rate_limited(self, task: _PublishTask, error: RateLimitError) -> None:
+        delay = error.retry_after if error.retry_after is not None else self.backoff * (2 ** (task.attempts - 1))
+        with self._cond:
+            self._counts["rate_limited"] += 1
+            now = time.monotonic()
+            self._author_bucket(task.author_urn).pause(delay, now)
+            self.app_bucket.rate = max(self.max_app_rate * 0.05, self.app_bucket.rate / 2)
+            if task.attempts >= self.max_attempts:
+                self._counts["failed"] += 1
+                task.future.set_exception(error)
+                return
+            LOG.warning("Rate limited publishing for %s; retrying in %.1fs", task.author_urn, delay)
+            heapq.heappush(self._delayed, (now + delay, next(self._seq), task))
+            self._cond.notify_all()
+
+_default_scheduler: Optional[PublishScheduler] = None
+_default_lock = threading.Lock()
+
+def get_publish_scheduler() -> PublishScheduler:
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PublishScheduler()
+        return _default_scheduler
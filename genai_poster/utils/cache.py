@@ -0,0 +1,146 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+def canonical_hash(*parts: Any) -> str:
+    """Stable sha256 of JSON-serialisable parts (dict keys sorted, no whitespace)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Minimal string key/value cache interface with TTL and hit/miss counters.
+    Subclasses implement ``_get``/``_set``; ``ttl`` of None means entries never expire.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+class MemoryCache(ResponseCache):
+    """In-process LRU tier bounded to ``max_entries``."""
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self.max_entries = max(1, max_entries)
+        self._items: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if self._expired(item[1]):
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = (value, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+class SQLiteCache(ResponseCache):
+    """Persistent tier in a single SQLite file; expired rows are dropped on read."""
+
+    def __init__(self, path: Path, ttl: Optional[float] = None, table: str = "cache"):
+        super().__init__(ttl)
+        self.path = Path(path)
+        self.table = table
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class TieredCache(ResponseCache):
+    """Checks tiers in order (fastest first) and back-fills faster tiers on a hit."""
+
+    def __init__(self, tiers: Sequence[ResponseCache]):
+        super().__init__(None)
+        self.tiers = list(tiers)
+
+    def _get(self, key: str) -> Optional[str]:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def _set(self, key: str, value: str) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "tiers": [tier.stats() for tier in self.tiers]}
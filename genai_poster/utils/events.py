@@ -0,0 +1,40 @@
+"""
+Live progress events for a workflow run.
+
+Nodes report progress with ``emit``; whoever wants a run's events wraps the run in
+``listen(callback)``. The listener travels in a context variable, so it follows the
+run into LangGraph's worker threads like the run trace does, and ``emit`` costs
+nothing when no one is listening. Event data must be JSON-serialisable.
+"""
+from __future__ import annotations
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+LOG = logging.getLogger(__name__)
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+_current_listener: "contextvars.ContextVar[Optional[Listener]]" = contextvars.ContextVar("run_listener", default=None)
+
+def listening() -> bool:
+    return _current_listener.get() is not None
+
+def emit(event: str, **data: Any) -> None:
+    listener = _current_listener.get()
+    if listener is None:
+        return
+    try:
+        listener(event, data)
+    except Exception as e:
+        # A broken consumer must never fail the run.
+        LOG.debug("Event listener failed for %s: %s", event, e)
+
+@contextmanager
+def listen(listener: Listener) -> Iterator[None]:
+    token = _current_listener.set(listener)
+    try:
+        yield
+    finally:
+        _current_listener.reset(token)
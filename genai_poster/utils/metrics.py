@@ -0,0 +1,212 @@
+"""
+Process metrics and per-run traces.
+
+Counters and histograms go to a pluggable registry (``set_metrics_registry``); the
+default keeps them in memory and renders the Prometheus text format for ``/metrics``.
+``timed`` records a wall-time histogram sample and, inside ``trace_run``, a span on the
+current run's trace, which can be written out as JSON when the run finishes.
+"""
+from __future__ import annotations
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LOG = logging.getLogger(__name__)
+
+# Seconds; spans sub-millisecond cache hits up to multi-minute image generations.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HELP = {
+    "node_duration_seconds": "Wall time of each workflow node.",
+    "node_errors_total": "Workflow node failures.",
+    "llm_request_seconds": "Wall time of chat completion calls.",
+    "llm_first_token_seconds": "Time to the first streamed chunk of chat completions.",
+    "llm_tokens_total": "LLM tokens used, by model and kind (input/output).",
+    "image_request_seconds": "Wall time of image generation calls.",
+    "image_bytes_total": "Bytes of generated images.",
+    "linkedin_request_seconds": "Wall time of LinkedIn API calls.",
+    "linkedin_responses_total": "LinkedIn API responses by call and HTTP status.",
+    "linkedin_upload_bytes_total": "Bytes uploaded to LinkedIn.",
+    "banner_render_seconds": "Wall time of local (Pillow) banner renders.",
+    "banner_variant_seconds": "Wall time of encoding a banner's sized JPEG/WebP variants.",
+    "banner_fallbacks_total": "Banners rendered locally because the image API failed or timed out.",
+    "token_refreshes_total": "LinkedIn OAuth tokens refreshed ahead of expiry.",
+    "calendar_fetch_seconds": "Wall time of calendar loads, including cache checks.",
+    "cache_requests_total": "Cache lookups by cache and result (hit/stale/miss).",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class MetricsRegistry:
+    """Metrics sink interface. Subclasses forward to another backend (StatsD, OpenTelemetry, ...)."""
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        pass
+
+    def render(self) -> str:
+        """Prometheus text exposition of the current values ("" if not supported)."""
+        return ""
+
+class InMemoryRegistry(MetricsRegistry):
+    """Thread-safe in-process counters and fixed-bucket histograms."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # Per-bucket counts (last slot is +Inf), then sum and count.
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = [0.0] * (len(self.buckets) + 3)
+            hist[bisect.bisect_left(self.buckets, value)] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus histogram count/sum per series, keyed by rendered labels."""
+        with self._lock:
+            out: Dict[str, Any] = {}
+            for name, series in self._counters.items():
+                out[name] = {_format_labels(k): v for k, v in series.items()}
+            for name, series in self._histograms.items():
+                out[name] = {_format_labels(k): {"count": h[-1], "sum": h[-2]} for k, h in series.items()}
+            return out
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0.0
+                    for bound, n in zip(self.buckets + (float("inf"),), hist):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', le)])} {cumulative:g}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist[-2]:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist[-1]:g}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+_default_registry: MetricsRegistry = InMemoryRegistry()
+_default_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _default_registry
+
+def set_metrics_registry(registry: MetricsRegistry) -> None:
+    global _default_registry
+    with _default_lock:
+        _default_registry = registry
+
+class RunTrace:
+    """Spans recorded while one workflow run executes."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float, attrs: Dict[str, Any]) -> None:
+        span = {"name": name, "start_s": round(start - self._t0, 6), "duration_s": round(duration, 6), **attrs}
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_s"])
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "duration_s": round(time.perf_counter() - self._t0, 6),
+            "spans": spans,
+        }
+
+_current_trace: "contextvars.ContextVar[Optional[RunTrace]]" = contextvars.ContextVar("run_trace", default=None)
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+@contextmanager
+def trace_run(run_id: str, trace_dir: Optional[Path] = None) -> Iterator[RunTrace]:
+    """Collect spans for a run; with ``trace_dir`` set, write ``<run_id>.json`` there on exit."""
+    trace = RunTrace(run_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if trace_dir:
+            path = Path(trace_dir) / f"{run_id}.json"
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(trace.to_dict(), indent=2, default=str), encoding="utf-8")
+            except OSError as e:
+                LOG.warning("Could not write trace %s: %s", path, e)
+
+@contextmanager
+def timed(metric: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time the block into histogram ``metric``. The yielded dict holds span attributes
+    (starting with ``labels``); callers may add to it, e.g. token counts.
+    """
+    attrs: Dict[str, Any] = dict(labels)
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        get_metrics_registry().observe(metric, duration, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(metric, start, duration, attrs)
+
+def count(name: str, value: float = 1.0, **labels: Any) -> None:
+    get_metrics_registry().inc(name, value, **labels)
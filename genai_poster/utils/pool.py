@@ -0,0 +1,94 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+from genai_poster.config.settings import CLIENT_POOL_SIZE, CLIENT_IDLE_TTL
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class ClientPool(Generic[T]):
+    """
+    Thread-safe keyed pool of long-lived API clients.
+
+    ``get(key)`` returns the client for ``key``, creating it with ``factory(key)`` on
+    first use. At most ``max_size`` clients are kept (least recently used are evicted)
+    and clients unused for ``idle_ttl`` seconds are dropped. Callers hold no lease, so
+    an evicted client may still be in use by another thread: instead of being closed
+    on eviction, its resources are released by ``finalizer(client)`` once the last
+    reference to it is gone. The finalizer must return a callable that does not
+    refer to the client itself (e.g. ``lambda client: client.session.close``).
+    """
+
+    def __init__(self, name: str, factory: Callable[[Hashable], T],
+                 max_size: int = CLIENT_POOL_SIZE, idle_ttl: float = CLIENT_IDLE_TTL,
+                 finalizer: Optional[Callable[[T], Callable[[], None]]] = None):
+        self.name = name
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self.finalizer = finalizer
+        self._items: "OrderedDict[Hashable, Tuple[T, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> T:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            item = self._items.get(key)
+            if item is not None:
+                self.hits += 1
+                self._items[key] = (item[0], now)
+                self._items.move_to_end(key)
+                return item[0]
+            self.misses += 1
+
+        # Built outside the lock so lookups for other keys are not queued behind it.
+        client = self.factory(key)
+        self._track(client)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                # Another thread built one first; keep theirs and let ours be collected.
+                self._items.move_to_end(key)
+                return item[0]
+            self._items[key] = (client, now)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def _expire(self, now: float) -> None:
+        while self._items:
+            key, (_, last_used) = next(iter(self._items.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._items[key]
+
+    def _track(self, client: T) -> None:
+        if not self.finalizer:
+            return
+        try:
+            weakref.finalize(client, self._release, self.finalizer(client))
+        except TypeError:
+            LOG.warning("Pooled %s client %r cannot be weakly referenced; it is not closed on eviction",
+                        self.name, type(client).__name__)
+
+    def _release(self, release: Callable[[], None]) -> None:
+        try:
+            release()
+        except Exception as e:
+            LOG.warning("Closing pooled %s client failed: %s", self.name, e)
@@ -0,0 +1,168 @@
+"""
+Multi-tenant batch runner.
+
+    python batch.py tenants.yaml --report batch_report.json
+
+``tenants.yaml`` (or .json) is either a list of tenant configs or a mapping with
+``defaults`` and ``tenants`` keys. Tenant keys are AppConfig fields plus an optional
+``name``; string values may reference environment variables as ``${VAR}``.
+All tenants share the process-wide calendar, research, draft, banner and client
+caches; each pipeline stage has its own concurrency limit.
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import yaml
+from genai_poster.models import AppConfig
+from genai_poster.config.settings import (
+    configure, BATCH_TENANT_CONCURRENCY, BATCH_LLM_CONCURRENCY, BATCH_IMAGE_CONCURRENCY,
+    BATCH_RESEARCH_CONCURRENCY, BATCH_PUBLISH_CONCURRENCY,
+)
+from genai_poster.workflow.langgraph_flow import NODES, GraphState, build_graph
+
+LOG = logging.getLogger(__name__)
+
+# Node name -> stage whose concurrency limit applies to it.
+NODE_STAGES = {
+    "search_company_info": "research",
+    "write_post": "llm",
+    "make_banner": "image",
+    "post_linkedin": "publish",
+}
+
+DEFAULT_LIMITS = {
+    "research": BATCH_RESEARCH_CONCURRENCY,
+    "llm": BATCH_LLM_CONCURRENCY,
+    "image": BATCH_IMAGE_CONCURRENCY,
+    "publish": BATCH_PUBLISH_CONCURRENCY,
+}
+
+def load_tenants(path: Path) -> List[Dict[str, Any]]:
+    """Read tenant configs from YAML/JSON, applying ``defaults`` and expanding ``${VAR}`` references."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or []
+    defaults: Dict[str, Any] = {}
+    if isinstance(raw, dict):
+        defaults = raw.get("defaults") or {}
+        raw = raw.get("tenants") or []
+    tenants = []
+    for i, entry in enumerate(raw):
+        merged = {**defaults, **entry}
+        tenant = {k: os.path.expandvars(v) if isinstance(v, str) else v for k, v in merged.items()}
+        if isinstance(tenant.get("hashtags"), str):
+            tenant["hashtags"] = [h.strip() for h in tenant["hashtags"].split(",") if h.strip()]
+        tenant.setdefault("name", tenant.get("brand_name") or f"tenant-{i}")
+        tenants.append(tenant)
+    return tenants
+
+def resolve_config(tenant: Dict[str, Any]) -> AppConfig:
+    from genai_poster.auth.oauth_handler import get_token_manager
+
+    fields = {k: v for k, v in tenant.items() if k in AppConfig.model_fields}
+    if not fields.get("linkedin_author_urn"):
+        token = fields.get("linkedin_access_token") or os.getenv("LINKEDIN_ACCESS_TOKEN")
+        if not token:
+            raise RuntimeError("linkedin_author_urn or linkedin_access_token is required.")
+        fields["linkedin_author_urn"] = get_token_manager().author_urn(token)
+    # URN-only tenants get their token at publish time (from the OAuth store if they signed in).
+    return AppConfig(**fields)
+
+def limit_stage(fn: Callable[[GraphState], Dict[str, Any]], semaphore: threading.Semaphore):
+    def limited(state: GraphState) -> Dict[str, Any]:
+        with semaphore:
+            return fn(state)
+    limited.__name__ = getattr(fn, "__name__", "limited")
+    return limited
+
+def build_batch_graph(limits: Optional[Dict[str, int]] = None,
+                      nodes: Optional[Dict[str, Callable[[GraphState], Dict[str, Any]]]] = None):
+    """Compile the workflow with each stage's nodes wrapped in a shared semaphore."""
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    semaphores = {stage: threading.Semaphore(max(1, n)) for stage, n in limits.items()}
+    impl = {**NODES, **(nodes or {})}
+    wrapped = {
+        name: limit_stage(fn, semaphores[NODE_STAGES[name]]) if name in NODE_STAGES else fn
+        for name, fn in impl.items()
+    }
+    return build_graph(wrapped).compile()
+
+def run_tenant(app, tenant: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    report: Dict[str, Any] = {"tenant": tenant["name"], "status": "failed"}
+    try:
+        cfg = resolve_config(tenant)
+        state: GraphState = {
+            "config": cfg,
+            "festival": None,
+            "search_results": None,
+            "post": None,
+            "banner": None,
+            "banner_path": None,
+            "linkedin_result": None,
+        }
+        final_state = app.invoke(state)
+        fest = final_state["festival"]
+        result = final_state["linkedin_result"]
+        report.update({
+            "status": "succeeded",
+            "festival": fest.name if fest else None,
+            "festival_date": fest.date.isoformat() if fest else None,
+            "banner_path": final_state.get("banner_path"),
+            "post_urn": result.post_urn if result else None,
+        })
+    except Exception as e:
+        LOG.exception("Tenant %s failed: %s", tenant["name"], e)
+        report["error"] = str(e)
+    report["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return report
+
+def run_batch(tenants: List[Dict[str, Any]], concurrency: int = BATCH_TENANT_CONCURRENCY,
+              limits: Optional[Dict[str, int]] = None,
+              nodes: Optional[Dict[str, Callable[[GraphState], Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """Run every tenant through the workflow on a bounded pool and return the batch report."""
+    app = build_batch_graph(limits, nodes)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="tenant") as pool:
+        results = list(pool.map(lambda t: run_tenant(app, t), tenants))
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for r in results if r["status"] == "succeeded")
+    return {
+        "summary": {
+            "tenants": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "elapsed_s": round(elapsed, 3),
+            # Failed tenants often fail fast, so they would inflate the throughput.
+            "tenants_per_min": round(succeeded / elapsed * 60, 2) if elapsed else None,
+        },
+        "tenants": results,
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the festival workflow for many tenants.")
+    parser.add_argument("tenants", type=Path, help="YAML/JSON file with tenant configs")
+    parser.add_argument("--report", type=Path, default=Path("batch_report.json"))
+    parser.add_argument("--concurrency", type=int, default=BATCH_TENANT_CONCURRENCY, help="tenants in flight")
+    for stage, default in DEFAULT_LIMITS.items():
+        parser.add_argument(f"--{stage}-concurrency", type=int, default=default)
+    args = parser.parse_args(argv)
+    configure()
+
+    limits = {stage: getattr(args, f"{stage}_concurrency") for stage in DEFAULT_LIMITS}
+    report = run_batch(load_tenants(args.tenants), concurrency=args.concurrency, limits=limits)
+    args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    summary = report["summary"]
+    print(f"{summary['succeeded']}/{summary['tenants']} tenants succeeded in {summary['elapsed_s']}s; "
+          f"report written to {args.report}")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
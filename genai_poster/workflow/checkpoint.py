@@ -0,0 +1,149 @@
+"""
+Durable workflow runs backed by a local SQLite checkpointer.
+
+Every superstep of a run is checkpointed under its run id, so a run that fails (for
+example while publishing) resumes at the failed node and reuses the stored festival,
+post and banner instead of regenerating them. Credentials are stripped from the
+checkpointed config and supplied again by the caller on resume; a resume is only
+accepted for the same LinkedIn author and unchanged non-secret settings.
+"""
+from __future__ import annotations
+import functools
+import logging
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.types import Command
+from genai_poster.models import AppConfig, SECRET_FIELDS
+from genai_poster.config.settings import CHECKPOINT_DB, TRACE_DIR
+from genai_poster.utils.metrics import trace_run
+from genai_poster.utils.events import emit
+from genai_poster.workflow.langgraph_flow import GraphState, build_graph, stage_fields
+
+LOG = logging.getLogger(__name__)
+
+STATE_TYPES = [
+    ("genai_poster.models", name)
+    for name in ("AppConfig", "FestivalInfo", "PostDraft", "BannerSpec", "LinkedInPostResult")
+]
+
+def redact(obj: Any) -> Any:
+    """Copy of ``obj`` with credentials cleared from every AppConfig inside dicts/lists/tuples."""
+    if isinstance(obj, AppConfig):
+        return obj.model_copy(update=dict.fromkeys(SECRET_FIELDS))
+    if isinstance(obj, dict):
+        return {k: redact(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(redact(v) for v in obj)
+    return obj
+
+class RedactingSerializer(JsonPlusSerializer):
+    """Checkpoint serializer that never writes AppConfig credentials to disk."""
+
+    def __init__(self):
+        super().__init__(allowed_msgpack_modules=STATE_TYPES)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return super().dumps_typed(redact(obj))
+
+_default_saver: Optional[SqliteSaver] = None
+_default_lock = threading.Lock()
+
+def get_checkpointer(path: Path = CHECKPOINT_DB) -> SqliteSaver:
+    global _default_saver
+    with _default_lock:
+        if _default_saver is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            _default_saver = SqliteSaver(conn, serde=RedactingSerializer())
+        return _default_saver
+
+@functools.lru_cache(maxsize=1)
+def get_durable_graph():
+    """The default graph compiled with the process-wide SQLite checkpointer."""
+    return build_graph().compile(checkpointer=get_checkpointer())
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def run_config(run_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": run_id}}
+
+class RunConflict(RuntimeError):
+    """A run id was resumed by another LinkedIn author or with different settings."""
+
+def check_resume(run_id: str, stored: AppConfig, fresh: AppConfig) -> None:
+    """Raise RunConflict unless ``fresh`` may resume a run checkpointed with ``stored``."""
+    if fresh.linkedin_author_urn != stored.linkedin_author_urn:
+        raise RunConflict(f"Run {run_id} cannot be resumed with these credentials.")
+    changed = sorted(name for name, value in stored.model_dump(exclude=SECRET_FIELDS).items()
+                     if getattr(fresh, name) != value)
+    if changed:
+        raise RunConflict(f"Run {run_id} was started with different settings ({', '.join(changed)}); "
+                          f"start a new run instead.")
+
+def resumable(run_id: str, cfg: AppConfig, app=None) -> bool:
+    """True if ``run_id`` is checkpointed and ``cfg`` may resume it, False if the id is unknown."""
+    app = app or get_durable_graph()
+    snapshot = app.get_state(run_config(run_id))
+    if not snapshot.values:
+        return False
+    check_resume(run_id, snapshot.values["config"], cfg)
+    return True
+
+def run_workflow(initial_state: GraphState, run_id: Optional[str] = None, app=None,
+                 trace_dir: Optional[str] = TRACE_DIR) -> GraphState:
+    """
+    Run the workflow durably under ``run_id`` (a new id when omitted).
+
+    An unknown id starts a fresh run. A run that stopped part-way resumes at its
+    pending nodes, taking credentials from ``initial_state["config"]``; a finished run
+    returns its stored final state without calling any external service. Both raise
+    RunConflict if the config's author or non-secret settings differ from the stored
+    ones. With ``trace_dir`` set, the run's spans are written to ``<trace_dir>/<run_id>.json``.
+    """
+    app = app or get_durable_graph()
+    run_id = run_id or new_run_id()
+    with trace_run(run_id, Path(trace_dir) if trace_dir else None):
+        return _run(app, initial_state, run_id)
+
+def _run(app, initial_state: GraphState, run_id: str) -> GraphState:
+    config = run_config(run_id)
+    snapshot = app.get_state(config)
+
+    if not snapshot.values:
+        LOG.info("Starting run %s", run_id)
+        return app.invoke({**initial_state, "run_id": run_id}, config)
+
+    stored: AppConfig = snapshot.values["config"]
+    fresh: AppConfig = initial_state["config"]
+    check_resume(run_id, stored, fresh)
+    if not snapshot.next:
+        LOG.info("Run %s already finished; returning stored result", run_id)
+        return snapshot.values
+
+    LOG.info("Resuming run %s at %s", run_id, ", ".join(snapshot.next))
+    done = {k: snapshot.values.get(k) for k in ("festival", "post", "banner_path", "banner_variants")}
+    emit("run_resumed", run_id=run_id, pending=list(snapshot.next), **stage_fields(done))
+    credentials = {name: getattr(fresh, name) for name in SECRET_FIELDS}
+    return app.invoke(Command(update={"config": stored.model_copy(update=credentials)}), config)
+
+def run_status(run_id: str, app=None) -> Optional[Dict[str, Any]]:
+    """Checkpointed progress of a run, or None if the id is unknown."""
+    app = app or get_durable_graph()
+    snapshot = app.get_state(run_config(run_id))
+    if not snapshot.values:
+        return None
+    values = snapshot.values
+    return {
+        "run_id": run_id,
+        "finished": not snapshot.next,
+        "pending": list(snapshot.next),
+        "has_post": values.get("post") is not None,
+        "has_banner": values.get("banner_path") is not None,
+        "published": values.get("linkedin_result") is not None,
+    }
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from genai_poster.config.settings import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_HISTORY
+from genai_poster.utils.events import listen
+
+LOG = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+class QueueFullError(RuntimeError):
+    """Raised by JobQueue.submit when the queue is at capacity."""
+
+class Job:
+    def __init__(self, payload: Any, meta: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        # Small public fields (e.g. run id) that outlive the payload, which is dropped once the job finishes.
+        self.meta: Dict[str, Any] = dict(meta or {})
+        self.status = QUEUED
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.version = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            **self.meta,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            # Streamed LLM tokens are only delivered through JobQueue.follow.
+            "events": [e for e in self.events if e["event"] != "token"],
+        }
+
+class JobQueue:
+    """
+    Bounded producer/consumer pipeline for workflow runs.
+
+    ``submit`` enqueues a payload and returns immediately; a fixed pool of worker
+    threads calls ``runner(payload)`` and records the result on the Job. When the
+    queue already holds ``max_queue`` jobs, ``submit`` raises QueueFullError so the
+    caller can apply backpressure. ``runner`` is injectable for stubbed runs.
+    Progress events emitted while a job runs (genai_poster.utils.events) are appended
+    to ``Job.events``.
+    """
+
+    def __init__(self, runner: Callable[[Any], Any], workers: int = JOB_WORKERS,
+                 max_queue: int = JOB_QUEUE_SIZE, history: int = JOB_HISTORY):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.history = history
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "JobQueue":
+        with self._cond:
+            if self._threads:
+                return self
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def submit(self, payload: Any, meta: Optional[Dict[str, Any]] = None) -> Job:
+        job = Job(payload, meta)
+        with self._cond:
+            self._jobs[job.id] = job
+            self._prune()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._cond:
+                self._jobs.pop(job.id, None)
+            raise QueueFullError(f"Job queue is full ({self._queue.maxsize} pending).")
+        self.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def add_event(self, job_id: str, event: str, **data: Any) -> None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.events.append({"event": event, "ts": time.time(), **data})
+            self._touch(job)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until the job finishes (or ``timeout`` elapses) and return it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs.get(job_id)
+            while job is not None and job.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job
+
+    def watch(self, job_id: str, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield a snapshot of the job every time it changes, until it finishes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen = -1
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                while job.version == seen:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                seen = job.version
+                snapshot = job.to_dict()
+            yield snapshot
+            if snapshot["status"] in FINISHED:
+                return
+
+    def follow(self, job_id: str, after: int = 0, timeout: Optional[float] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield ``(index, event)`` for the job's events from index ``after`` on as they are
+        recorded, returning once the job has finished and every event was delivered.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        index = max(0, after)
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                while index >= len(job.events) and job.status not in FINISHED:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                pending = job.events[index:]
+                finished = job.status in FINISHED
+            for event in pending:
+                yield index, event
+                index += 1
+            if finished and not pending:
+                return
+
+    def _touch(self, job: Job) -> None:
+        job.version += 1
+        self._cond.notify_all()
+
+    def _prune(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.status in FINISHED]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._cond:
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._touch(job)
+            try:
+                with listen(lambda event, data, job_id=job.id: self.add_event(job_id, event, **data)):
+                    result = self.runner(job.payload)
+            except Exception as e:
+                LOG.exception("Job %s failed: %s", job.id, e)
+                with self._cond:
+                    job.status, job.error = FAILED, str(e)
+                    job.finished_at = time.time()
+                    job.payload = None
+                    self._touch(job)
+            else:
+                with self._cond:
+                    job.status, job.result = SUCCEEDED, result
+                    job.finished_at = time.time()
+                    job.payload = None
+                    self._touch(job)
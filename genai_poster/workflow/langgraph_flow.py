@@ -1,76 +1,89 @@
 from __future__ import annotations
 import datetime as dt
+import functools
 import logging
 import os
-from typing import Optional
-from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, END
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from typing_extensions import Annotated, TypedDict
 from genai_poster.models import AppConfig, FestivalInfo, PostDraft, BannerSpec, LinkedInPostResult
-from genai_poster.content.festival_content import get_upcoming_festival, make_llm, POST_PROMPT, BANNER_PROMPT_TMPL
-from genai_poster.media.image_generator import generate_image_bytes, save_png
-from genai_poster.publisher.post_manager import LinkedInClient
-from genai_poster.config.settings import INDIA_TZ, DOWNLOAD_DIR
+from genai_poster.content.festival_content import get_upcoming_festival, get_llm, get_draft_cache, draft_cache_key, get_post_prompt, BANNER_PROMPT_TMPL
+from genai_poster.media.banner_cache import get_banner_cache, banner_cache_key
+from genai_poster.config.settings import INDIA_TZ, BANNER_API_TIMEOUT, BANNER_VARIANTS
+from genai_poster.utils.metrics import timed, count, get_metrics_registry
+from genai_poster.utils.events import emit, listening
+
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
+# LangGraph, the OpenAI clients, Pillow and the publisher stack are imported inside
+# the nodes that use them, so importing this module (e.g. for GraphState) stays cheap.
 
 LOG = logging.getLogger(__name__)
 
+def merge_value(current: Any, update: Any) -> Any:
+    """State reducer: parallel branches only report the keys they produced, so keep the latest non-None value."""
+    return update if update is not None else current
+
 class GraphState(TypedDict):
-    config: AppConfig
-    festival: Optional[FestivalInfo]
-    search_results: Optional[str]
-    post: Optional[PostDraft]
-    banner: Optional[BannerSpec]
-    banner_path: Optional[str]
-    linkedin_result: Optional[LinkedInPostResult]
-
-def node_select_festival(state: GraphState) -> GraphState:
+    config: Annotated[AppConfig, merge_value]
+    run_id: Optional[str]
+    festival: Annotated[Optional[FestivalInfo], merge_value]
+    search_results: Annotated[Optional[str], merge_value]
+    post: Annotated[Optional[PostDraft], merge_value]
+    banner: Annotated[Optional[BannerSpec], merge_value]
+    banner_path: Annotated[Optional[str], merge_value]
+    banner_variants: Annotated[Optional[Dict[str, str]], merge_value]
+    linkedin_result: Annotated[Optional[LinkedInPostResult], merge_value]
+
+def node_select_festival(state: GraphState) -> Dict[str, Any]:
+    if state.get("festival") is not None:
+        # Festival chosen ahead of time (e.g. by the pre-generation scheduler).
+        return {}
+
     LOG.info("Selecting upcoming festival from client calendar ...")
+    brand_name = state["config"].brand_name
+    if brand_name:
+        from genai_poster.content.research import get_research_provider
+        # Research only needs the brand, so start it now; the search node picks up the in-flight result.
+        get_research_provider().prefetch(brand_name)
     today = dt.datetime.now(tz=INDIA_TZ).date()
 
-    calendar_url = os.getenv("CALENDAR_URL")
+    calendar_url = state["config"].calendar_url or os.getenv("CALENDAR_URL")
     if not calendar_url:
-        raise RuntimeError("CALENDAR_URL env var required (ICS file or feed URL).")
+        raise RuntimeError("calendar_url config or CALENDAR_URL env var required (ICS file or feed URL).")
 
     fest = get_upcoming_festival(today, calendar_url)
     if not fest:
         raise RuntimeError("No upcoming festivals found in client calendar.")
 
-    state["festival"] = fest
-    return state
+    return {"festival": fest}
 
-def node_search_company_info(state: GraphState) -> GraphState:
+def node_search_company_info(state: GraphState) -> Dict[str, Any]:
     LOG.info("Searching for company information ...")
     cfg = state["config"]
     brand_name = cfg.brand_name
     assert brand_name is not None
 
+    from genai_poster.content.research import get_research_provider
     try:
-        from googlesearch import search
-    except ImportError:
-        raise RuntimeError("googlesearch-python is not installed. Please install it with `pip install googlesearch-python`")
-
-    query = f"{brand_name} company profile"
-    search_results = ""
-    for url in search(query, num_results=5):
-        search_results += f"- {url}\n"
+        search_results = get_research_provider().lookup(brand_name)
+    except Exception as e:
+        LOG.warning("Company research unavailable for %s: %s", brand_name, e)
+        search_results = ""
 
-    state["search_results"] = search_results
-    return state
+    return {"search_results": search_results}
 
-def node_write_post(state: GraphState) -> GraphState:
+def node_write_post(state: GraphState) -> Dict[str, Any]:
     LOG.info("Generating LinkedIn post copy via LLM ...")
     cfg = state["config"]
     fest = state["festival"]
     search_results = state["search_results"]
     assert fest is not None
 
-    hashtags_input = os.getenv("HASHTAGS")
-    hashtags = (
-        [h.strip() for h in hashtags_input.split(",") if h.strip()]
-        if hashtags_input else cfg.hashtags
-    )
+    hashtags = cfg.hashtags
 
-    llm = make_llm(cfg.openai_model)
-    prompt = POST_PROMPT.format_messages(
+    prompt = get_post_prompt().format_messages(
         festival_name=f"{fest.emoji + ' ' if fest.emoji else ''}{fest.name}",
         festival_date=fest.date.isoformat(),
         festival_emoji=fest.emoji or "",
@@ -79,14 +92,43 @@ def node_write_post(state: GraphState) -> GraphState:
         hashtags=", ".join(hashtags),
         search_results=search_results or "No additional information found."
     )
-    msg = llm.invoke(prompt)
-    body = msg.content.strip()
+    cache = get_draft_cache()
+    key = draft_cache_key(cfg.openai_model, prompt)
+    body = None if cfg.regenerate_post else cache.get(key)
+    if body is None:
+        count("cache_requests_total", cache="draft", result="miss")
+        llm = get_llm(cfg.openai_model, api_key=cfg.openai_api_key)
+        with timed("llm_request_seconds", model=cfg.openai_model) as span:
+            msg = stream_completion(llm, prompt, cfg.openai_model) if listening() else llm.invoke(prompt)
+            usage = getattr(msg, "usage_metadata", None) or {}
+            span.update(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+        for kind in ("input", "output"):
+            if usage.get(f"{kind}_tokens"):
+                count("llm_tokens_total", usage[f"{kind}_tokens"], model=cfg.openai_model, kind=kind)
+        body = msg.content.strip()
+        cache.set(key, body)
+    else:
+        count("cache_requests_total", cache="draft", result="hit")
+        LOG.info("Draft cache hit for %s", fest.name)
 
     title = f"{fest.emoji + ' ' if fest.emoji else ''}{fest.name}: Celebrating Together"
-    state["post"] = PostDraft(festival=fest, title=title, body=body, hashtags=hashtags)
-    return state
+    return {"post": PostDraft(festival=fest, title=title, body=body, hashtags=hashtags)}
+
+def stream_completion(llm, prompt, model: str):
+    """Stream the completion, emitting each chunk as a ``token`` event; returns the merged message."""
+    start = time.perf_counter()
+    msg = None
+    for chunk in llm.stream(prompt):
+        if msg is None:
+            get_metrics_registry().observe("llm_first_token_seconds", time.perf_counter() - start, model=model)
+        if chunk.content:
+            emit("token", node="write_post", text=chunk.content)
+        msg = chunk if msg is None else msg + chunk
+    if msg is None:
+        raise RuntimeError("The chat model returned an empty stream.")
+    return msg
 
-def node_make_banner(state: GraphState) -> GraphState:
+def node_make_banner(state: GraphState) -> Dict[str, Any]:
     LOG.info("Generating banner image ...")
     cfg = state["config"]
     fest = state["festival"]
@@ -101,53 +143,212 @@ def node_make_banner(state: GraphState) -> GraphState:
     )
 
     banner = BannerSpec(festival=fest, prompt=prompt)
-    png = generate_image_bytes(prompt=banner.prompt, width=banner.width, height=banner.height, image_model=cfg.image_model)
+    cache = get_banner_cache()
+    out_path = None
+    if cfg.banner_mode != "local":
+        key = banner_cache_key(banner.prompt, cfg.image_model, banner.width, banner.height)
+        out_path = None if cfg.regenerate_banner else cache.get(key)
+        count("cache_requests_total", cache="banner", result="miss" if out_path is None else "hit")
+        if out_path is None:
+            from genai_poster.media.image_generator import generate_image_bytes
+            try:
+                png = generate_image_bytes(prompt=banner.prompt, width=banner.width, height=banner.height, image_model=cfg.image_model,
+                                           api_key=cfg.openai_api_key,
+                                           timeout=BANNER_API_TIMEOUT if cfg.banner_mode == "fallback" else None)
+                out_path = cache.put(key, png)
+            except Exception as e:
+                if cfg.banner_mode != "fallback":
+                    raise
+                LOG.warning("Image API failed (%s); rendering the banner locally", e)
+                count("banner_fallbacks_total")
+
+    if out_path is None:
+        out_path = render_local_banner(cfg, banner)
+    # Encoded here rather than in a separate node so the banner branch still joins the post branch in one step.
+    return {"banner": banner, "banner_path": str(out_path), "banner_variants": banner_variants(out_path)}
+
+def banner_variants(banner_path: str, names=None) -> Dict[str, str]:
+    """Sized JPEG/WebP variants of a banner; an encoding failure leaves only the source PNG."""
+    from genai_poster.media.variants import make_variants
+    try:
+        with timed("banner_variant_seconds"):
+            return make_variants(banner_path, BANNER_VARIANTS if names is None else names)
+    except Exception as e:
+        LOG.warning("Could not encode banner variants for %s: %s", banner_path, e)
+        return {}
+
+def upload_path(cfg: AppConfig, banner_path: str, variants: Optional[Dict[str, str]]) -> str:
+    """File to upload for ``cfg.upload_variant``, encoding it if the banner came from elsewhere (e.g. a pinned pre-generated one) or was deleted."""
+    name = cfg.upload_variant
+    if name == "original":
+        return banner_path
+    path = (variants or {}).get(name)
+    if not path or not os.path.exists(path):
+        path = banner_variants(banner_path, [name]).get(name)
+    return path or banner_path
 
-    filename = f"banner_{fest.date.isoformat()}_{fest.name.lower().replace(' ', '_')}.png"
-    out_path = DOWNLOAD_DIR / filename
-    save_png(png, out_path)
+def restore_banner(state: GraphState) -> Dict[str, Any]:
+    """
+    Make the banner again if its file is gone, e.g. evicted from the banner cache or by
+    the downloads janitor while a failed run waited to be resumed. Returns the state
+    update (empty when the file is still there). Banners are named by their cache key,
+    so the path normally comes back unchanged.
+    """
+    if os.path.exists(state["banner_path"]):
+        return {}
+    LOG.warning("Banner %s is missing; making it again", state["banner_path"])
+    count("banner_restored_total")
+    return node_make_banner(state)
 
-    state["banner"] = banner
-    state["banner_path"] = str(out_path)
-    return state
+def render_local_banner(cfg: AppConfig, banner: BannerSpec) -> str:
+    """Render with the Pillow template renderer; results share the content-addressed banner cache."""
+    fest = banner.festival
+    cache = get_banner_cache()
+    key = banner_cache_key(
+        "\0".join([fest.name, fest.date.isoformat(), ",".join(fest.colors or []), cfg.brand_name or "", cfg.logo_path or ""]),
+        "local-template", banner.width, banner.height,
+    )
+    out_path = cache.get(key)
+    if out_path is None:
+        from genai_poster.media.banner_renderer import get_banner_renderer
+        with timed("banner_render_seconds"):
+            png = get_banner_renderer().render(fest, cfg.brand_name, banner.width, banner.height, cfg.logo_path)
+        out_path = cache.put(key, png)
+    return str(out_path)
 
-def node_post_linkedin(state: GraphState) -> GraphState:
+def node_post_linkedin(state: GraphState) -> Dict[str, Any]:
     LOG.info("Posting to LinkedIn ...")
+    from genai_poster.publisher.rate_limiter import get_publish_scheduler
+    from genai_poster.publisher.post_manager import PostNotConfirmed
+    from genai_poster.publisher.ledger import get_publish_ledger, publish_key
     cfg = state["config"]
     post = state["post"]
     banner_path = state["banner_path"]
     assert post is not None and banner_path is not None
 
-    access_token = os.getenv("LINKEDIN_ACCESS_TOKEN")
+    access_token = cfg.linkedin_access_token or os.getenv("LINKEDIN_ACCESS_TOKEN")
     if not access_token:
-        raise RuntimeError("LINKEDIN_ACCESS_TOKEN not set.")
-
-    client = LinkedInClient(access_token)
-    asset_urn, upload_url = client.register_image_upload(cfg.linkedin_author_urn)
-    print(upload_url)
-    with open(banner_path, "rb") as f:
-        binary = f.read()
-    client.upload_binary(upload_url, binary, content_type="image/png")
+        # Tenants that signed in through OAuth publish with their stored (refreshed if due) token.
+        from genai_poster.auth.oauth_handler import TokenError, get_token_manager
+        try:
+            access_token, _ = get_token_manager().resolve(author_urn=cfg.linkedin_author_urn)
+        except TokenError as e:
+            raise RuntimeError(f"LinkedIn access token not set (config, LINKEDIN_ACCESS_TOKEN or OAuth login): {e}") from e
 
     # Compose text: title + body (LinkedIn ignores titles for UGC; keep in text)
     text = f"{post.title}\n\n{post.body}"
-    result = client.create_post_with_image(cfg.linkedin_author_urn, asset_urn, text)
 
-    state["linkedin_result"] = result
-    return state
+    def publish() -> Dict[str, Any]:
+        update = restore_banner(state)
+        image_path = upload_path(cfg, update.get("banner_path", banner_path),
+                                 update.get("banner_variants", state.get("banner_variants")))
+        result = get_publish_scheduler().publish(access_token, cfg.linkedin_author_urn, image_path, text)
+        return {**update, "linkedin_result": result}
+
+    run_id = state.get("run_id")
+    if not run_id:
+        return publish()
+
+    # Durable runs record the publish intent first, so a resumed run never posts twice.
+    # The key keeps the original banner path even if the banner has to be made again.
+    ledger = get_publish_ledger()
+    key = publish_key(run_id, cfg.linkedin_author_urn, text, banner_path)
+    result = ledger.begin(key, run_id)
+    if result is not None:
+        LOG.info("Run %s already published %s; skipping", run_id, result.post_urn)
+        return {"linkedin_result": result}
+    try:
+        update = publish()
+    except PostNotConfirmed:
+        # The post request went out without an answer; leave the intent for an operator.
+        raise
+    except Exception:
+        # Failed before the post was sent (upload, missing banner) or LinkedIn rejected it.
+        ledger.abort(key)
+        raise
+    ledger.complete(key, update["linkedin_result"])
+    return update
+
+NODES: Dict[str, Callable[[GraphState], Dict[str, Any]]] = {
+    "select_festival": node_select_festival,
+    "search_company_info": node_search_company_info,
+    "write_post": node_write_post,
+    "make_banner": node_make_banner,
+    "post_linkedin": node_post_linkedin,
+}
+
+def stage_fields(update: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe view of a node's state update for progress events (config and research text left out)."""
+    fields: Dict[str, Any] = {}
+    for key, value in (update or {}).items():
+        if key == "config" or value is None:
+            continue
+        if key == "search_results":
+            fields["research_chars"] = len(value)
+        elif hasattr(value, "model_dump"):
+            fields[key] = value.model_dump(mode="json")
+        else:
+            fields[key] = value
+    return fields
+
+def instrument_node(name: str, fn: Callable[[GraphState], Dict[str, Any]]) -> Callable[[GraphState], Dict[str, Any]]:
+    """
+    Wrap a node so its wall time lands in ``node_duration_seconds``, failures are
+    counted, and start/finish/failure are emitted as progress events.
+    """
+    def node(state: GraphState) -> Dict[str, Any]:
+        emit("node_started", node=name)
+        try:
+            with timed("node_duration_seconds", node=name):
+                update = fn(state)
+        except Exception as e:
+            count("node_errors_total", node=name)
+            emit("node_failed", node=name, error=str(e))
+            raise
+        if listening():
+            emit("node_finished", node=name, **stage_fields(update))
+        return update
+    node.__name__ = getattr(fn, "__name__", name)
+    return node
+
+def build_graph(nodes: Optional[Dict[str, Callable[[GraphState], Dict[str, Any]]]] = None,
+                publish: bool = True) -> StateGraph:
+    """
+    Build the workflow graph. The post copy (search -> write) and the banner only
+    depend on the selected festival, so they run as two concurrent branches that
+    join before publishing. The copy branch is a subgraph so both branches share a
+    single superstep. ``nodes`` overrides individual node callables (e.g. stubs);
+    ``publish=False`` stops after the draft and banner are ready.
+    """
+    from langgraph.graph import StateGraph, END
+
+    impl = {name: instrument_node(name, fn) for name, fn in {**NODES, **(nodes or {})}.items()}
+
+    post_branch = StateGraph(GraphState)
+    post_branch.add_node("search_company_info", impl["search_company_info"])
+    post_branch.add_node("write_post", impl["write_post"])
+    post_branch.set_entry_point("search_company_info")
+    post_branch.add_edge("search_company_info", "write_post")
+    post_branch.add_edge("write_post", END)
 
-def build_graph() -> StateGraph:
     graph = StateGraph(GraphState)
-    graph.add_node("select_festival", node_select_festival)
-    graph.add_node("search_company_info", node_search_company_info)
-    graph.add_node("write_post", node_write_post)
-    graph.add_node("make_banner", node_make_banner)
-    graph.add_node("post_linkedin", node_post_linkedin)
+    graph.add_node("select_festival", impl["select_festival"])
+    graph.add_node("compose_post", post_branch.compile())
+    graph.add_node("make_banner", impl["make_banner"])
 
     graph.set_entry_point("select_festival")
-    graph.add_edge("select_festival", "search_company_info")
-    graph.add_edge("search_company_info", "write_post")
-    graph.add_edge("write_post", "make_banner")
-    graph.add_edge("make_banner", "post_linkedin")
-    graph.add_edge("post_linkedin", END)
+    graph.add_edge("select_festival", "compose_post")
+    graph.add_edge("select_festival", "make_banner")
+    if publish:
+        graph.add_node("post_linkedin", impl["post_linkedin"])
+        graph.add_edge(["compose_post", "make_banner"], "post_linkedin")
+        graph.add_edge("post_linkedin", END)
+    else:
+        graph.add_edge("compose_post", END)
+        graph.add_edge("make_banner", END)
     return graph
+
+@functools.lru_cache(maxsize=1)
+def get_compiled_graph():
+    """Compile the default graph once per process; the compiled app is safe to share across threads."""
+    return build_graph().compile()
@@ -0,0 +1,340 @@
+"""
+Ahead-of-time draft pre-generation scheduler.
+
+    python -m genai_poster.workflow.pregen run tenants.yaml
+    python -m genai_poster.workflow.pregen list [--status draft]
+    python -m genai_poster.workflow.pregen approve <draft_id> [<draft_id> ...]
+    python -m genai_poster.workflow.pregen reject <draft_id>
+
+``run`` scans each tenant's calendar for festivals within the lead window, generates
+the post and banner days in advance and stores them in a SQLite job store. At the
+festival's publish time only the LinkedIn step runs, so publishing does not depend on
+OpenAI latency. Tenant files use the batch format (see genai_poster.workflow.batch);
+credentials are read from the tenant file at publish time and never stored here.
+Tenants that signed in through OAuth (author URN only) publish with their token from
+the encrypted token store, which each tick refreshes ahead of expiry.
+"""
+from __future__ import annotations
+import argparse
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from genai_poster.models import AppConfig, FestivalInfo, PostDraft, BannerSpec, SECRET_FIELDS
+from genai_poster.auth.oauth_handler import get_token_manager
+from genai_poster.publisher.ledger import PublishOutcomeUnknown, get_publish_ledger
+from genai_poster.publisher.post_manager import PostNotConfirmed
+from genai_poster.config.settings import (
+    configure, INDIA_TZ, DOWNLOAD_DIR, PREGEN_DB, PREGEN_LEAD_DAYS, PREGEN_PUBLISH_TIME, PREGEN_INTERVAL,
+    PREGEN_REQUIRE_APPROVAL, PREGEN_MAX_ATTEMPTS,
+)
+
+LOG = logging.getLogger(__name__)
+
+GENERATING = "generating"
+DRAFT = "draft"
+APPROVED = "approved"
+PUBLISHING = "publishing"
+PUBLISHED = "published"
+FAILED = "failed"
+REJECTED = "rejected"
+
+def draft_id(tenant: str, festival: FestivalInfo) -> str:
+    raw = f"{tenant}\0{festival.date.isoformat()}\0{festival.name}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+class DraftStore:
+    """Persistent store of scheduled drafts, one row per (tenant, festival)."""
+
+    def __init__(self, path: Path = PREGEN_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS drafts ("
+                " id TEXT PRIMARY KEY, tenant TEXT NOT NULL, festival TEXT NOT NULL,"
+                " festival_date TEXT NOT NULL, publish_at REAL NOT NULL, status TEXT NOT NULL,"
+                " config TEXT NOT NULL, post TEXT, banner_path TEXT, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)"
+            )
+
+    def insert(self, row_id: str, tenant: str, festival: FestivalInfo, publish_at: float, config: AppConfig) -> bool:
+        """Insert a new GENERATING row; returns False if the draft already exists."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO drafts (id, tenant, festival, festival_date, publish_at, status, config, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (row_id, tenant, festival.model_dump_json(), festival.date.isoformat(), publish_at, GENERATING,
+                 config.model_dump_json(exclude=SECRET_FIELDS), time.time()),
+            )
+            return cur.rowcount == 1
+
+    def update(self, row_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE drafts SET {assignments} WHERE id = ?", (*fields.values(), row_id))
+
+    def delete(self, row_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM drafts WHERE id = ?", (row_id,))
+
+    def transition(self, row_id: str, from_status: str, to_status: str) -> bool:
+        """Atomically move a row between statuses; False if it was not in ``from_status``."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE drafts SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (to_status, time.time(), row_id, from_status),
+            )
+            return cur.rowcount == 1
+
+    def get(self, row_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM drafts WHERE id = ?", (row_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM drafts"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY publish_at", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def due(self, now: float) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM drafts WHERE status = ? AND publish_at <= ? ORDER BY publish_at",
+                (APPROVED, now),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def recover(self) -> None:
+        """
+        Repair rows left mid-flight by a crash: interrupted generations are dropped so the
+        next scan regenerates them, and interrupted publishes are marked failed for review
+        because the post may already be live.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM drafts WHERE status = ?", (GENERATING,))
+            self._conn.execute(
+                "UPDATE drafts SET status = ?, error = ?, updated_at = ? WHERE status = ?",
+                (FAILED, "Interrupted while publishing; check LinkedIn before re-approving.", time.time(), PUBLISHING),
+            )
+
+def publish_time_for(date: dt.date, publish_time: str = PREGEN_PUBLISH_TIME) -> float:
+    hour, minute = (int(x) for x in publish_time.split(":"))
+    return dt.datetime.combine(date, dt.time(hour, minute), tzinfo=INDIA_TZ).timestamp()
+
+class PregenScheduler:
+    """Pre-generates drafts for festivals in the lead window and publishes approved ones when due."""
+
+    def __init__(self, tenants: List[Dict[str, Any]], store: Optional[DraftStore] = None,
+                 lead_days: int = PREGEN_LEAD_DAYS, publish_time: str = PREGEN_PUBLISH_TIME,
+                 require_approval: bool = PREGEN_REQUIRE_APPROVAL, max_attempts: int = PREGEN_MAX_ATTEMPTS,
+                 nodes: Optional[Dict[str, Any]] = None):
+        from genai_poster.workflow.langgraph_flow import NODES, build_graph
+
+        self.tenants = {t["name"]: t for t in tenants}
+        self.store = store or DraftStore()
+        self.lead_days = lead_days
+        self.publish_time = publish_time
+        self.require_approval = require_approval
+        self.max_attempts = max_attempts
+        impl = {**NODES, **(nodes or {})}
+        self._generate = build_graph(impl, publish=False).compile()
+        self._publish = impl["post_linkedin"]
+        self._stop = threading.Event()
+
+    def _config(self, tenant: Dict[str, Any]) -> AppConfig:
+        from genai_poster.workflow.batch import resolve_config
+        return resolve_config(tenant)
+
+    def scan(self, today: Optional[dt.date] = None) -> int:
+        """Generate drafts for every festival in [today, today + lead_days] not yet in the store."""
+        from genai_poster.content.festival_content import load_calendar
+
+        today = today or dt.datetime.now(tz=INDIA_TZ).date()
+        created = 0
+        for name, tenant in self.tenants.items():
+            try:
+                cfg = self._config(tenant)
+                if not cfg.calendar_url:
+                    raise RuntimeError("calendar_url is required for pre-generation.")
+                festivals = load_calendar(cfg.calendar_url).window(today, today + dt.timedelta(days=self.lead_days))
+            except Exception as e:
+                LOG.error("Scanning calendar for %s failed: %s", name, e)
+                continue
+            for fest in festivals:
+                row_id = draft_id(name, fest)
+                if not self.store.insert(row_id, name, fest, publish_time_for(fest.date, self.publish_time), cfg):
+                    continue
+                self._generate_draft(row_id, cfg, fest)
+                created += 1
+        return created
+
+    def _generate_draft(self, row_id: str, cfg: AppConfig, fest: FestivalInfo) -> None:
+        LOG.info("Pre-generating %s for %s", fest.name, cfg.brand_name)
+        try:
+            state = self._generate.invoke({
+                "config": cfg,
+                "festival": fest,
+                "search_results": None,
+                "post": None,
+                "banner": None,
+                "banner_path": None,
+                "linkedin_result": None,
+            })
+            # Copy the banner out of the LRU banner cache so eviction cannot remove it before publishing.
+            pinned = DOWNLOAD_DIR / "scheduled" / f"{row_id}{Path(state['banner_path']).suffix}"
+            pinned.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(state["banner_path"], pinned)
+            self.store.update(
+                row_id,
+                status=DRAFT if self.require_approval else APPROVED,
+                post=state["post"].model_dump_json(),
+                banner_path=str(pinned),
+                error=None,
+            )
+        except Exception as e:
+            LOG.exception("Pre-generation failed for %s: %s", fest.name, e)
+            # Drop the row so the next scan retries the generation.
+            self.store.delete(row_id)
+
+    def publish_due(self, now: Optional[float] = None) -> int:
+        """
+        Publish approved drafts whose publish time has passed; only the LinkedIn step runs here.
+        The draft id is the publish ledger's run id, so a draft is never posted twice.
+        Failures that certainly left nothing on LinkedIn are retried on later ticks (up
+        to ``max_attempts``); a post request without a response fails the draft for review.
+        """
+        published = 0
+        for row in self.store.due(now if now is not None else time.time()):
+            if not self.store.transition(row["id"], APPROVED, PUBLISHING):
+                continue
+            tenant = self.tenants.get(row["tenant"])
+            try:
+                if tenant is None:
+                    raise RuntimeError(f"Tenant {row['tenant']} is no longer configured.")
+                secrets = {k: v for k, v in tenant.items() if k in SECRET_FIELDS}
+                cfg = AppConfig(**{**json.loads(row["config"]), **secrets})
+                if not cfg.linkedin_access_token and not os.getenv("LINKEDIN_ACCESS_TOKEN"):
+                    cfg.linkedin_access_token, _ = get_token_manager().resolve(author_urn=cfg.linkedin_author_urn)
+                post = PostDraft.model_validate_json(row["post"])
+                update = self._publish({
+                    "config": cfg,
+                    "run_id": row["id"],
+                    "festival": post.festival,
+                    "search_results": None,
+                    "post": post,
+                    "banner": BannerSpec(festival=post.festival, prompt=""),
+                    "banner_path": row["banner_path"],
+                    "linkedin_result": None,
+                })
+                result = update["linkedin_result"]
+                self.store.update(row["id"], status=PUBLISHED, result=result.model_dump_json(), error=None)
+                published += 1
+            except (PostNotConfirmed, PublishOutcomeUnknown) as e:
+                LOG.error("Publishing draft %s may have reached LinkedIn: %s", row["id"], e)
+                self.store.update(row["id"], status=FAILED, attempts=row["attempts"] + 1,
+                                  error=f"{e} Check LinkedIn before re-approving.")
+            except Exception as e:
+                LOG.exception("Publishing draft %s failed: %s", row["id"], e)
+                attempts = row["attempts"] + 1
+                self.store.update(row["id"], status=APPROVED if attempts < self.max_attempts else FAILED,
+                                  attempts=attempts, error=str(e))
+        return published
+
+    def tick(self) -> None:
+        get_token_manager().refresh_due()
+        self.scan()
+        self.publish_due()
+
+    def run_forever(self, interval: float = PREGEN_INTERVAL) -> None:
+        self.store.recover()
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                LOG.exception("Scheduler tick failed: %s", e)
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+def approve(store: DraftStore, row_id: str) -> bool:
+    """
+    Approve a pending draft (or re-approve a failed one) for publishing. Re-approving
+    means LinkedIn was checked, so an unconfirmed publish attempt is cleared as well.
+    """
+    if store.transition(row_id, DRAFT, APPROVED):
+        return True
+    if store.transition(row_id, FAILED, APPROVED):
+        get_publish_ledger().forget(row_id)
+        return True
+    return False
+
+def reject(store: DraftStore, row_id: str) -> bool:
+    return store.transition(row_id, DRAFT, REJECTED) or store.transition(row_id, APPROVED, REJECTED)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate festival drafts and publish them on schedule.")
+    parser.add_argument("--db", type=Path, default=PREGEN_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="scan calendars and publish due drafts in a loop")
+    run.add_argument("tenants", type=Path)
+    run.add_argument("--lead-days", type=int, default=PREGEN_LEAD_DAYS)
+    run.add_argument("--publish-time", default=PREGEN_PUBLISH_TIME, help="HH:MM in India time")
+    run.add_argument("--interval", type=float, default=PREGEN_INTERVAL)
+    run.add_argument("--once", action="store_true", help="run a single scan/publish pass and exit")
+    run.add_argument("--auto-approve", action="store_true", help="publish drafts without manual approval")
+
+    ls = sub.add_parser("list", help="list scheduled drafts")
+    ls.add_argument("--status")
+
+    for name in ("approve", "reject"):
+        p = sub.add_parser(name, help=f"{name} drafts by id")
+        p.add_argument("ids", nargs="+")
+
+    args = parser.parse_args(argv)
+    configure()
+    store = DraftStore(args.db)
+
+    if args.command == "run":
+        from genai_poster.workflow.batch import load_tenants
+        scheduler = PregenScheduler(
+            load_tenants(args.tenants), store, lead_days=args.lead_days, publish_time=args.publish_time,
+            require_approval=PREGEN_REQUIRE_APPROVAL and not args.auto_approve,
+        )
+        if args.once:
+            store.recover()
+            scheduler.tick()
+        else:
+            scheduler.run_forever(args.interval)
+    elif args.command == "list":
+        for row in store.list(args.status):
+            fest = json.loads(row["festival"])
+            when = dt.datetime.fromtimestamp(row["publish_at"], tz=INDIA_TZ).strftime("%Y-%m-%d %H:%M")
+            print(f"{row['id']}  {row['status']:<10} {when}  {row['tenant']:<20} {fest['name']}"
+                  + (f"  error: {row['error']}" if row["error"] else ""))
+    else:
+        action = approve if args.command == "approve" else reject
+        for row_id in args.ids:
+            print(f"{row_id}: {'ok' if action(store, row_id) else 'not found or not in an actionable state'}")
+
+if __name__ == "__main__":
+    main()
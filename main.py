@@ -1,17 +1,38 @@
+"""
+Command-line entry point.
+
+    python main.py [run] [--resume RUN_ID] [--trace-dir DIR]
+    python main.py validate [--online]
+    python main.py festivals [--days N] [--calendar URL]
+    python main.py dry-run
+    python main.py forget RUN_ID
+
+Only ``run`` imports LangGraph and the LLM stack; the other commands read the
+configuration from the environment (or ``.env``) and finish in a fraction of a second,
+which keeps them cheap enough for cron health checks.
+"""
 from __future__ import annotations
+import argparse
+import datetime as dt
+import json
 import os
 import sys
 import logging
-from pydantic import ValidationError
-from genai_poster.workflow.langgraph_flow import build_graph, GraphState
-from genai_poster.models import AppConfig
-from genai_poster.config.settings import DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL
-from genai_poster.publisher.post_manager import LinkedInClient
+from typing import TYPE_CHECKING, Dict, List, Optional
+from genai_poster.config.settings import configure, DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL, INDIA_TZ, TRACE_DIR
+
+if TYPE_CHECKING:
+    from genai_poster.models import AppConfig
 
 LOG = logging.getLogger("festival_linkedin_bot")
 
+REQUIRED_ENV = ("OPENAI_API_KEY", "LINKEDIN_ACCESS_TOKEN", "BRAND_NAME", "CALENDAR_URL")
+
 def get_config_interactively() -> AppConfig:
     """Get configuration from the user interactively."""
+    from genai_poster.auth.oauth_handler import get_token_manager
+    from genai_poster.models import AppConfig
+
     print("Welcome to the GenAI Poster setup!")
     print("Please provide the following information:")
 
@@ -22,14 +43,9 @@ def get_config_interactively() -> AppConfig:
     hashtags_input = os.getenv("HASHTAGS") or input("Hashtags (comma-separated): ")
     calendar_url = os.getenv("CALENDAR_URL") or input("Calendar URL (ICS file or feed): ")
 
-    os.environ["OPENAI_API_KEY"] = openai_api_key
-    os.environ["LINKEDIN_ACCESS_TOKEN"] = linkedin_access_token
-
     # Get LinkedIn Author URN from the access token
     try:
-        linkedin_client = LinkedInClient(linkedin_access_token)
-        profile = linkedin_client.get_self_profile()
-        linkedin_author_urn = profile["id"]
+        linkedin_access_token, linkedin_author_urn = get_token_manager().resolve(linkedin_access_token)
         print(f"Successfully retrieved LinkedIn Author URN: {linkedin_author_urn}")
     except Exception as e:
         LOG.error("Could not retrieve LinkedIn Author URN: %s", e)
@@ -44,9 +60,37 @@ def get_config_interactively() -> AppConfig:
         linkedin_author_urn=linkedin_author_urn,
         openai_model=os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
         image_model=os.getenv("IMAGE_MODEL", DEFAULT_IMAGE_MODEL),
+        openai_api_key=openai_api_key,
+        linkedin_access_token=linkedin_access_token,
+        calendar_url=calendar_url,
+    )
+
+def config_from_env() -> AppConfig:
+    """Non-interactive config for the cheap commands; the author URN is only known once the token is resolved."""
+    from genai_poster.models import AppConfig
+
+    fields = dict(
+        brand_name=os.getenv("BRAND_NAME"),
+        linkedin_author_urn=os.getenv("LINKEDIN_AUTHOR_URN") or "(resolved at run time)",
+        openai_model=os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
+        image_model=os.getenv("IMAGE_MODEL", DEFAULT_IMAGE_MODEL),
+        calendar_url=os.getenv("CALENDAR_URL"),
     )
+    if os.getenv("BRAND_TONE"):
+        fields["brand_tone"] = os.getenv("BRAND_TONE")
+    if os.getenv("HASHTAGS"):
+        fields["hashtags"] = [h.strip() for h in os.getenv("HASHTAGS", "").split(",") if h.strip()]
+    return AppConfig(**fields)
 
-def main() -> None:
+def today() -> dt.date:
+    return dt.datetime.now(tz=INDIA_TZ).date()
+
+def cmd_run(args: argparse.Namespace) -> None:
+    from pydantic import ValidationError
+    from genai_poster.workflow.langgraph_flow import GraphState
+    from genai_poster.workflow.checkpoint import run_workflow, new_run_id
+
+    run_id = args.resume or new_run_id()
     try:
         cfg = get_config_interactively()
         initial_state: GraphState = {
@@ -57,16 +101,20 @@ def main() -> None:
             "banner_path": None,
             "linkedin_result": None,
         }
-        app = build_graph().compile()
-        final_state = app.invoke(initial_state)
+        try:
+            final_state = run_workflow(initial_state, run_id, trace_dir=args.trace_dir)
+        except Exception:
+            print(f"Run {run_id} failed; resume it with: python main.py --resume {run_id}")
+            raise
 
         fest = final_state["festival"]
         post = final_state["post"]
         result = final_state["linkedin_result"]
 
-        LOG.info("Done. Festival: %s | Banner: %s | Post URN: %s", 
+        LOG.info("Done. Festival: %s | Banner: %s | Post URN: %s",
                  fest.name if fest else None, final_state.get("banner_path"), result.post_urn if result else None)
         print("\n=== Summary ===")
+        print(f"Run: {run_id}")
         print(f"Festival: {fest.name} on {fest.date.isoformat()}" if fest else "Festival: n/a")
         print(f"Banner saved to: {final_state.get('banner_path')}")
         print(f"LinkedIn Post URN: {result.post_urn if result else 'n/a'}")
@@ -77,5 +125,140 @@ def main() -> None:
         LOG.exception("Fatal error: %s", e)
         sys.exit(1)
 
+def cmd_validate(args: argparse.Namespace) -> None:
+    """Check the environment without prompting; exits 1 if any check fails."""
+    from pydantic import ValidationError
+    from genai_poster.content.festival_content import load_calendar
+
+    checks: List[Dict[str, object]] = []
+
+    def check(name: str, ok: bool, detail: str = "") -> None:
+        checks.append({"check": name, "ok": ok, "detail": detail})
+
+    for name in REQUIRED_ENV:
+        check(name, bool(os.getenv(name)), "" if os.getenv(name) else "not set")
+
+    try:
+        cfg = config_from_env()
+        check("config", True, f"banner_mode={cfg.banner_mode} upload_variant={cfg.upload_variant}")
+    except ValidationError as e:
+        check("config", False, str(e))
+
+    calendar_url = os.getenv("CALENDAR_URL")
+    if calendar_url:
+        try:
+            index = load_calendar(calendar_url)
+            fest = index.next_on_or_after(today(), offset=1)
+            check("calendar", len(index) > 0,
+                  f"{len(index)} events; next: {fest.name} on {fest.date.isoformat()}" if fest else f"{len(index)} events; none upcoming")
+        except Exception as e:
+            check("calendar", False, str(e))
+
+    if args.online and os.getenv("LINKEDIN_ACCESS_TOKEN"):
+        from genai_poster.auth.oauth_handler import get_token_manager
+        try:
+            _, urn = get_token_manager().resolve(os.getenv("LINKEDIN_ACCESS_TOKEN"))
+            check("linkedin", True, urn)
+        except Exception as e:
+            check("linkedin", False, str(e))
+
+    for c in checks:
+        print(f"{'ok  ' if c['ok'] else 'FAIL'}  {c['check']:<22} {c['detail']}")
+    if not all(c["ok"] for c in checks):
+        sys.exit(1)
+
+def cmd_festivals(args: argparse.Namespace) -> None:
+    from genai_poster.content.festival_content import load_calendar
+
+    calendar_url = args.calendar or os.getenv("CALENDAR_URL")
+    if not calendar_url:
+        LOG.error("CALENDAR_URL is not set; pass --calendar")
+        sys.exit(2)
+    start = today()
+    for fest in load_calendar(calendar_url).window(start, start + dt.timedelta(days=args.days)):
+        print(f"{fest.date.isoformat()}  {fest.name}" + (f"  [{fest.region}]" if fest.region else ""))
+
+def cmd_dry_run(args: argparse.Namespace) -> None:
+    """Print what ``run`` would do next (festival, brand, models, cached banner) without calling any API."""
+    from pydantic import ValidationError
+    from genai_poster.content.festival_content import get_upcoming_festival, BANNER_PROMPT_TMPL
+    from genai_poster.media.banner_cache import get_banner_cache, banner_cache_key
+    from genai_poster.models import BannerSpec
+
+    try:
+        cfg = config_from_env()
+    except ValidationError as e:
+        LOG.error("Validation error: %s", e)
+        sys.exit(2)
+    if not cfg.calendar_url:
+        LOG.error("CALENDAR_URL is not set")
+        sys.exit(2)
+    fest = get_upcoming_festival(today(), cfg.calendar_url)
+    if fest is None:
+        LOG.error("No upcoming festivals found in %s", cfg.calendar_url)
+        sys.exit(1)
+
+    plan = {
+        "festival": fest.model_dump(mode="json"),
+        "brand_name": cfg.brand_name,
+        "brand_tone": cfg.brand_tone,
+        "hashtags": cfg.hashtags,
+        "openai_model": cfg.openai_model,
+        "image_model": cfg.image_model,
+        "banner_mode": cfg.banner_mode,
+        "upload_variant": cfg.upload_variant,
+    }
+    if cfg.banner_mode != "local":
+        # Same prompt and key as node_make_banner, so this tells whether the image API would be called.
+        banner = BannerSpec(festival=fest, prompt=BANNER_PROMPT_TMPL.format(
+            festival_name=fest.name, brand_tone=cfg.brand_tone,
+            palette=", ".join(fest.colors or ["brand palette"]), brand_name=cfg.brand_name,
+        ))
+        key = banner_cache_key(banner.prompt, cfg.image_model, banner.width, banner.height)
+        plan["banner_cached"] = get_banner_cache().path_for(key).exists()
+    print(json.dumps(plan, indent=2, ensure_ascii=False))
+
+def cmd_forget(args: argparse.Namespace) -> None:
+    """Clear a run's unconfirmed publish intent once LinkedIn has been checked, so a resume may post again."""
+    from genai_poster.publisher.ledger import get_publish_ledger
+
+    cleared = get_publish_ledger().forget(args.run_id)
+    if not cleared:
+        print(f"Run {args.run_id} has no unconfirmed publish attempt.")
+        sys.exit(1)
+    print(f"Cleared the unconfirmed publish attempt of run {args.run_id}; resume it with: "
+          f"python main.py --resume {args.run_id}")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        # ``python main.py [--resume ID]`` predates the subcommands.
+        argv = ["run", *argv]
+
+    parser = argparse.ArgumentParser(description="Generate and publish a festival post to LinkedIn.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the workflow and publish (default)")
+    run.add_argument("--resume", metavar="RUN_ID", help="resume a failed run from its last checkpoint")
+    run.add_argument("--trace-dir", default=TRACE_DIR, help="write a JSON trace of the run to this directory")
+
+    validate = sub.add_parser("validate", help="check settings and the calendar without prompting")
+    validate.add_argument("--online", action="store_true", help="also resolve the LinkedIn author URN")
+
+    festivals = sub.add_parser("festivals", help="list upcoming festivals from the calendar")
+    festivals.add_argument("--days", type=int, default=30)
+    festivals.add_argument("--calendar", help="ICS file or feed URL, or several separated by ';' (default: CALENDAR_URL)")
+
+    sub.add_parser("dry-run", help="show the festival and settings the next run would use")
+
+    forget = sub.add_parser("forget", help="allow a run with an unconfirmed publish to post again")
+    forget.add_argument("run_id", metavar="RUN_ID")
+
+    args = parser.parse_args(argv)
+    configure()
+    commands = {"run": cmd_run, "validate": cmd_validate, "festivals": cmd_festivals, "dry-run": cmd_dry_run,
+                "forget": cmd_forget}
+    commands[args.command](args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,89 +1,283 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, abort, redirect, request, jsonify, render_template, send_file, stream_with_context
 from flask_cors import CORS
+import json
+import mimetypes
 import os
-import sys
 import logging
+import threading
+from pathlib import Path
 from pydantic import ValidationError
-from genai_poster.workflow.langgraph_flow import build_graph, GraphState
+from genai_poster.workflow.langgraph_flow import GraphState
+from genai_poster.workflow.checkpoint import RunConflict, run_workflow, run_status, new_run_id, resumable
 from genai_poster.models import AppConfig
-from genai_poster.config.settings import DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL, DOWNLOAD_DIR
-from genai_poster.publisher.post_manager import LinkedInClient
+from genai_poster.config.settings import configure, DEFAULT_OPENAI_MODEL, DEFAULT_IMAGE_MODEL, DOWNLOAD_DIR, JOB_WAIT_TIMEOUT, BANNER_MODE
+from genai_poster.auth.oauth_handler import TokenError, get_token_manager
+from genai_poster.content.research import get_research_provider
+from genai_poster.workflow.jobs import JobQueue, QueueFullError, FINISHED, SUCCEEDED, FAILED
+from genai_poster.utils.metrics import count, get_metrics_registry
+from genai_poster.media.downloads import get_download_store, get_download_janitor
 
 app = Flask(__name__)
 CORS(app)
 
 LOG = logging.getLogger("festival_linkedin_bot")
 
+_started = threading.Event()
+_start_lock = threading.Lock()
+
+@app.before_request
+def start_background_tasks():
+    """
+    Process setup on the first request rather than at import, so importing this module
+    (WSGI servers, variant pool workers re-importing ``__main__``) has no side effects.
+    """
+    if _started.is_set():
+        return
+    with _start_lock:
+        if not _started.is_set():
+            configure()
+            get_download_janitor().start()
+            _started.set()
+
+# Banners and variants are content-named and never rewritten, so browsers may keep them for a year.
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/downloads/<path:filename>')
 def download_file(filename):
-    return send_from_directory(DOWNLOAD_DIR, filename)
+    item = get_download_store().open(filename)
+    if item is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(item.path.name)[0] or 'application/octet-stream'
+    resp = send_file(item.path, mimetype=mimetype, conditional=False)
+    resp.set_etag(item.etag)
+    resp.last_modified = item.mtime
+    if item.immutable:
+        resp.cache_control.no_cache = None
+        resp.cache_control.public = True
+        resp.cache_control.max_age = IMMUTABLE_MAX_AGE
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.no_cache = True
+    # Answers If-None-Match/If-Modified-Since with 304 and Range/If-Range with 206 or 416.
+    resp = resp.make_conditional(request, accept_ranges=True, complete_length=item.size)
+    count('download_bytes_total', 0 if resp.status_code == 304 else resp.content_length or 0, status=resp.status_code)
+    return resp
 
-@app.route('/api/generate-post', methods=['POST'])
-def generate_post():
-    data = request.json
+@app.route('/metrics')
+def metrics():
+    return Response(get_metrics_registry().render(), mimetype='text/plain; version=0.0.4')
+
+def download_url(path: str) -> str:
+    return f'/downloads/{Path(path).relative_to(DOWNLOAD_DIR).as_posix()}'
+
+def summarize(final_state: GraphState) -> dict:
+    fest = final_state["festival"]
+    post = final_state["post"]
+    result = final_state["linkedin_result"]
+
+    banner_path = final_state.get('banner_path')
+    banner_url = download_url(banner_path) if banner_path else None
+    variants = final_state.get('banner_variants') or {}
+
+    return {
+        'run_id': final_state.get('run_id'),
+        'festival': fest.name if fest else 'n/a',
+        'post_title': post.title if post else 'n/a',
+        'post_body': post.body if post else 'n/a',
+        'banner_url': banner_url,
+        'banner_variants': {name: download_url(path) for name, path in variants.items()},
+        'linkedin_post_urn': result.post_urn if result else 'n/a'
+    }
+
+def run_job(initial_state: GraphState) -> dict:
+    return summarize(run_workflow(initial_state, initial_state["run_id"]))
+
+jobs = JobQueue(run_job)
+
+def build_payload(data: dict) -> GraphState:
+    """
+    Turn the form data into the initial graph state. Credentials and the calendar
+    source travel in AppConfig, never through os.environ, so concurrent jobs stay isolated.
+    Passing the ``runId`` of a failed run resumes it instead of starting over, provided
+    the resolved author and the non-secret settings match the run's (RunConflict otherwise).
+    """
+    # Author URN from the (cached) userinfo lookup, or the token stored at OAuth login for a ``loginKey``.
+    try:
+        access_token, linkedin_author_urn = get_token_manager().resolve(data.get("linkedinToken"), data.get("loginKey"))
+    except TokenError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f'Could not retrieve LinkedIn Author URN: {e}') from e
+
+    hashtags = [h.strip() for h in data.get("hashtags", "").split(",") if h.strip()]
+
+    cfg = AppConfig(
+        brand_name=data.get("brandName"),
+        brand_tone=data.get("brandTone"),
+        hashtags=hashtags,
+        linkedin_author_urn=linkedin_author_urn,
+        openai_model=os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
+        image_model=os.getenv("IMAGE_MODEL", DEFAULT_IMAGE_MODEL),
+        openai_api_key=data.get("openaiKey"),
+        linkedin_access_token=access_token,
+        calendar_url=data.get("calendarUrl"),
+        regenerate_post=bool(data.get("regeneratePost")),
+        regenerate_banner=bool(data.get("regenerateBanner")),
+        banner_mode=data.get("bannerMode") or BANNER_MODE,
+    )
+
+    if cfg.brand_name:
+        # Warm the research cache while the job waits in the queue.
+        get_research_provider().prefetch(cfg.brand_name)
+
+    # Client-chosen ids that were never checkpointed get a fresh server-side id.
+    run_id = data.get("runId")
+    if run_id and not resumable(run_id, cfg):
+        run_id = None
+
+    initial_state: GraphState = {
+        "config": cfg,
+        "run_id": run_id or new_run_id(),
+        "festival": None,
+        "post": None,
+        "banner": None,
+        "banner_path": None,
+        "linkedin_result": None,
+    }
+    return initial_state
+
+def submit_run(data: dict):
+    initial_state = build_payload(data)
+    return jobs.submit(initial_state, meta={'run_id': initial_state['run_id']})
+
+def queue_full_response(e: QueueFullError):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = '5'
+    return response, 429
 
+@app.route('/oauth/linkedin/login')
+def linkedin_login():
+    return redirect(get_token_manager().authorization_url())
+
+@app.route('/oauth/linkedin/callback')
+def linkedin_callback():
+    if request.args.get('error'):
+        return jsonify({'error': request.args.get('error_description') or request.args['error']}), 400
     try:
-        # Use data from the form to configure the app
-        os.environ["OPENAI_API_KEY"] = data.get("openaiKey")
-        os.environ["LINKEDIN_ACCESS_TOKEN"] = data.get("linkedinToken")
-
-        # Get LinkedIn Author URN from the access token
-        try:
-            linkedin_client = LinkedInClient(data.get("linkedinToken"))
-            profile = linkedin_client.get_self_profile()
-            linkedin_author_urn = f'urn:li:person:{profile["sub"]}'
-        except Exception as e:
-            return jsonify({'error': f'Could not retrieve LinkedIn Author URN: {e}'}), 500
-
-        hashtags = [h.strip() for h in data.get("hashtags", "").split(",") if h.strip()]
-
-        cfg = AppConfig(
-            brand_name=data.get("brandName"),
-            brand_tone=data.get("brandTone"),
-            hashtags=hashtags,
-            linkedin_author_urn=linkedin_author_urn,
-            openai_model=os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
-            image_model=os.getenv("IMAGE_MODEL", DEFAULT_IMAGE_MODEL),
-        )
-
-        initial_state: GraphState = {
-            "config": cfg,
-            "festival": None,
-            "post": None,
-            "banner": None,
-            "banner_path": None,
-            "linkedin_result": None,
-        }
-        
-        # Set the calendar URL from the form
-        os.environ["CALENDAR_URL"] = data.get("calendarUrl")
-
-        app_instance = build_graph().compile()
-        final_state = app_instance.invoke(initial_state)
-
-        fest = final_state["festival"]
-        post = final_state["post"]
-        result = final_state["linkedin_result"]
-
-        banner_path = final_state.get('banner_path')
-        banner_url = f'/downloads/{os.path.basename(banner_path)}' if banner_path else None
-
-        return jsonify({
-            'festival': fest.name if fest else 'n/a',
-            'post_title': post.title if post else 'n/a',
-            'post_body': post.body if post else 'n/a',
-            'banner_url': banner_url,
-            'linkedin_post_urn': result.post_urn if result else 'n/a'
-        })
+        token, login_key = get_token_manager().login(request.args.get('code', ''), request.args.get('state', ''))
+    except TokenError as e:
+        return jsonify({'error': str(e)}), 400
+    # The access token stays server-side; clients submit runs with this loginKey instead.
+    return jsonify({'author_urn': token.author_urn, 'login_key': login_key, 'expires_at': token.expires_at})
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        job = submit_run(request.json)
+    except QueueFullError as e:
+        return queue_full_response(e)
+    except TokenError as e:
+        return jsonify({'error': str(e)}), 401
+    except RunConflict as e:
+        return jsonify({'error': str(e)}), 409
     except ValidationError as ve:
         return jsonify({'error': f'Validation error: {ve}'}), 400
     except Exception as e:
         return jsonify({'error': f'Fatal error: {e}'}), 500
+    return jsonify({'job_id': job.id, 'run_id': job.meta['run_id'], 'status': job.status,
+                    'status_url': f'/api/jobs/{job.id}'}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/runs/<run_id>', methods=['GET'])
+def run_progress(run_id):
+    status = run_status(run_id)
+    if status is None:
+        return jsonify({'error': 'Unknown run id'}), 404
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+
+    def stream():
+        for snapshot in jobs.watch(job_id, timeout=JOB_WAIT_TIMEOUT):
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+def sse(event: str, data: dict, event_id=None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def with_urls(data: dict) -> dict:
+    """Add download URLs for banner paths in a progress event."""
+    if data.get('banner_path'):
+        data = {**data, 'banner_url': download_url(data['banner_path'])}
+    if data.get('banner_variants'):
+        data = {**data, 'banner_variant_urls': {k: download_url(v) for k, v in data['banner_variants'].items()}}
+    return data
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def job_stream(job_id):
+    """
+    Progress of a job as Server-Sent Events: ``status``, then ``node_started`` /
+    ``node_finished`` / ``token`` events as the workflow runs, then ``done`` with the
+    result or ``error``. Event ids let a reconnecting EventSource resume via Last-Event-ID.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    last_id = request.headers.get('Last-Event-ID', '')
+    after = int(last_id) + 1 if last_id.isdigit() else 0
+
+    def stream():
+        yield sse('status', {'job_id': job.id, 'run_id': job.meta.get('run_id'), 'status': job.status})
+        for index, event in jobs.follow(job_id, after=after, timeout=JOB_WAIT_TIMEOUT):
+            data = {k: v for k, v in event.items() if k != 'event'}
+            yield sse(event['event'], with_urls(data), index)
+        if job.status == SUCCEEDED:
+            yield sse('done', job.result)
+        elif job.status == FAILED:
+            yield sse('error', {'error': job.error, 'run_id': job.meta.get('run_id')})
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/generate-post', methods=['POST'])
+def generate_post():
+    try:
+        job = submit_run(request.json)
+    except QueueFullError as e:
+        return queue_full_response(e)
+    except TokenError as e:
+        return jsonify({'error': str(e)}), 401
+    except RunConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except ValidationError as ve:
+        return jsonify({'error': f'Validation error: {ve}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Fatal error: {e}'}), 500
+
+    job = jobs.wait(job.id, timeout=JOB_WAIT_TIMEOUT)
+    if job.status not in FINISHED:
+        return jsonify({'error': 'Job still running', 'job_id': job.id, 'status_url': f'/api/jobs/{job.id}'}), 202
+    if job.error:
+        # The run is checkpointed; resubmitting with this runId resumes at the failed step.
+        return jsonify({'error': f'Fatal error: {job.error}', 'run_id': job.meta['run_id']}), 500
+    return jsonify(job.result)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    configure()
+    app.run(debug=True, port=5000, threaded=True)
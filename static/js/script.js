@@ -1,12 +1,26 @@
+const API_BASE = 'http://127.0.0.1:5000';
 const form = document.getElementById('automationForm');
 const mainForm = document.getElementById('mainForm');
 const loadingState = document.getElementById('loadingState');
 const thankYouPage = document.getElementById('thankYouPage');
 const resultContainer = document.getElementById('resultContainer');
+// Run id of the last failed run; the next submit resumes it instead of starting over.
+let failedRunId = null;
+
+// Edited settings make a new run; the server refuses to resume one with different settings.
+['input', 'change'].forEach(type => form.addEventListener(type, () => { failedRunId = null; }));
+
+const STAGES = {
+    select_festival: 'Festival selected',
+    search_company_info: 'Company research done',
+    write_post: 'Post written',
+    make_banner: 'Banner ready',
+    post_linkedin: 'Published to LinkedIn',
+};
 
 form.addEventListener('submit', function(e) {
     e.preventDefault();
-    
+
     const formData = new FormData(form);
     const data = {
         calendarUrl: formData.get('calendarUrl'),
@@ -17,12 +31,138 @@ form.addEventListener('submit', function(e) {
         brandTone: formData.get('brandTone'),
         hashtags: formData.get('hashtags'),
         schedulerTime: formData.get('schedulerTime'),
+        runId: failedRunId,
     };
 
     mainForm.style.display = 'none';
     loadingState.style.display = 'block';
 
-    fetch('http://127.0.0.1:5000/api/generate-post', {
+    if (window.EventSource) {
+        streamRun(data);
+    } else {
+        waitForRun(data);
+    }
+});
+
+function showError(data) {
+    loadingState.style.display = 'none';
+    failedRunId = data.run_id || null;
+    alert('Error: ' + data.error + (failedRunId ? '\nSubmit again to resume this run.' : ''));
+    resetForm();
+}
+
+// Submit as a job and render progress from its event stream as the workflow runs.
+function streamRun(data) {
+    fetch(`${API_BASE}/api/jobs`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data),
+    })
+    .then(response => response.json())
+    .then(job => {
+        if (job.error) {
+            showError(job);
+            return;
+        }
+        const view = showProgress();
+        const events = new EventSource(`${API_BASE}/api/jobs/${job.job_id}/stream`);
+        let finished = false;
+
+        events.addEventListener('node_started', e => view.started(JSON.parse(e.data).node));
+        events.addEventListener('node_failed', e => view.stage(JSON.parse(e.data).node, 'failed'));
+        events.addEventListener('node_finished', e => view.update(JSON.parse(e.data)));
+        events.addEventListener('run_resumed', e => view.update(JSON.parse(e.data)));
+        events.addEventListener('token', e => view.token(JSON.parse(e.data).text));
+        events.addEventListener('done', e => {
+            finished = true;
+            events.close();
+            failedRunId = null;
+            displayResults(JSON.parse(e.data));
+        });
+        events.addEventListener('error', e => {
+            if (e.data) {
+                // Job failure reported by the server.
+                finished = true;
+                events.close();
+                showError(JSON.parse(e.data));
+            } else if (!finished && events.readyState === EventSource.CLOSED) {
+                showError({error: 'Lost connection to the server', run_id: job.run_id});
+            }
+            // Otherwise the browser reconnects and resumes from the last event id.
+        });
+    })
+    .catch(error => {
+        loadingState.style.display = 'none';
+        alert('An error occurred: ' + error);
+        resetForm();
+    });
+}
+
+// Live view: stage checklist, post text as it is generated, banner and URN when ready.
+function showProgress() {
+    loadingState.style.display = 'none';
+    thankYouPage.style.display = 'block';
+    resultContainer.innerHTML = `
+        <div class="feature-list" id="stageList"></div>
+        <h2 id="livePostTitle"></h2>
+        <p id="livePostBody" style="white-space: pre-wrap;"></p>
+        <img id="liveBanner" alt="Generated Banner" style="display: none; max-width: 100%; border-radius: 12px; margin-top: 20px;">
+        <p id="liveUrn" style="margin-top: 20px;"></p>
+    `;
+    const stageList = document.getElementById('stageList');
+    const title = document.getElementById('livePostTitle');
+    const body = document.getElementById('livePostBody');
+    const banner = document.getElementById('liveBanner');
+    const urn = document.getElementById('liveUrn');
+    const items = {};
+    const marks = {running: '⏳', done: '✅', failed: '❌'};
+
+    function stage(node, state, detail) {
+        if (!STAGES[node]) return;
+        if (!items[node]) {
+            items[node] = document.createElement('div');
+            items[node].className = 'feature-item';
+            stageList.appendChild(items[node]);
+        }
+        items[node].textContent = `${marks[state]} ${STAGES[node]}${detail ? ': ' + detail : ''}`;
+    }
+
+    function update(data) {
+        if (data.festival) stage('select_festival', 'done', `${data.festival.name} (${data.festival.date})`);
+        if (data.node === 'search_company_info') stage('search_company_info', 'done');
+        if (data.post) {
+            stage('write_post', 'done');
+            title.textContent = data.post.title;
+            body.textContent = data.post.body;
+        }
+        if (data.banner_url) {
+            stage('make_banner', 'done');
+            banner.src = (data.banner_variant_urls && data.banner_variant_urls.preview) || data.banner_url;
+            banner.style.display = 'block';
+        }
+        if (data.linkedin_result) {
+            stage('post_linkedin', 'done');
+            urn.textContent = `Posted to LinkedIn with URN: ${data.linkedin_result.post_urn}`;
+        }
+    }
+
+    function started(node) {
+        stage(node, 'running');
+        if (node === 'write_post') body.textContent = '';
+    }
+
+    function token(text) {
+        body.textContent += text;
+    }
+
+    return {stage, started, update, token};
+}
+
+// Fallback for browsers without EventSource: wait for the complete result.
+function waitForRun(data) {
+    fetch(`${API_BASE}/api/generate-post`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
@@ -33,9 +173,9 @@ form.addEventListener('submit', function(e) {
     .then(data => {
         loadingState.style.display = 'none';
         if (data.error) {
-            alert('Error: ' + data.error);
-            resetForm();
+            showError(data);
         } else {
+            failedRunId = null;
             displayResults(data);
         }
     })
@@ -44,7 +184,7 @@ form.addEventListener('submit', function(e) {
         alert('An error occurred: ' + error);
         resetForm();
     });
-});
+}
 
 function displayResults(data) {
     thankYouPage.style.display = 'block';
@@ -62,4 +202,4 @@ function resetForm() {
     thankYouPage.style.display = 'none';
     mainForm.style.display = 'block';
     resultContainer.innerHTML = '';
-}
\ No newline at end of file
+}